@@ -1 +1,3 @@
-from TargetAPI.target import Target
\ No newline at end of file
+from TargetAPI.target import Target
+from TargetAPI.async_target import AsyncTarget
+from TargetAPI.exceptions import TargetAPIError
@@ -0,0 +1,5 @@
+import sys
+
+from TargetAPI.cli import main
+
+sys.exit(main())
@@ -0,0 +1,337 @@
+import asyncio
+import time
+from typing import Union, List, AsyncIterator, Callable
+from urllib.parse import urlencode, urlsplit
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+from TargetAPI.cache import make_key
+from TargetAPI.coalesce import AsyncSingleFlight
+from TargetAPI.decoders import Decoder, Timings, get_decoder
+from TargetAPI.exceptions import NetworkError, error_for_status
+from TargetAPI.metrics import Metrics, DECODE, VALIDATION
+from TargetAPI.rate_limit import RateLimiter, AdaptiveConcurrencyLimiter
+from TargetAPI.models import SearchResults, OnlineProduct, StoreProduct, StoreProductChild, SearchProduct, Location
+from TargetAPI.registry import LocationRegistry, STORE
+from TargetAPI.retry import RetryPolicy, parse_retry_after
+from TargetAPI.target import _make_url, _redsky_params, _search_params, _parse_search, _parse_search_page, \
+    _next_search_page, _product_availability_params, _parse_product_availability, _product_availability_at_store_params, \
+    _parse_product_availability_at_store, _parse_locations, SEARCH_ENDPOINT, ONLINE_AVAILABILITY_ENDPOINT, \
+    STORE_AVAILABILITY_ENDPOINT, LOCATIONS_ENDPOINT
+
+
+def _require_aiohttp():
+    if aiohttp is None:
+        raise ImportError("AsyncTarget requires aiohttp. Install it with `pip install TargetAPI[async]`")
+
+
+class AsyncTarget:
+    """
+    asyncio counterpart of Target.
+
+    Both the RedSky and TargetAPI clients share a single pooled, keep-alive aiohttp connector,
+    so many lookups can be in flight at once from one event loop.
+    Use as an async context manager, or call close() when finished.
+    """
+
+    def __init__(self, api_key: str, limit: int = 100, limit_per_host: int = 0, keepalive_timeout: float = 30,
+                 timeout: float = 30, api_base_url: str = "https://api.target.com/",
+                 redsky_base_url: str = "https://redsky.target.com/", lazy: bool = False,
+                 decoder: Union[str, Decoder] = None, coalesce: bool = False, retry_policy: RetryPolicy = None,
+                 rate_limiter: RateLimiter = None, concurrency_limiter: AdaptiveConcurrencyLimiter = None,
+                 metrics: Union[bool, Metrics] = False):
+        """
+        :param api_key: Target API key
+        :param limit: (Optional) Maximum number of simultaneous connections across all hosts
+        :param limit_per_host: (Optional) Maximum number of simultaneous connections per host (0 for no limit)
+        :param keepalive_timeout: (Optional) Seconds an idle connection is kept open for reuse
+        :param timeout: (Optional) Total timeout in seconds for a single request
+        :param api_base_url: (Optional) Base URL for api.target.com requests
+        :param redsky_base_url: (Optional) Base URL for redsky.target.com requests
+        :param lazy: (Optional) return LazyModel views that validate fields on first access
+        :param decoder: (Optional) JSON decoder name or callable taking the raw response bytes
+        :param coalesce: (Optional) share one request between concurrent identical calls
+        :param retry_policy: (Optional) when to retry failed requests
+        :param rate_limiter: (Optional) requests-per-second limits, shareable with other clients
+        :param concurrency_limiter: (Optional) adaptive limit on concurrent requests, shareable with other clients
+        :param metrics: (Optional) record per-endpoint request metrics; pass a Metrics to share it with other clients
+        """
+        _require_aiohttp()
+        self._api_key = api_key
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._keepalive_timeout = keepalive_timeout
+        self._timeout = timeout
+        self._session = None
+        if metrics is True:
+            metrics = Metrics()
+        self.metrics = metrics or None
+        limits = {'retry_policy': retry_policy, 'rate_limiter': rate_limiter,
+                  'concurrency_limiter': concurrency_limiter, 'metrics': self.metrics}
+        self.api = AsyncTargetAPI(api_key=api_key, target_instance=self, base_url=api_base_url, decoder=decoder,
+                                  coalesce=coalesce, **limits)
+        self.redsky = AsyncRedSky(api_key=api_key, target_instance=self, base_url=redsky_base_url, lazy=lazy,
+                                  decoder=decoder, coalesce=coalesce, **limits)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def session(self) -> "aiohttp.ClientSession":
+        # created lazily so the connector binds to the running event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self._limit, limit_per_host=self._limit_per_host,
+                                             keepalive_timeout=self._keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=aiohttp.ClientTimeout(total=self._timeout))
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def metrics_text(self) -> str:
+        """
+        Render request metrics in Prometheus text exposition format
+        :return: exposition text, empty if metrics are disabled
+        :rtype: str
+        """
+        if self.metrics is None:
+            return ""
+        return self.metrics.metrics_text()
+
+    async def _store_by_id(self, store_id: str) -> Union[Location, None]:
+        store = (await self.api.registry()).get(location_id=store_id)
+        if store is not None and store.location_type == STORE:
+            return store
+        return None
+
+    async def find_stores(self, keyword: str, limit: int = None) -> List[Location]:
+        return (await self.api.registry()).store_search_index.search(query=keyword, limit=limit)
+
+    async def stores(self) -> List[Location]:
+        return await self.api.stores()
+
+    async def search(self, keyword: str, store_id: str = None, store_search: bool = False,
+                     sort_by: str = "relevance") -> List[SearchProduct]:
+        return await self.redsky.search_products(keyword=keyword, store_id=store_id, store_search=store_search,
+                                                 sort_by=sort_by)
+
+    def search_iter(self, keyword: str, store_id: str = None, store_search: bool = False, sort_by: str = "relevance",
+                    max_pages: int = None) -> AsyncIterator[SearchProduct]:
+        return self.redsky.search_iter(keyword=keyword, store_id=store_id, store_search=store_search,
+                                       sort_by=sort_by, max_pages=max_pages)
+
+
+class AsyncAPI:
+    def __init__(self, api_key: str, target_instance: AsyncTarget, base_url: str = "https://api.target.com/",
+                 decoder: Union[str, Decoder] = None, coalesce: Union[bool, AsyncSingleFlight] = False,
+                 retry_policy: RetryPolicy = None, rate_limiter: RateLimiter = None,
+                 concurrency_limiter: AdaptiveConcurrencyLimiter = None, metrics: Metrics = None):
+        self._key = api_key
+        self._target_instance = target_instance
+        self._base_url = base_url
+        self.decoder = get_decoder(decoder=decoder)
+        self.timings = Timings()
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.metrics = metrics
+        self._host = urlsplit(base_url).netloc
+        if isinstance(coalesce, AsyncSingleFlight):
+            self.single_flight = coalesce
+        else:
+            self.single_flight = AsyncSingleFlight() if coalesce else None
+
+    async def _get_json(self, endpoint: str, params: dict = None) -> Union[dict, list]:
+        if self.single_flight is not None:
+            return await self.single_flight.do(key=(self._base_url, make_key(endpoint=endpoint, params=params)),
+                                               func=lambda: self._fetch_json(endpoint=endpoint, params=params))
+        return await self._fetch_json(endpoint=endpoint, params=params)
+
+    async def _fetch_json(self, endpoint: str, params: dict = None) -> Union[dict, list]:
+        params = dict(params or {})
+        params['key'] = self._key
+        url = _make_url(base=self._base_url, endpoint=endpoint)
+        url += f"?{urlencode(params)}"
+        content = await self._get(url=url, endpoint=endpoint)
+        if not content:
+            return {}
+        start = time.perf_counter()
+        data = self.decoder(content)
+        seconds = time.perf_counter() - start
+        self.timings.add_decode(seconds=seconds)
+        if self.metrics is not None:
+            self.metrics.record(endpoint=endpoint, phase=DECODE, seconds=seconds)
+        return data
+
+    def _validate(self, endpoint: str, func: Callable, **kwargs):
+        if self.metrics is None:
+            return func(**kwargs)
+        start = time.perf_counter()
+        try:
+            return func(**kwargs)
+        finally:
+            self.metrics.record(endpoint=endpoint, phase=VALIDATION, seconds=time.perf_counter() - start)
+
+    async def _get(self, url: str, endpoint: str) -> bytes:
+        """
+        Make a GET request, retrying according to the retry policy
+        :raises TargetAPIError: if the request still fails after any retries
+        """
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            attempt += 1
+            policy.record_request()
+            try:
+                status, headers, content = await self._send(url=url, endpoint=endpoint)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                retryable = isinstance(e, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+                if not retryable or not policy.should_retry(attempt=attempt):
+                    raise NetworkError(f"Request to {endpoint} failed: {e!r}") from e
+                await asyncio.sleep(policy.backoff(attempt=attempt))
+                continue
+            if status < 400:
+                return content
+            retry_after = parse_retry_after(headers.get('Retry-After'))
+            if not policy.should_retry(attempt=attempt, status_code=status, retry_after=retry_after):
+                raise error_for_status(status_code=status, url=_make_url(self._base_url, endpoint),
+                                       body=content[:500].decode('utf-8', 'replace'), retry_after=retry_after)
+            await asyncio.sleep(policy.backoff(attempt=attempt, retry_after=retry_after))
+
+    async def _send(self, url: str, endpoint: str) -> tuple:
+        # one attempt, within the rate and concurrency limits; the concurrency limiter learns from its outcome
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(host=self._host, endpoint=endpoint)
+        limiter = self.concurrency_limiter
+        if limiter is not None:
+            await limiter.acquire_async()
+        congested = True
+        status, content = None, b''
+        start = time.perf_counter()
+        try:
+            async with self._target_instance.session.get(url) as res:
+                content = await res.read()
+            status = res.status
+            congested = status == 429 or status >= 500
+            return status, res.headers, content
+        finally:
+            latency = time.perf_counter() - start
+            self.timings.add_network(seconds=latency)
+            if limiter is not None:
+                limiter.release(latency=latency, congested=congested)
+            if self.metrics is not None:
+                self.metrics.record_request(endpoint=endpoint, status=status, seconds=latency, size=len(content))
+
+
+class AsyncRedSky(AsyncAPI):
+    def __init__(self, api_key: str, target_instance: AsyncTarget, base_url: str = "https://redsky.target.com/",
+                 lazy: bool = False, decoder: Union[str, Decoder] = None,
+                 coalesce: Union[bool, AsyncSingleFlight] = False, **kwargs):
+        super().__init__(api_key=api_key, target_instance=target_instance, base_url=base_url, decoder=decoder,
+                         coalesce=coalesce, **kwargs)
+        self.lazy = lazy
+
+    async def _search(self, endpoint: str, **kwargs):
+        params = _redsky_params(**kwargs)
+        return await self._get_json(endpoint=endpoint, params=params)
+
+    async def _search_page(self, keyword: str, store_id: str = None, store_search: bool = False,
+                           sort_by: str = "relevance", page: int = 1, offset: int = None) -> Union[SearchResults, None]:
+        params = _search_params(keyword=keyword, store_id=store_id, store_search=store_search, sort_by=sort_by,
+                                page=page, offset=offset)
+        data = await self._search(endpoint=SEARCH_ENDPOINT, **params)
+        return self._validate(endpoint=SEARCH_ENDPOINT, func=_parse_search_page, data=data, lazy=self.lazy)
+
+    async def search_products(self, keyword: str, store_id: str = None, store_search: bool = False,
+                              sort_by: str = "relevance", page: int = 1) -> List[SearchProduct]:
+        params = _search_params(keyword=keyword, store_id=store_id, store_search=store_search, sort_by=sort_by,
+                                page=page)
+        data = await self._search(endpoint=SEARCH_ENDPOINT, **params)
+        return self._validate(endpoint=SEARCH_ENDPOINT, func=_parse_search, data=data, lazy=self.lazy)
+
+    async def search_iter(self, keyword: str, store_id: str = None, store_search: bool = False,
+                          sort_by: str = "relevance", max_pages: int = None) -> AsyncIterator[SearchProduct]:
+        """
+        Lazily iterate over every page of a product search, prefetching the next page as a task
+        :param keyword: keyword to search for
+        :param store_id: (Optional) ID of store to search
+        :param store_search: (Optional) whether to limit results to in-store products
+        :param sort_by: (Optional) sort order
+        :param max_pages: (Optional) maximum number of pages to fetch
+        :return: async iterator of search products
+        :rtype: AsyncIterator[SearchProduct]
+        """
+        def fetch(page: int, offset: int = None) -> asyncio.Task:
+            return asyncio.ensure_future(self._search_page(keyword=keyword, store_id=store_id,
+                                                           store_search=store_search, sort_by=sort_by,
+                                                           page=page, offset=offset))
+
+        if max_pages is not None and max_pages < 1:
+            return
+        page = 1
+        task = fetch(page)
+        try:
+            while task:
+                results = await task
+                next_page = _next_search_page(results=results, page=page, max_pages=max_pages)
+                task = fetch(*next_page) if next_page else None
+                if results:
+                    for product in results.data.search.products:
+                        yield product
+                if next_page:
+                    page = next_page[0]
+        finally:
+            if task:
+                task.cancel()
+
+    async def product_availability(self, product: SearchProduct) -> Union[OnlineProduct, None]:
+        params = _product_availability_params(product=product)
+        data = await self._search(endpoint=ONLINE_AVAILABILITY_ENDPOINT, **params)
+        return self._validate(endpoint=ONLINE_AVAILABILITY_ENDPOINT, func=_parse_product_availability, data=data,
+                              lazy=self.lazy)
+
+    async def product_availability_at_store(self, product: SearchProduct, store: Location) \
+            -> Union[StoreProduct, StoreProductChild, None]:
+        params = _product_availability_at_store_params(product=product, store=store)
+        data = await self._search(endpoint=STORE_AVAILABILITY_ENDPOINT, **params)
+        return self._validate(endpoint=STORE_AVAILABILITY_ENDPOINT, func=_parse_product_availability_at_store,
+                              data=data, product=product, lazy=self.lazy)
+
+
+class AsyncTargetAPI(AsyncAPI):
+    def __init__(self, api_key: str, target_instance: AsyncTarget, base_url: str = "https://api.target.com/",
+                 decoder: Union[str, Decoder] = None, coalesce: Union[bool, AsyncSingleFlight] = False, **kwargs):
+        super().__init__(api_key=api_key, target_instance=target_instance, base_url=base_url, decoder=decoder,
+                         coalesce=coalesce, **kwargs)
+        self._locations = []
+        self._registry = None
+
+    async def locations(self) -> List[Location]:
+        if not self._locations:
+            data = await self._get_json(endpoint=LOCATIONS_ENDPOINT)
+            self._locations = self._validate(endpoint=LOCATIONS_ENDPOINT, func=_parse_locations, data=data)
+        return self._locations
+
+    async def registry(self) -> LocationRegistry:
+        locations = await self.locations()
+        if self._registry is None or self._registry.source is not locations:
+            self._registry = LocationRegistry(locations=locations)
+        return self._registry
+
+    async def stores(self) -> List[Location]:
+        return list((await self.registry()).stores)
+
+    async def vendors(self) -> List[Location]:
+        return list((await self.registry()).vendors)
+
+    async def sellers(self) -> List[Location]:
+        return list((await self.registry()).sellers)
@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Union, Callable, Tuple, Any
+
+DEFAULT_TTLS = {
+    'plp_search_v1': 300,
+    'product_fulfillment_v1': 30,
+    'pdp_client_v1': 30,
+    'ship_locations/v1': 3600,
+}
+
+
+def make_key(endpoint: str, params: dict = None, base_url: str = None) -> Tuple:
+    """
+    Build a cache key from an endpoint and its query parameters, ignoring the API key
+    :param endpoint: API endpoint
+    :param params: (Optional) query parameters
+    :param base_url: (Optional) base URL of the host, so clients for different hosts can share a cache
+    :return: hashable cache key
+    :rtype: tuple
+    """
+    if not params:
+        return endpoint, (), base_url
+    return endpoint, tuple(sorted((str(k), str(v)) for k, v in params.items() if k != 'key')), base_url
+
+
+class ResponseCache:
+    """
+    Thread-safe in-memory cache of decoded API responses, with a time-to-live per endpoint
+    and least-recently-used eviction once the entry or byte budget is exceeded.
+    """
+
+    def __init__(self, ttls: dict = None, default_ttl: float = 60, max_entries: int = 1024,
+                 max_bytes: int = 64 * 1024 * 1024, clock: Callable[[], float] = time.monotonic):
+        """
+        :param ttls: (Optional) seconds to keep responses for, by endpoint (or endpoint suffix, e.g. "pdp_client_v1").
+        Merged over DEFAULT_TTLS. A TTL of 0 disables caching for that endpoint.
+        :param default_ttl: (Optional) seconds to keep responses from endpoints not listed in ttls
+        :param max_entries: (Optional) maximum number of cached responses
+        :param max_bytes: (Optional) maximum total size of cached response bodies
+        :param clock: (Optional) monotonic time source
+        """
+        self._ttls = dict(DEFAULT_TTLS)
+        self._ttls.update(ttls or {})
+        self._default_ttl = default_ttl
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def ttl_for(self, endpoint: str) -> float:
+        if endpoint in self._ttls:
+            return self._ttls[endpoint]
+        for name, ttl in self._ttls.items():
+            if endpoint.endswith(name):
+                return ttl
+        return self._default_ttl
+
+    def get(self, endpoint: str, params: dict = None, base_url: str = None) -> Union[Any, None]:
+        key = make_key(endpoint=endpoint, params=params, base_url=base_url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, size, value = entry
+            if expires <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, endpoint: str, params: dict, value: Any, size: int = 0, base_url: str = None):
+        ttl = self.ttl_for(endpoint=endpoint)
+        if ttl <= 0 or size > self._max_bytes:
+            return
+        key = make_key(endpoint=endpoint, params=params, base_url=base_url)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (self._clock() + ttl, size, value)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self._max_entries or self._bytes > self._max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, endpoint: str = None):
+        """
+        Drop cached responses
+        :param endpoint: (Optional) only drop responses from this endpoint
+        """
+        with self._lock:
+            for key in [key for key in self._entries if endpoint is None or key[0] == endpoint]:
+                self._remove(key)
+
+    def _remove(self, key: Tuple):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+        }
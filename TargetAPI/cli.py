@@ -0,0 +1,299 @@
+"""
+Bulk scans from the command line.
+
+    python -m TargetAPI scan availability --tcins 83971257 81114595 --stores 1928 2100 --output out.csv
+    python -m TargetAPI scan availability --tcins-file tcins.txt --all-stores --concurrency 32 --rate 20
+    python -m TargetAPI scan search --keywords "ps5" "xbox series x" --max-pages 3 --format ndjson
+    python -m TargetAPI scan stores --output stores.ndjson.gz
+
+The API key is read from --api-key or the TARGET_API_KEY environment variable.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import deque, Counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Union
+
+from TargetAPI.export import export, NDJSON, CSV, LOCATION_COLUMNS, ONLINE_PRODUCT_COLUMNS, \
+    SEARCH_PRODUCT_COLUMNS, STORE_PRODUCT_COLUMNS
+from TargetAPI.metrics import Metrics, NETWORK
+from TargetAPI.models import Location, SearchProduct
+from TargetAPI.rate_limit import RateLimiter
+from TargetAPI.target import Target, ITEM_ERRORS, _bounded_map
+
+STORE_SCAN_COLUMNS = ('tcin', 'store.location_id') + tuple(f"product.{column}" for column in STORE_PRODUCT_COLUMNS
+                                                           if column != 'tcin')
+ONLINE_SCAN_COLUMNS = ('tcin',) + tuple(f"product.{column}" for column in ONLINE_PRODUCT_COLUMNS if column != 'tcin')
+SEARCH_SCAN_COLUMNS = ('keyword',) + tuple(f"product.{column}" for column in SEARCH_PRODUCT_COLUMNS)
+
+
+class ScanError(Exception):
+    """
+    A scan couldn't start, e.g. because the store list couldn't be loaded
+    """
+
+
+class Progress:
+    """
+    Counts jobs and requests during a scan, and draws a live progress line.
+    """
+
+    def __init__(self, total: int = None, stream=sys.stderr, interval: float = 0.5, show: bool = True,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param total: (Optional) number of jobs, if known
+        :param stream: (Optional) where to draw the progress line and summary
+        :param interval: (Optional) seconds between progress line updates
+        :param show: (Optional) draw the live progress line
+        :param clock: (Optional) monotonic time source
+        """
+        self.total = total
+        self._stream = stream
+        self._interval = interval
+        self._show = show
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self._stop = threading.Event()
+        self._thread = None
+        self.started = clock()
+        self.requests = 0
+        self.http_errors = 0
+        self.jobs = 0
+        self.failed = Counter()
+        self.rows = 0
+
+    def on_metric(self, endpoint: str, phase: str, seconds: float, status: Union[int, None],
+                  size: Union[int, None]):
+        # Metrics callback; counts every HTTP attempt, including retries
+        if phase != NETWORK:
+            return
+        with self._lock:
+            self.requests += 1
+            self._latencies.append(seconds)
+            if status is None or status >= 400:
+                self.http_errors += 1
+
+    def job_done(self, error: Exception = None, job: Any = None):
+        with self._lock:
+            self.jobs += 1
+            if error is not None:
+                self.failed[type(error).__name__] += 1
+                line = f"failed {job!r}: {type(error).__name__}: {error}".splitlines()[0]
+                self._stream.write(("\r" if self._show else "") + line + "\n")
+
+    def _percentile(self, latencies: List[float], percent: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percent / 100))]
+
+    @property
+    def elapsed(self) -> float:
+        return max(self._clock() - self.started, 1e-9)
+
+    def line(self) -> str:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            jobs = f"{self.jobs}/{self.total}" if self.total is not None else str(self.jobs)
+            failed = sum(self.failed.values())
+            requests = self.requests
+        return (f"{jobs} jobs  {requests / self.elapsed:.1f} req/s  "
+                f"p50 {self._percentile(latencies, 50) * 1000:.0f}ms  p99 {self._percentile(latencies, 99) * 1000:.0f}ms  "
+                f"{failed} failed")
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            self._stream.write("\r" + self.line() + "  ")
+            self._stream.flush()
+
+    def start(self):
+        if self._show:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._stream.write("\r" + self.line() + "\n")
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'seconds': self.elapsed,
+            'jobs': self.jobs,
+            'failed_jobs': dict(self.failed),
+            'requests': self.requests,
+            'requests_per_second': self.requests / self.elapsed,
+            'http_errors': self.http_errors,
+            'rows': self.rows,
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        failed = ", ".join(f"{name}: {count}" for name, count in sorted(summary['failed_jobs'].items())) or "none"
+        self._stream.write(f"{summary['jobs']} jobs, {summary['rows']} rows in {summary['seconds']:.1f}s; "
+                           f"{summary['requests']} requests ({summary['requests_per_second']:.1f}/s), "
+                           f"{summary['http_errors']} HTTP errors; failed jobs: {failed}\n")
+
+
+def _read_list(values: List[str] = None, path: str = None) -> List[str]:
+    items = list(values or [])
+    if path:
+        with (sys.stdin if path == '-' else open(path)) as f:
+            items += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    return items
+
+
+def _run_jobs(jobs: Iterable, func: Callable[[Any], List[Any]], concurrency: int, progress: Progress) \
+        -> Iterator[Any]:
+    # rows from every job, as each finishes; a failed job, including one whose response doesn't decode or
+    # validate, is reported and skipped
+    def guarded(job) -> List[Any]:
+        try:
+            rows = func(job)
+        except ITEM_ERRORS as e:
+            progress.job_done(error=e, job=job)
+            return []
+        progress.job_done()
+        return rows
+
+    for _, rows in _bounded_map(func=guarded, items=jobs, max_workers=concurrency):
+        for row in rows:
+            progress.rows += 1
+            yield row
+
+
+def _scan_availability(target: Target, args, progress: Progress) -> Iterator[Any]:
+    tcins = _read_list(values=args.tcins, path=args.tcins_file)
+    if args.all_stores:
+        try:
+            stores = list(target.stores)
+        except ITEM_ERRORS as e:
+            raise ScanError(f"couldn't load the store list: {type(e).__name__}: {e}") from e
+    else:
+        # pdp_client_v1 only needs the store ID
+        stores = [Location.construct(location_id=store_id)
+                  for store_id in _read_list(values=args.stores, path=args.stores_file)]
+    if stores:
+        progress.total = len(tcins) * len(stores)
+        jobs = ((tcin, store) for tcin in tcins for store in stores)
+        return _run_jobs(jobs=jobs, concurrency=args.concurrency, progress=progress, func=lambda job: [{
+            'tcin': job[0],
+            'store': job[1],
+            'product': target.redsky.product_availability_at_store(product=SearchProduct(tcin=job[0]), store=job[1]),
+        }])
+    progress.total = len(tcins)
+    return _run_jobs(jobs=tcins, concurrency=args.concurrency, progress=progress, func=lambda tcin: [{
+        'tcin': tcin,
+        'product': target.redsky.product_availability(product=SearchProduct(tcin=tcin)),
+    }])
+
+
+def _scan_search(target: Target, args, progress: Progress) -> Iterator[Any]:
+    keywords = _read_list(values=args.keywords, path=args.keywords_file)
+    progress.total = len(keywords)
+
+    def search(keyword: str) -> List[dict]:
+        products = target.search_iter(keyword=keyword, store_id=args.store, max_pages=args.max_pages)
+        return [{'keyword': keyword, 'product': product} for product in products]
+
+    return _run_jobs(jobs=keywords, func=search, concurrency=args.concurrency, progress=progress)
+
+
+def _scan_stores(target: Target, args, progress: Progress) -> Iterator[Any]:
+    progress.total = 1
+
+    def refresh(_) -> List[Location]:
+        target.api.revalidate_locations(background=False)
+        return list(target.api.locations)
+
+    return _run_jobs(jobs=[None], func=refresh, concurrency=1, progress=progress)
+
+
+SCANS = {
+    'availability': (_scan_availability, None),
+    'search': (_scan_search, SEARCH_SCAN_COLUMNS),
+    'stores': (_scan_stores, LOCATION_COLUMNS),
+}
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m TargetAPI", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    scan = commands.add_parser('scan', help="run a concurrent bulk scan")
+    scans = scan.add_subparsers(dest='scan', required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--api-key', default=os.getenv('TARGET_API_KEY'), help="defaults to $TARGET_API_KEY")
+    common.add_argument('--concurrency', type=int, default=8, help="concurrent jobs (default: 8)")
+    common.add_argument('--rate', type=float, help="maximum requests per second to each host")
+    common.add_argument('--timeout', type=float, default=30, help="seconds to wait on each request (default: 30)")
+    common.add_argument('--format', choices=[NDJSON, CSV], help="output format; inferred from --output by default")
+    common.add_argument('--output', default='-', help="output file, .gz to compress (default: stdout)")
+    common.add_argument('--columns', nargs='+', help="dotted paths to export, e.g. product.price.current_retail")
+    common.add_argument('--lazy', action='store_true', help="only validate the fields being exported")
+    common.add_argument('--cache-dir', help="directory for the store location snapshot")
+    common.add_argument('--no-progress', action='store_true', help="don't draw the live progress line")
+    common.add_argument('--api-base-url', default="https://api.target.com/", help=argparse.SUPPRESS)
+    common.add_argument('--redsky-base-url', default="https://redsky.target.com/", help=argparse.SUPPRESS)
+
+    availability = scans.add_parser('availability', parents=[common],
+                                     help="availability of TCINs at stores, or online if no stores are given")
+    availability.add_argument('--tcins', nargs='+', help="TCINs to check")
+    availability.add_argument('--tcins-file', help="file with one TCIN per line, - for stdin")
+    availability.add_argument('--stores', nargs='+', help="store IDs to check at")
+    availability.add_argument('--stores-file', help="file with one store ID per line")
+    availability.add_argument('--all-stores', action='store_true', help="check at every store")
+
+    search = scans.add_parser('search', parents=[common], help="every product matching each keyword")
+    search.add_argument('--keywords', nargs='+', help="keywords to search for")
+    search.add_argument('--keywords-file', help="file with one keyword per line, - for stdin")
+    search.add_argument('--store', help="store ID to search at")
+    search.add_argument('--max-pages', type=int, help="maximum result pages per keyword")
+
+    scans.add_parser('stores', parents=[common], help="refresh and export every store location")
+    return parser
+
+
+def main(argv: List[str] = None, stdout=None, stderr=None) -> int:
+    """
+    Run the command line interface
+    :param argv: (Optional) arguments, defaults to sys.argv
+    :param stdout: (Optional) stream for output written to -
+    :param stderr: (Optional) stream for progress and the summary
+    :return: exit status; 1 if any job failed, 2 if the scan couldn't start
+    :rtype: int
+    """
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if not args.api_key:
+        parser.error("an API key is required: pass --api-key or set TARGET_API_KEY")
+
+    metrics = Metrics()
+    progress = Progress(stream=stderr, show=not args.no_progress and stderr.isatty())
+    metrics.add_callback(progress.on_metric)
+    target = Target(api_key=args.api_key, api_base_url=args.api_base_url, redsky_base_url=args.redsky_base_url,
+                    cache_dir=args.cache_dir, lazy=args.lazy, metrics=metrics, pool_maxsize=max(10, args.concurrency),
+                    timeout=args.timeout,
+                    rate_limiter=RateLimiter(host_rate=args.rate) if args.rate else None)
+
+    scan, columns = SCANS[args.scan]
+    if args.scan == 'availability':
+        columns = STORE_SCAN_COLUMNS if (args.stores or args.stores_file or args.all_stores) else ONLINE_SCAN_COLUMNS
+    output = stdout if args.output == '-' else args.output
+    progress.start()
+    try:
+        export(rows=scan(target=target, args=args, progress=progress), output=output, format=args.format,
+               columns=args.columns or columns)
+    except ScanError as e:
+        stderr.write(f"error: {e}\n")
+        return 2
+    finally:
+        progress.stop()
+        progress.print_summary()
+    return 1 if progress.failed else 0
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Awaitable
+
+
+class SingleFlight:
+    """
+    Collapses identical concurrent calls: the first caller for a key runs the call,
+    and every caller that arrives while it is in flight waits for and shares its result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.calls = 0
+        self.collapsed = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Run func, unless a call with the same key is already in flight
+        :param key: identity of the call
+        :param func: function to run
+        :return: the result of func, possibly from another thread's call
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.collapsed += 1
+                leader = False
+            else:
+                future = Future()
+                self._calls[key] = future
+                self.calls += 1
+                leader = True
+        if not leader:
+            return future.result()
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'calls': self.calls,
+            'collapsed': self.collapsed,
+            'in_flight': self.in_flight,
+        }
+
+
+class AsyncSingleFlight:
+    """
+    asyncio counterpart of SingleFlight, for coroutines running on one event loop.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.calls = 0
+        self.collapsed = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await func(), unless a call with the same key is already in flight
+        :param key: identity of the call
+        :param func: coroutine function to run
+        :return: the result of func, possibly from another task's call
+        """
+        future = self._calls.get(key)
+        if future is not None:
+            self.collapsed += 1
+            # shield so one waiter being cancelled doesn't cancel the shared call
+            return await asyncio.shield(future)
+        future = asyncio.ensure_future(func())
+        self._calls[key] = future
+        self.calls += 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                self._calls.pop(key, None)
+            else:
+                future.add_done_callback(lambda _: self._calls.pop(key, None))
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'calls': self.calls,
+            'collapsed': self.collapsed,
+            'in_flight': self.in_flight,
+        }
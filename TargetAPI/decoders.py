@@ -0,0 +1,86 @@
+import json
+import threading
+from typing import Any, Callable, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+Decoder = Callable[[bytes], Any]
+
+
+def stdlib_decoder(content: bytes) -> Any:
+    return json.loads(content)
+
+
+def orjson_decoder(content: bytes) -> Any:
+    return orjson.loads(content)
+
+
+DECODERS = {
+    'json': stdlib_decoder,
+    'orjson': orjson_decoder,
+}
+
+
+def _available(name: str) -> bool:
+    return name != 'orjson' or orjson is not None
+
+
+def get_decoder(decoder: Union[str, Decoder, None] = None) -> Decoder:
+    """
+    Resolve a JSON decoder that works on raw response bytes
+    :param decoder: (Optional) name of a built-in decoder ("json" or "orjson"), or a callable taking bytes.
+    Defaults to the fastest installed decoder. Named decoders that are not installed fall back to "json".
+    :return: decoder function
+    :rtype: Callable[[bytes], Any]
+    """
+    if callable(decoder):
+        return decoder
+    if decoder is None:
+        decoder = 'orjson'
+    if decoder not in DECODERS:
+        raise ValueError(f"Unknown JSON decoder '{decoder}'. Choose from {', '.join(DECODERS)}, or pass a callable")
+    if not _available(decoder):
+        return stdlib_decoder
+    return DECODERS[decoder]
+
+
+class Timings:
+    """
+    Running totals of time spent waiting on the network versus decoding JSON.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.network_seconds = 0.0
+        self.decodes = 0
+        self.decode_seconds = 0.0
+
+    def add_network(self, seconds: float):
+        with self._lock:
+            self.requests += 1
+            self.network_seconds += seconds
+
+    def add_decode(self, seconds: float):
+        with self._lock:
+            self.decodes += 1
+            self.decode_seconds += seconds
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.network_seconds = 0.0
+            self.decodes = 0
+            self.decode_seconds = 0.0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'requests': self.requests,
+            'network_seconds': self.network_seconds,
+            'decodes': self.decodes,
+            'decode_seconds': self.decode_seconds,
+        }
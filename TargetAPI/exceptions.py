@@ -0,0 +1,80 @@
+from typing import Union
+
+
+class TargetAPIError(Exception):
+    """
+    Base class for errors raised by TargetAPI
+    """
+    pass
+
+
+class NetworkError(TargetAPIError):
+    """
+    The request could not be completed, e.g. the connection failed or timed out
+    """
+    pass
+
+
+class HTTPError(TargetAPIError):
+    """
+    The API answered with an error status code
+    """
+
+    def __init__(self, status_code: int, url: str = None, body: str = None, retry_after: float = None):
+        self.status_code = status_code
+        self.url = url
+        self.body = body
+        self.retry_after = retry_after
+        super().__init__(f"{status_code} error from {url}" if url else f"{status_code} error")
+
+
+class ClientError(HTTPError):
+    """
+    4xx response
+    """
+    pass
+
+
+class NotFoundError(ClientError):
+    """
+    404 response
+    """
+    pass
+
+
+class RateLimitError(ClientError):
+    """
+    429 response; retry_after holds the server's requested delay in seconds, if it sent one
+    """
+    pass
+
+
+class ServerError(HTTPError):
+    """
+    5xx response
+    """
+    pass
+
+
+def error_for_status(status_code: int, url: str = None, body: str = None, retry_after: float = None) \
+        -> Union[HTTPError, None]:
+    """
+    Build the exception matching an HTTP status code
+    :param status_code: HTTP status code
+    :param url: (Optional) URL of the request
+    :param body: (Optional) start of the response body
+    :param retry_after: (Optional) parsed Retry-After header, in seconds
+    :return: exception to raise, or None for a successful status code
+    :rtype: Union[HTTPError, None]
+    """
+    if status_code < 400:
+        return None
+    if status_code == 404:
+        cls = NotFoundError
+    elif status_code == 429:
+        cls = RateLimitError
+    elif status_code < 500:
+        cls = ClientError
+    else:
+        cls = ServerError
+    return cls(status_code=status_code, url=url, body=body, retry_after=retry_after)
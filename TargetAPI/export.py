@@ -0,0 +1,225 @@
+import csv
+import gzip
+import io
+import itertools
+import json
+from typing import Any, Dict, IO, Iterable, Iterator, Sequence, Tuple, Union
+
+from pydantic import BaseModel
+
+from TargetAPI.location_table import LocationRow
+from TargetAPI.models import SearchProduct, StoreProduct, StoreProductChild, OnlineProduct, Location, LazyModel, \
+    LazyList
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+
+SEARCH_PRODUCT_COLUMNS = (
+    'tcin',
+    'item.product_description.title',
+    'item.primary_brand.name',
+    'item.enrichment.buy_url',
+    'price.formatted_current_price',
+    'price.formatted_current_price_type',
+    'ratings_and_reviews.statistics.rating.average',
+    'ratings_and_reviews.statistics.rating.count',
+)
+STORE_PRODUCT_COLUMNS = (
+    'tcin',
+    'price.formatted_current_price',
+    'price.formatted_current_price_type',
+    'price.current_retail',
+    'price.location_id',
+)
+ONLINE_PRODUCT_COLUMNS = (
+    'tcin',
+    'fulfillment.shipping_options.availability_status',
+    'fulfillment.shipping_options.available_to_promise_quantity',
+    'fulfillment.is_out_of_stock_in_all_store_locations',
+)
+LOCATION_COLUMNS = (
+    'location_id',
+    'location_name',
+    'location_type',
+    'address_line_1',
+    'city',
+    'region',
+    'postal_code',
+    'latitude',
+    'longitude',
+)
+AVAILABILITY_COLUMNS = ('store.location_id',) + tuple(f"product.{column}" for column in STORE_PRODUCT_COLUMNS)
+
+_DEFAULT_COLUMNS = {
+    SearchProduct: SEARCH_PRODUCT_COLUMNS,
+    StoreProduct: STORE_PRODUCT_COLUMNS,
+    StoreProductChild: STORE_PRODUCT_COLUMNS,
+    OnlineProduct: ONLINE_PRODUCT_COLUMNS,
+    Location: LOCATION_COLUMNS,
+    LocationRow: LOCATION_COLUMNS,
+}
+
+
+def get_path(obj: Any, path: str) -> Any:
+    """
+    Look up a dotted path, e.g. "item.product_description.title", on a model, lazy view, dict or list
+    :param obj: object to read from
+    :param path: dot-separated attribute names, keys or list indices
+    :return: the value, or None if any step is missing
+    """
+    for name in path.split('.'):
+        if obj is None:
+            return None
+        if isinstance(obj, dict):
+            obj = obj.get(name)
+        elif isinstance(obj, (list, tuple, LazyList)):
+            try:
+                obj = obj[int(name)]
+            except (ValueError, IndexError):
+                return None
+        else:
+            obj = getattr(obj, name, None)
+    return obj
+
+
+def _plain(value: Any) -> Any:
+    # JSON-serializable form of a projected value
+    if isinstance(value, LazyModel):
+        return value.raw
+    if isinstance(value, BaseModel):
+        return value.dict()
+    if isinstance(value, (list, tuple, LazyList)):
+        return [_plain(item) for item in value]
+    return value
+
+
+def project(row: Any, columns: Sequence[str]) -> Dict[str, Any]:
+    """
+    Flatten a row to the given columns
+    :param row: model, lazy view or dict
+    :param columns: dotted paths to read
+    :return: dict of column to value
+    :rtype: Dict[str, Any]
+    """
+    return {column: _plain(get_path(row, column)) for column in columns}
+
+
+def default_columns(row: Any) -> Tuple[str, ...]:
+    """
+    Default columns for a kind of row
+    :param row: a search product, store or online availability, location, or availability pair
+    :return: dotted paths
+    :rtype: Tuple[str, ...]
+    """
+    if isinstance(row, dict) and 'store' in row and 'product' in row:
+        return AVAILABILITY_COLUMNS
+    model = row._model if isinstance(row, LazyModel) else type(row)
+    columns = _DEFAULT_COLUMNS.get(model)
+    if columns is None:
+        raise ValueError(f"No default columns for {model.__name__}; pass columns")
+    return columns
+
+
+def availability_rows(pairs: Iterable[Tuple[Location, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Adapt (store, product) pairs from product_availability_across_stores for export
+    :param pairs: (store, availability) tuples
+    :return: iterator of {'store': store, 'product': availability} rows
+    :rtype: Iterator[Dict[str, Any]]
+    """
+    for store, product in pairs:
+        yield {'store': store, 'product': product}
+
+
+class NDJSONWriter:
+    """
+    Writes one JSON object per line.
+    """
+
+    def __init__(self, fp: IO[str], columns: Sequence[str]):
+        self._fp = fp
+        self.columns = tuple(columns)
+
+    def write(self, row: Any):
+        self._fp.write(json.dumps(project(row=row, columns=self.columns), default=str))
+        self._fp.write("\n")
+
+
+class CSVWriter:
+    """
+    Writes a header and one CSV line per row; nested values are written as JSON.
+    """
+
+    def __init__(self, fp: IO[str], columns: Sequence[str]):
+        self.columns = tuple(columns)
+        self._writer = csv.writer(fp)
+        if self.columns:
+            self._writer.writerow(self.columns)
+
+    def write(self, row: Any):
+        values = project(row=row, columns=self.columns)
+        self._writer.writerow([json.dumps(value, default=str) if isinstance(value, (dict, list)) else value
+                               for value in values.values()])
+
+
+WRITERS = {
+    NDJSON: NDJSONWriter,
+    CSV: CSVWriter,
+}
+
+
+def _format_for(path: str) -> str:
+    name = path[:-3] if path.endswith('.gz') else path
+    return CSV if name.endswith('.csv') else NDJSON
+
+
+def open_output(path: str, compress: bool = None) -> IO[str]:
+    """
+    Open a text file for writing, gzip-compressed if asked or if the path ends in .gz
+    :param path: file path
+    :param compress: (Optional) force compression on or off
+    :return: writable text file
+    :rtype: IO[str]
+    """
+    if compress is None:
+        compress = path.endswith('.gz')
+    if compress:
+        return io.TextIOWrapper(gzip.open(path, 'wb'), encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def export(rows: Iterable[Any], output: Union[str, IO[str]], format: str = None, columns: Sequence[str] = None,
+           compress: bool = None) -> int:
+    """
+    Stream rows to NDJSON or CSV, one row at a time, so memory use doesn't grow with the number of rows
+    :param rows: models, lazy views or dicts, e.g. from search_iter or availability_rows(...)
+    :param output: file path, or a writable text file
+    :param format: (Optional) NDJSON or CSV; inferred from the file extension by default
+    :param columns: (Optional) dotted paths to export; by default chosen from the type of the first row
+    :param compress: (Optional) gzip the file; by default only if the path ends in .gz
+    :return: number of rows written; the output is created, with a CSV header if columns are known, even when 0
+    :rtype: int
+    """
+    if format is None:
+        format = _format_for(output) if isinstance(output, str) else NDJSON
+    writer_class = WRITERS[format]
+    rows = iter(rows)
+    if columns is None:
+        # skips failed (None) rows at the start; with no rows at all there are no columns, so the file is empty
+        first = next((row for row in rows if row is not None), None)
+        columns = default_columns(first) if first is not None else ()
+        if first is not None:
+            rows = itertools.chain((first,), rows)
+    fp = open_output(path=output, compress=compress) if isinstance(output, str) else output
+    count = 0
+    try:
+        writer = writer_class(fp=fp, columns=columns)
+        for row in rows:
+            if row is None:
+                continue
+            writer.write(row)
+            count += 1
+    finally:
+        if isinstance(output, str):
+            fp.close()
+    return count
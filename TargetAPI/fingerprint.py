@@ -0,0 +1,80 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Tuple
+
+
+class _Unchanged:
+    def __repr__(self):
+        return "UNCHANGED"
+
+    def __bool__(self):
+        return False
+
+
+# returned instead of a model when a response is byte-for-byte the same as last time, if requested
+UNCHANGED = _Unchanged()
+
+
+def fingerprint(content: bytes) -> bytes:
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+class FingerprintStore:
+    """
+    Remembers a hash of the last raw response body for each request, and the model built from it,
+    so an identical response can skip JSON decoding and model validation entirely.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        """
+        :param max_entries: (Optional) maximum number of requests to remember, least recently used are dropped first
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[bytes, Any]]" = OrderedDict()
+        self.unchanged = 0
+        self.changed = 0
+
+    def lookup(self, key: Hashable, content: bytes) -> Tuple[bytes, bool, Any]:
+        """
+        Check a response body against the last one for the same request
+        :param key: request key
+        :param content: raw response body
+        :return: (fingerprint of content, whether it matched, model built last time if it matched)
+        :rtype: Tuple[bytes, bool, Any]
+        """
+        digest = fingerprint(content)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == digest:
+                self._entries.move_to_end(key)
+                self.unchanged += 1
+                return digest, True, entry[1]
+            self.changed += 1
+        return digest, False, None
+
+    def store(self, key: Hashable, digest: bytes, model: Any):
+        with self._lock:
+            self._entries[key] = (digest, model)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable = None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'entries': len(self._entries),
+            'unchanged': self.unchanged,
+            'changed': self.changed,
+        }
@@ -1,4 +1,6 @@
 from datetime import datetime
+from typing import Any, Callable
+
 
 def string_to_datetime(date_string: str, template: str = "%Y-%m-%dT%H:%M:%S.000Z") -> datetime:
     """
@@ -8,4 +10,56 @@ def string_to_datetime(date_string: str, template: str = "%Y-%m-%dT%H:%M:%S.000Z
     :return: datetime.datetime object
     :rtype: datetime.datetime
     """
-    return datetime.strptime(date_string, template)
\ No newline at end of file
+    return datetime.strptime(date_string, template)
+
+
+class cached_attribute:
+    """
+    Like functools.cached_property, but stores the computed value in the instance's _cache dict rather than its
+    __dict__, so it works on classes with __slots__. Delete the attribute, or call Cached.invalidate, to recompute it.
+    """
+
+    def __init__(self, func: Callable[[Any], Any]):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            cache = instance._cache
+        except AttributeError:
+            # created on first use, so wrappers that are never read cost nothing extra
+            cache = instance._cache = {}
+        try:
+            return cache[self.name]
+        except KeyError:
+            value = cache[self.name] = self.func(instance)
+            return value
+
+    def __delete__(self, instance):
+        getattr(instance, '_cache', {}).pop(self.name, None)
+
+
+class Cached:
+    """
+    Base for wrappers with cached_attribute properties
+    """
+    __slots__ = ('_cache',)
+
+    def invalidate(self, *names: str):
+        """
+        Forget cached attributes, so they are recomputed on next access
+        :param names: (Optional) attributes to forget, defaults to all of them
+        """
+        cache = getattr(self, '_cache', None)
+        if cache is None:
+            return
+        if not names:
+            cache.clear()
+        for name in names:
+            cache.pop(name, None)
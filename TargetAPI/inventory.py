@@ -0,0 +1,257 @@
+import heapq
+import math
+from typing import Dict, Iterable, List, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from TargetAPI.location_table import _float
+
+# column name: key in each availability location
+QUANTITY_COLUMNS = {
+    'onhand': 'onhand_quantity',
+    'demand': 'location_demand_sum',
+    'hard_demand': 'location_hard_demand_sum',
+    'soft_demand': 'location_soft_demand_sum',
+    'reserve': 'product_location_reserve',
+    'walk_in_reserve': 'product_location_pickup_walkin_reserve',
+}
+AGGREGATES = ('sum', 'mean', 'min', 'max', 'count')
+
+
+def _column(locations: List[dict], key: str):
+    values = [location.get(key) for location in locations]
+    if np is not None:
+        try:
+            # quantities are almost always numbers already; only fall back to parsing each one if they aren't
+            return np.array([math.nan if value is None else value for value in values], dtype=np.float64)
+        except (TypeError, ValueError):
+            return np.asarray([_float(value) for value in values], dtype=np.float64)
+    return [_float(value) for value in values]
+
+
+class InventoryMatrix:
+    """
+    Column-oriented inventory across the locations of one product's availability.
+
+    Quantities are parsed once into float arrays (NaN where missing) and statuses into integer codes, so rollups,
+    threshold filters and top-k run as vectorized NumPy operations rather than loops over AvailabilityLocation
+    wrappers. Falls back to pure Python when NumPy isn't installed.
+    """
+
+    def __init__(self, locations: Iterable[dict], target=None, regions: Dict[str, str] = None):
+        """
+        :param locations: raw availability locations, e.g. the 'locations' of product availability data
+        :param target: (Optional) Target instance used to look up each location's region
+        :param regions: (Optional) region of each location ID, instead of looking them up
+        """
+        locations = list(locations)
+        self._target_instance = target
+        self._regions = regions
+        self.location_ids: List[str] = [location.get('location_id') for location in locations]
+        self.statuses: List[str] = []
+        codes = {}
+        status_codes = []
+        for location in locations:
+            status = location.get('availability_status')
+            if status not in codes:
+                codes[status] = len(self.statuses)
+                self.statuses.append(status)
+            status_codes.append(codes[status])
+        self._columns = {name: _column(locations=locations, key=key) for name, key in QUANTITY_COLUMNS.items()}
+        self._status_codes = np.asarray(status_codes, dtype=np.intp) if np is not None else status_codes
+        self._region_codes = None
+        self._region_names = None
+        self._index = None
+
+    @classmethod
+    def _subset(cls, matrix: "InventoryMatrix", rows) -> "InventoryMatrix":
+        subset = cls.__new__(cls)
+        subset._target_instance = matrix._target_instance
+        subset._regions = matrix._regions
+        subset.statuses = matrix.statuses
+        subset._index = None
+        if np is not None:
+            rows = np.asarray(rows, dtype=np.intp)
+            subset.location_ids = [matrix.location_ids[i] for i in rows.tolist()]
+            subset._columns = {name: values[rows] for name, values in matrix._columns.items()}
+            subset._status_codes = matrix._status_codes[rows]
+        else:
+            subset.location_ids = [matrix.location_ids[i] for i in rows]
+            subset._columns = {name: [values[i] for i in rows] for name, values in matrix._columns.items()}
+            subset._status_codes = [matrix._status_codes[i] for i in rows]
+        if matrix._region_codes is not None:
+            subset._region_names = matrix._region_names
+            subset._region_codes = matrix._region_codes[rows] if np is not None \
+                else [matrix._region_codes[i] for i in rows]
+        else:
+            subset._region_names = subset._region_codes = None
+        return subset
+
+    def __len__(self) -> int:
+        return len(self.location_ids)
+
+    def __repr__(self) -> str:
+        return f"<InventoryMatrix {len(self)} locations>"
+
+    def column(self, name: str):
+        """
+        One quantity column
+        :param name: a key of QUANTITY_COLUMNS, e.g. 'onhand'
+        :return: NumPy float array, or a list of floats without NumPy; NaN where missing
+        """
+        if name not in self._columns:
+            raise ValueError(f"Unknown column '{name}'. Choose from {', '.join(QUANTITY_COLUMNS)}")
+        return self._columns[name]
+
+    def row(self, location_id: str) -> Union[dict, None]:
+        """
+        Quantities and status of one location
+        :param location_id: location ID
+        :return: dict of column to value, None if the location isn't present
+        :rtype: Union[dict, None]
+        """
+        if self._index is None:
+            self._index = {location_id: i for i, location_id in enumerate(self.location_ids)}
+        i = self._index.get(location_id)
+        if i is None:
+            return None
+        row = {name: float(values[i]) for name, values in self._columns.items()}
+        row['status'] = self.statuses[int(self._status_codes[i])]
+        return row
+
+    def _load_regions(self):
+        names, codes, region_codes = [], {}, []
+        for location_id in self.location_ids:
+            if self._regions is not None:
+                region = self._regions.get(location_id)
+            else:
+                store = self._target_instance._store_by_id(store_id=location_id) if self._target_instance else None
+                region = store.region if store is not None else None
+            if region not in codes:
+                codes[region] = len(names)
+                names.append(region)
+            region_codes.append(codes[region])
+        self._region_names = names
+        self._region_codes = np.asarray(region_codes, dtype=np.intp) if np is not None else region_codes
+
+    def where(self, column: str, above: float = None, below: float = None) -> "InventoryMatrix":
+        """
+        Locations whose quantity is strictly between the thresholds; locations missing the quantity never match
+        :param column: quantity column to filter on
+        :param above: (Optional) keep locations with more than this
+        :param below: (Optional) keep locations with less than this
+        :return: the matching locations
+        :rtype: InventoryMatrix
+        """
+        values = self.column(column)
+        if np is not None:
+            mask = ~np.isnan(values)
+            if above is not None:
+                mask &= values > above
+            if below is not None:
+                mask &= values < below
+            return self._subset(self, np.flatnonzero(mask))
+        rows = [i for i, value in enumerate(values) if not math.isnan(value)
+                and (above is None or value > above) and (below is None or value < below)]
+        return self._subset(self, rows)
+
+    def exceeding(self, column: str, other: str) -> "InventoryMatrix":
+        """
+        Locations where one quantity is greater than another, e.g. exceeding('demand', 'reserve')
+        :param column: quantity column that must be larger
+        :param other: quantity column to compare against
+        :return: the matching locations
+        :rtype: InventoryMatrix
+        """
+        values, others = self.column(column), self.column(other)
+        if np is not None:
+            return self._subset(self, np.flatnonzero(values > others))
+        return self._subset(self, [i for i, (value, compare) in enumerate(zip(values, others)) if value > compare])
+
+    def with_status(self, *statuses: str) -> "InventoryMatrix":
+        """
+        Locations with any of the given availability statuses, e.g. with_status("IN_STOCK", "LIMITED_STOCK")
+        :return: the matching locations
+        :rtype: InventoryMatrix
+        """
+        wanted = [code for code, status in enumerate(self.statuses) if status in statuses]
+        if np is not None:
+            return self._subset(self, np.flatnonzero(np.isin(self._status_codes, wanted)))
+        wanted = set(wanted)
+        return self._subset(self, [i for i, code in enumerate(self._status_codes) if code in wanted])
+
+    def top(self, column: str = 'onhand', k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Locations with the most of a quantity
+        :param column: (Optional) quantity column to rank by
+        :param k: (Optional) number of locations to return
+        :return: (location ID, quantity) tuples, largest first; locations missing the quantity are left out
+        :rtype: List[Tuple[str, float]]
+        """
+        values = self.column(column)
+        if k < 1:
+            return []
+        if np is not None:
+            rows = np.flatnonzero(~np.isnan(values))
+            if k < len(rows):
+                rows = rows[np.argpartition(-values[rows], k - 1)[:k]]
+            rows = rows[np.argsort(-values[rows], kind='stable')]
+            return [(self.location_ids[i], float(values[i])) for i in rows.tolist()]
+        ranked = heapq.nlargest(k, (i for i, value in enumerate(values) if not math.isnan(value)),
+                                key=lambda i: values[i])
+        return [(self.location_ids[i], values[i]) for i in ranked]
+
+    def total(self, column: str = 'onhand') -> float:
+        """
+        Sum of a quantity across locations, ignoring missing values
+        :rtype: float
+        """
+        values = self.column(column)
+        if np is not None:
+            return float(np.nansum(values))
+        return sum(value for value in values if not math.isnan(value))
+
+    def group_by_region(self, column: str = 'onhand', aggregate: str = 'sum') -> Dict[Union[str, None], float]:
+        """
+        Aggregate a quantity by the region (state) of each location, ignoring missing values
+        :param column: (Optional) quantity column to aggregate
+        :param aggregate: (Optional) one of AGGREGATES
+        :return: dict of region to aggregate; locations that aren't known stores are grouped under None
+        :rtype: Dict[Union[str, None], float]
+        """
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{aggregate}'. Choose from {', '.join(AGGREGATES)}")
+        if self._region_codes is None:
+            self._load_regions()
+        values, groups = self.column(column), len(self._region_names)
+        if np is not None:
+            present = ~np.isnan(values)
+            codes, present_values = self._region_codes[present], values[present]
+            counts = np.bincount(codes, minlength=groups)
+            if aggregate in ('min', 'max'):
+                results = np.full(groups, np.inf if aggregate == 'min' else -np.inf)
+                (np.minimum if aggregate == 'min' else np.maximum).at(results, codes, present_values)
+            else:
+                results = np.bincount(codes, weights=present_values, minlength=groups)
+                if aggregate == 'mean':
+                    results = results / np.maximum(counts, 1)
+                elif aggregate == 'count':
+                    results = counts
+            return {self._region_names[code]: float(results[code]) for code in range(groups) if counts[code]}
+        grouped: Dict[int, List[float]] = {}
+        for code, value in zip(self._region_codes, values):
+            if not math.isnan(value):
+                grouped.setdefault(code, []).append(value)
+        reduce = {'sum': sum, 'min': min, 'max': max, 'count': len,
+                  'mean': lambda group: sum(group) / len(group)}[aggregate]
+        return {self._region_names[code]: float(reduce(group)) for code, group in grouped.items()}
+
+    def to_dicts(self) -> List[dict]:
+        """
+        One dict per location, for export
+        :rtype: List[dict]
+        """
+        return [dict(location_id=location_id, **self.row(location_id)) for location_id in self.location_ids]
@@ -0,0 +1,232 @@
+import math
+import sys
+from array import array
+from typing import List, Iterable, Iterator, Union
+
+from TargetAPI.models import Location
+
+STRING_COLUMNS = ('location_id', 'location_name', 'address_line_1', 'postal_code', 'phone')
+CATEGORICAL_COLUMNS = ('location_type', 'city', 'region', 'is_active', 'obgb_enabled')
+NUMERIC_COLUMNS = ('latitude', 'longitude')
+COLUMNS = tuple(Location.__fields__)
+
+
+def _float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def deep_sizeof(obj, seen: set = None) -> int:
+    """
+    Approximate memory used by an object and everything it references
+    :param obj: object to measure
+    :return: size in bytes
+    :rtype: int
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), seen)
+    elif hasattr(obj, '__slots__'):
+        size += sum(deep_sizeof(getattr(obj, slot), seen) for slot in obj.__slots__ if hasattr(obj, slot))
+    return size
+
+
+class LocationRow:
+    """
+    Lightweight view of one row of a LocationTable, with the same attributes as Location.
+    """
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: "LocationTable", index: int):
+        self._table = table
+        self._index = index
+
+    def __repr__(self) -> str:
+        return f"LocationRow(location_id={self.location_id!r}, location_name={self.location_name!r})"
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LocationRow):
+            return self._table is other._table and self._index == other._index
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((id(self._table), self._index))
+
+    @property
+    def latitude_value(self) -> float:
+        return self._table._numeric['latitude'][self._index]
+
+    @property
+    def longitude_value(self) -> float:
+        return self._table._numeric['longitude'][self._index]
+
+    def dict(self) -> dict:
+        return {column: getattr(self, column) for column in COLUMNS}
+
+    def to_location(self) -> Location:
+        return Location.construct(**self.dict())
+
+
+def _string_column(name: str):
+    return property(lambda row: row._table._strings[name][row._index])
+
+
+def _categorical_column(name: str):
+    def getter(row):
+        table = row._table
+        return table._categories[name][table._codes[name][row._index]]
+    return property(getter)
+
+
+def _numeric_column(name: str):
+    def getter(row):
+        value = row._table._numeric[name][row._index]
+        return None if math.isnan(value) else repr(value)
+    return property(getter)
+
+
+for _name in STRING_COLUMNS:
+    setattr(LocationRow, _name, _string_column(_name))
+for _name in CATEGORICAL_COLUMNS:
+    setattr(LocationRow, _name, _categorical_column(_name))
+for _name in NUMERIC_COLUMNS:
+    setattr(LocationRow, _name, _numeric_column(_name))
+
+
+class LocationTable:
+    """
+    Columnar store for the full location list.
+
+    Free-text columns are kept as parallel lists, low-cardinality columns (type, city, region, flags) as
+    small integer codes into a shared category list, and latitude/longitude as packed doubles.
+    Rows are handed out as LocationRow views, so no per-location object is kept alive.
+    Note that latitude/longitude read back as the shortest string for the parsed float, e.g. "44.97" for "44.970".
+    """
+
+    def __init__(self):
+        self._size = 0
+        self._strings = {name: [] for name in STRING_COLUMNS}
+        self._categories = {name: [] for name in CATEGORICAL_COLUMNS}
+        self._category_codes = {name: {} for name in CATEGORICAL_COLUMNS}
+        self._codes = {name: array('H') for name in CATEGORICAL_COLUMNS}
+        self._numeric = {name: array('d') for name in NUMERIC_COLUMNS}
+
+    @classmethod
+    def from_locations(cls, locations: Iterable[Union[Location, LocationRow]]) -> "LocationTable":
+        table = cls()
+        for location in locations:
+            table.append({column: getattr(location, column, None) for column in COLUMNS})
+        return table
+
+    @classmethod
+    def from_dicts(cls, data: Iterable[dict]) -> "LocationTable":
+        """
+        Build a table straight from raw ship_locations/v1 data, skipping pydantic validation
+        :param data: list of location dicts
+        :return: location table
+        :rtype: LocationTable
+        """
+        table = cls()
+        for loc in data:
+            table.append(loc)
+        return table
+
+    def append(self, data: dict):
+        for name in STRING_COLUMNS:
+            value = data.get(name)
+            self._strings[name].append(None if value is None else str(value))
+        for name in CATEGORICAL_COLUMNS:
+            value = data.get(name)
+            codes = self._category_codes[name]
+            code = codes.get(value)
+            if code is None:
+                code = len(self._categories[name])
+                codes[value] = code
+                self._categories[name].append(value)
+            self._codes[name].append(code)
+        for name in NUMERIC_COLUMNS:
+            self._numeric[name].append(_float(data.get(name)))
+        self._size += 1
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> LocationRow:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("LocationTable index out of range")
+        return LocationRow(table=self, index=index)
+
+    def __iter__(self) -> Iterator[LocationRow]:
+        for i in range(self._size):
+            yield LocationRow(table=self, index=i)
+
+    def column(self, name: str) -> list:
+        """
+        Get every value of one column
+        :param name: Location attribute name
+        :return: list of values, in row order
+        :rtype: list
+        """
+        if name in self._strings:
+            return list(self._strings[name])
+        if name in self._codes:
+            categories = self._categories[name]
+            return [categories[code] for code in self._codes[name]]
+        if name in self._numeric:
+            return list(self._numeric[name])
+        raise KeyError(name)
+
+    def where(self, name: str, value) -> List[LocationRow]:
+        """
+        Get rows where a categorical column has a given value, e.g. where('location_type', 'STORE')
+        :param name: categorical column name
+        :param value: value to match
+        :return: matching rows
+        :rtype: List[LocationRow]
+        """
+        code = self._category_codes[name].get(value)
+        if code is None:
+            return []
+        return [LocationRow(table=self, index=i) for i, c in enumerate(self._codes[name]) if c == code]
+
+    def memory_usage(self) -> int:
+        """
+        Approximate memory used by the table
+        :return: size in bytes
+        :rtype: int
+        """
+        seen = set()
+        return (sys.getsizeof(self) + deep_sizeof(self._strings, seen) + deep_sizeof(self._categories, seen)
+                + deep_sizeof(self._category_codes, seen) + deep_sizeof(self._codes, seen)
+                + deep_sizeof(self._numeric, seen))
+
+    def memory_report(self, locations: List[Location] = None) -> dict:
+        """
+        Compare the table's memory use with an equivalent list of pydantic Location models
+        :param locations: (Optional) existing Location list; built from the table if not provided
+        :return: dict of byte counts
+        :rtype: dict
+        """
+        if locations is None:
+            locations = [Location(**row.dict()) for row in self]
+        table_bytes = self.memory_usage()
+        models_bytes = deep_sizeof(locations)
+        return {
+            'rows': self._size,
+            'table_bytes': table_bytes,
+            'models_bytes': models_bytes,
+            'ratio': models_bytes / table_bytes if table_bytes else 0.0,
+        }
@@ -0,0 +1,194 @@
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Union
+
+NETWORK = 'network'
+DECODE = 'decode'
+VALIDATION = 'validation'
+PHASES = (NETWORK, DECODE, VALIDATION)
+
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# callback(endpoint, phase, seconds, status, size); status and size are None outside the network phase,
+# and status is None for a request that failed without a response
+MetricsCallback = Callable[[str, str, float, Union[int, None], Union[int, None]], None]
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram, rendered cumulatively as Prometheus expects.
+    """
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        total = 0
+        counts = []
+        for count in self.counts:
+            total += count
+            counts.append(total)
+        return counts
+
+
+class EndpointMetrics:
+    """
+    Request count, status codes, per-phase latency and response sizes for one endpoint.
+    """
+
+    def __init__(self, latency_buckets: Sequence[float], size_buckets: Sequence[float]):
+        self.statuses: Dict[str, int] = {}
+        self.phases = {phase: Histogram(buckets=latency_buckets) for phase in PHASES}
+        self.response_bytes = Histogram(buckets=size_buckets)
+
+    @property
+    def requests(self) -> int:
+        return sum(self.statuses.values())
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'requests': self.requests,
+            'statuses': dict(self.statuses),
+            'seconds': {phase: histogram.sum for phase, histogram in self.phases.items()},
+            'response_bytes': int(self.response_bytes.sum),
+        }
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels) -> str:
+    return ','.join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """
+    Per-endpoint request metrics: counts, status code distribution, latency histograms for the network,
+    JSON decode and model validation phases, and response sizes.
+
+    Clients only record metrics when given a Metrics instance; share one between clients to aggregate them.
+    """
+
+    def __init__(self, latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+                 size_buckets: Sequence[float] = DEFAULT_SIZE_BUCKETS):
+        """
+        :param latency_buckets: (Optional) upper bounds in seconds of the latency histogram buckets
+        :param size_buckets: (Optional) upper bounds in bytes of the response size histogram buckets
+        """
+        self.latency_buckets = tuple(sorted(latency_buckets))
+        self.size_buckets = tuple(sorted(size_buckets))
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointMetrics] = {}
+        self._callbacks: List[MetricsCallback] = []
+
+    def add_callback(self, callback: MetricsCallback):
+        """
+        Call a function with every observation, e.g. to forward it to another metrics system
+        :param callback: function taking (endpoint, phase, seconds, status, size)
+        """
+        self._callbacks.append(callback)
+
+    def remove_callback(self, callback: MetricsCallback):
+        self._callbacks.remove(callback)
+
+    def _endpoint(self, endpoint: str) -> EndpointMetrics:
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = EndpointMetrics(latency_buckets=self.latency_buckets, size_buckets=self.size_buckets)
+            self._endpoints[endpoint] = metrics
+        return metrics
+
+    def record_request(self, endpoint: str, status: Union[int, None], seconds: float, size: int = 0):
+        """
+        Record one HTTP attempt
+        :param endpoint: endpoint requested
+        :param status: response status code, or None if the request failed without a response
+        :param seconds: time spent on the network
+        :param size: (Optional) response body size in bytes
+        """
+        with self._lock:
+            metrics = self._endpoint(endpoint)
+            label = str(status) if status is not None else 'error'
+            metrics.statuses[label] = metrics.statuses.get(label, 0) + 1
+            metrics.phases[NETWORK].observe(seconds)
+            if status is not None:
+                metrics.response_bytes.observe(size)
+        for callback in self._callbacks:
+            callback(endpoint, NETWORK, seconds, status, size)
+
+    def record(self, endpoint: str, phase: str, seconds: float):
+        """
+        Record time spent decoding or validating a response
+        :param endpoint: endpoint the response came from
+        :param phase: DECODE or VALIDATION
+        :param seconds: time spent
+        """
+        with self._lock:
+            self._endpoint(endpoint).phases[phase].observe(seconds)
+        for callback in self._callbacks:
+            callback(endpoint, phase, seconds, None, None)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+
+    @property
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {endpoint: metrics.stats for endpoint, metrics in self._endpoints.items()}
+
+    def metrics_text(self, namespace: str = "targetapi") -> str:
+        """
+        Render the metrics in Prometheus text exposition format
+        :param namespace: (Optional) prefix for metric names
+        :return: exposition text
+        :rtype: str
+        """
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            lines = [f"# HELP {namespace}_requests_total Requests made, by endpoint and response status.",
+                     f"# TYPE {namespace}_requests_total counter"]
+            for endpoint, metrics in endpoints:
+                for status, count in sorted(metrics.statuses.items()):
+                    lines.append(f"{namespace}_requests_total{{{_labels(endpoint=endpoint, status=status)}}} {count}")
+            lines += [f"# HELP {namespace}_phase_seconds Time spent per response on the network, "
+                      f"decoding JSON and validating models.",
+                      f"# TYPE {namespace}_phase_seconds histogram"]
+            for endpoint, metrics in endpoints:
+                for phase, histogram in metrics.phases.items():
+                    if histogram.count:
+                        lines += self._histogram_lines(name=f"{namespace}_phase_seconds", histogram=histogram,
+                                                       endpoint=endpoint, phase=phase)
+            lines += [f"# HELP {namespace}_response_bytes Response body sizes.",
+                      f"# TYPE {namespace}_response_bytes histogram"]
+            for endpoint, metrics in endpoints:
+                if metrics.response_bytes.count:
+                    lines += self._histogram_lines(name=f"{namespace}_response_bytes",
+                                                   histogram=metrics.response_bytes, endpoint=endpoint)
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _histogram_lines(name: str, histogram: Histogram, **labels) -> List[str]:
+        lines = []
+        bounds = [_number(bound) for bound in histogram.buckets] + ['+Inf']
+        for bound, count in zip(bounds, histogram.cumulative()):
+            lines.append(f"{name}_bucket{{{_labels(**labels, le=bound)}}} {count}")
+        lines.append(f"{name}_sum{{{_labels(**labels)}}} {_number(histogram.sum)}")
+        lines.append(f"{name}_count{{{_labels(**labels)}}} {histogram.count}")
+        return lines
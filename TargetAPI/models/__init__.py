@@ -4,3 +4,4 @@ from TargetAPI.models.product_availability_online import Model as OnlineAvailabi
     Product as OnlineProduct
 from TargetAPI.models.product_availability_in_store import Model as StoreAvailabilityResults, \
     Product as StoreProduct, Child as StoreProductChild
+from TargetAPI.models.lazy import LazyModel, LazyList
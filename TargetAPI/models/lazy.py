@@ -0,0 +1,123 @@
+from typing import Any, Type, Union, Sequence, Iterator
+
+from pydantic import BaseModel, ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.fields import ModelField, SHAPE_SINGLETON, SHAPE_LIST
+
+_UNSET = object()
+
+
+def _is_model(type_: Any) -> bool:
+    return isinstance(type_, type) and issubclass(type_, BaseModel)
+
+
+class LazyList(Sequence):
+    """
+    List view over raw items that wraps each one in a LazyModel only when it is accessed.
+    """
+    __slots__ = ('_model', '_items', '_views')
+
+    def __init__(self, model: Type[BaseModel], items: list):
+        self._model = model
+        self._items = items
+        self._views = [None] * len(items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._items)))]
+        view = self._views[index]
+        if view is None:
+            view = LazyModel(model=self._model, data=self._items[index])
+            self._views[index] = view
+        return view
+
+    def __iter__(self) -> Iterator["LazyModel"]:
+        for i in range(len(self._items)):
+            yield self[i]
+
+    def __repr__(self) -> str:
+        return f"LazyList[{self._model.__name__}]({len(self._items)} items)"
+
+
+class LazyModel:
+    """
+    Read-only view over a raw response dict that validates each field against a pydantic model
+    the first time it is accessed, instead of validating the whole tree up front.
+
+    Nested models and lists of models come back as further lazy views.
+    Call validate() to get the fully validated pydantic model.
+    """
+    __slots__ = ('_model', '_data', '_values')
+
+    def __init__(self, model: Type[BaseModel], data: dict):
+        """
+        :param model: pydantic model describing data
+        :param data: raw response data
+        """
+        if not isinstance(data, dict):
+            raise ValidationError([ErrorWrapper(TypeError(f"expected dict, got {type(data).__name__}"),
+                                                loc='__root__')], model)
+        self._model = model
+        self._data = data
+        self._values = {}
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        value = self._values.get(name, _UNSET)
+        if value is _UNSET:
+            field = self._model.__fields__.get(name)
+            if field is None:
+                raise AttributeError(f"'{self._model.__name__}' object has no attribute '{name}'")
+            value = self._build(field)
+            self._values[name] = value
+        return value
+
+    def _build(self, field: ModelField) -> Any:
+        raw = self._data.get(field.alias, _UNSET)
+        if raw is _UNSET or raw is None:
+            if raw is _UNSET and not field.required:
+                return field.get_default()
+            if raw is None and field.allow_none:
+                return None
+        elif _is_model(field.type_):
+            if field.shape == SHAPE_SINGLETON and isinstance(raw, dict):
+                return LazyModel(model=field.type_, data=raw)
+            if field.shape == SHAPE_LIST and isinstance(raw, list) and all(isinstance(i, dict) for i in raw):
+                return LazyList(model=field.type_, items=raw)
+        value, errors = field.validate(None if raw is _UNSET else raw, {}, loc=field.alias, cls=self._model)
+        if errors:
+            raise ValidationError([errors], self._model)
+        return value
+
+    def __repr__(self) -> str:
+        return f"Lazy{self._model.__name__}({len(self._data)} fields)"
+
+    @property
+    def raw(self) -> dict:
+        return self._data
+
+    def validate(self) -> BaseModel:
+        """
+        Validate the whole underlying data
+        :return: the fully validated pydantic model
+        :rtype: pydantic.BaseModel
+        """
+        return self._model(**self._data)
+
+
+def parse(model: Type[BaseModel], data: dict, lazy: bool = False) -> Union[BaseModel, LazyModel]:
+    """
+    Build a model from raw response data
+    :param model: pydantic model to build
+    :param data: raw response data
+    :param lazy: (Optional) return a LazyModel view rather than validating everything now
+    :return: the model or lazy view
+    :rtype: Union[pydantic.BaseModel, LazyModel]
+    """
+    if lazy:
+        return LazyModel(model=model, data=data)
+    return model(**data)
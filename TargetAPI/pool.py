@@ -0,0 +1,125 @@
+import threading
+from typing import List, Union
+
+import requests
+from requests.adapters import HTTPAdapter, DEFAULT_POOLSIZE, DEFAULT_POOLBLOCK
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+class PoolStats:
+    """
+    Counts of connections opened, reused and discarded by a PooledHTTPAdapter.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def _increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'opened': self.opened,
+            'reused': self.reused,
+            'discarded': self.discarded,
+        }
+
+
+class _CountingPoolMixin:
+    pool_stats: PoolStats = None
+
+    def _validate_conn(self, conn):
+        # called right before every request; a connection without a socket is about to be (re)opened
+        if getattr(conn, 'sock', None) is None:
+            self.pool_stats._increment('opened')
+        else:
+            self.pool_stats._increment('reused')
+        super()._validate_conn(conn)
+
+    def _put_conn(self, conn):
+        if conn is not None and (self.pool is None or self.pool.full()):
+            self.pool_stats._increment('discarded')
+        super()._put_conn(conn)
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    requests adapter with configurable connection pooling that records connection reuse in PoolStats.
+    """
+
+    def __init__(self, pool_connections: int = DEFAULT_POOLSIZE, pool_maxsize: int = DEFAULT_POOLSIZE,
+                 pool_block: bool = DEFAULT_POOLBLOCK, **kwargs):
+        """
+        :param pool_connections: (Optional) number of per-host connection pools to keep
+        :param pool_maxsize: (Optional) maximum number of connections kept open per host
+        :param pool_block: (Optional) wait for a free connection instead of opening (and then discarding) an extra one
+        """
+        self.pool_stats = PoolStats()
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block,
+                         **kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=DEFAULT_POOLBLOCK, **pool_kwargs):
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        stats = self.pool_stats
+        http_pool = type('CountingHTTPConnectionPool', (_CountingPoolMixin, HTTPConnectionPool),
+                         {'pool_stats': stats})
+        https_pool = type('CountingHTTPSConnectionPool', (_CountingPoolMixin, HTTPSConnectionPool),
+                          {'pool_stats': stats})
+        self.poolmanager.pool_classes_by_scheme = {'http': http_pool, 'https': https_pool}
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self.pool_stats = PoolStats()
+
+    def _pool_for(self, url: str, verify: Union[bool, str] = True):
+        # look the pool up the same way requests will when sending, so warmed connections are the ones reused
+        if hasattr(self, 'get_connection_with_tls_context'):
+            request = requests.Request(method='GET', url=url).prepare()
+            return self.get_connection_with_tls_context(request=request, verify=verify)
+        return self.get_connection(url=url)
+
+    def warm_up(self, url: str, connections: int = None, verify: Union[bool, str] = True) -> int:
+        """
+        Open connections to a host ahead of time and return them to the pool
+        :param url: any URL on the host
+        :param connections: (Optional) number of connections to open, defaults to the pool size
+        :param verify: (Optional) TLS verification setting the session will send requests with
+        :return: number of connections opened
+        :rtype: int
+        """
+        pool = self._pool_for(url=url, verify=verify)
+        count = min(connections or self._pool_maxsize, self._pool_maxsize)
+        conns: List = []
+        try:
+            for _ in range(count):
+                conn = pool._get_conn()
+                conns.append(conn)
+                if getattr(conn, 'sock', None) is None:
+                    conn.connect()
+                    self.pool_stats._increment('opened')
+        finally:
+            for conn in conns:
+                pool._put_conn(conn)
+        return len(conns)
+
+
+def make_session(pool_connections: int = DEFAULT_POOLSIZE, pool_maxsize: int = DEFAULT_POOLSIZE,
+                 pool_block: bool = DEFAULT_POOLBLOCK) -> requests.Session:
+    """
+    Create a requests session using a PooledHTTPAdapter for both HTTP and HTTPS
+    :param pool_connections: (Optional) number of per-host connection pools to keep
+    :param pool_maxsize: (Optional) maximum number of connections kept open per host
+    :param pool_block: (Optional) wait for a free connection instead of opening an extra one
+    :return: session
+    :rtype: requests.Session
+    """
+    session = requests.Session()
+    adapter = PooledHTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
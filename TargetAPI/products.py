@@ -1,10 +1,14 @@
 from typing import Union, List
 from datetime import datetime
 
+from TargetAPI.inventory import InventoryMatrix
 from TargetAPI.stores import AvailabilityLocation
 import TargetAPI.helpers as helpers
+from TargetAPI.helpers import Cached, cached_attribute
 
 class Price:
+    __slots__ = ('_data',)
+
     def __init__(self, data: dict):
         self._data = data
 
@@ -18,6 +22,8 @@ class Price:
 
 
 class OnlineInfo:
+    __slots__ = ('_data',)
+
     def __init__(self, data: dict):
         self._data = data
 
@@ -35,6 +41,8 @@ class OnlineInfo:
 
 
 class Promotion:
+    __slots__ = ('_data',)
+
     def __init__(self, data: dict):
         self._data = data
 
@@ -56,6 +64,8 @@ class Promotion:
 
 
 class Feature:
+    __slots__ = ('_data', 'name', 'value')
+
     def __init__(self, data: dict):
         self._data = data
         self.name = data.get('name')
@@ -64,7 +74,9 @@ class Feature:
     def __str__(self):
         return f"{self.name} {self.value}"
 
-class Video:
+class Video(Cached):
+    __slots__ = ('_data',)
+
     def __init__(self, data: dict):
         self._data = data
 
@@ -72,11 +84,13 @@ class Video:
     def title(self) -> str:
         return self._data.get("video_title")
 
-    @property
+    @cached_attribute
     def links(self) -> List[str]:
         return [file.get('video_url') for file in self._data.get('video_files')]
 
-class Availability:
+class Availability(Cached):
+    __slots__ = ('_data', '_target_instance', '_product')
+
     def __init__(self, data: dict, target, product):
         self._data = data
         self._target_instance = target
@@ -109,31 +123,41 @@ class Availability:
     def preorder_quantity(self) -> int:
         return self._data.get('pre_order_available_to_promise_quantity')
 
-    @property
+    @cached_attribute
     def locations(self) -> List[AvailabilityLocation]:
         locations = []
         for loc in self._data.get('locations', []):
             locations.append(AvailabilityLocation(data=loc, target=self._target_instance))
         return locations
 
-    @property
+    def to_frame(self) -> InventoryMatrix:
+        """
+        Load every location's quantities and status into arrays, for fast rollups across thousands of locations
+        :return: inventory matrix keyed by location ID
+        :rtype: InventoryMatrix
+        """
+        return InventoryMatrix(locations=self._data.get('locations', []), target=self._target_instance)
+
+    @cached_attribute
     def release_date(self) -> datetime:
         return helpers.string_to_datetime(date_string=self._data.get('release_date'))
 
-    @property
+    @cached_attribute
     def available_to_purchase_date(self) -> datetime:
         return helpers.string_to_datetime(date_string=self._data.get('available_to_purchase_date_time'))
 
-    @property
+    @cached_attribute
     def back_order_start_date(self) -> datetime:
         return helpers.string_to_datetime(date_string=self._data.get('back_order_start_date'))
 
-    @property
+    @cached_attribute
     def back_order_end_date(self) -> datetime:
         return helpers.string_to_datetime(date_string=self._data.get('back_order_end_date'))
 
 
-class Review:
+class Review(Cached):
+    __slots__ = ('_data',)
+
     def __init__(self, data: dict):
         self._data = data
 
@@ -141,7 +165,7 @@ class Review:
     def title(self) -> str:
         return self._data.get('title')
 
-    @property
+    @cached_attribute
     def submitted_at(self) -> datetime:
         return helpers.string_to_datetime(date_string=self._data.get('submissionTime'), template="%Y-%m-%dT%H:%M:%S+0000")
 
@@ -166,7 +190,9 @@ class Review:
         return self._data.get('reviewType')
 
 
-class ReviewSummary:
+class ReviewSummary(Cached):
+    __slots__ = ('_data',)
+
     def __init__(self, data: dict):
         self._data = data
 
@@ -178,7 +204,7 @@ class ReviewSummary:
     def average(self) -> float:
         return self._data.get('overallGuestRating')
 
-    @property
+    @cached_attribute
     def most_helpful(self) -> List[Review]:
         reviews = []
         for review in self._data.get('mostHelpfulReviews'):
@@ -190,7 +216,9 @@ class ReviewSummary:
         return self._data.get('ratingDistribution')
 
 
-class Product:
+class Product(Cached):
+    __slots__ = ('_data', '_target_instance', 'store')
+
     def __init__(self, data: dict, target, store = None):
         self._data = data
         self._target_instance = target
@@ -236,25 +264,25 @@ class Product:
     def type(self) -> str:
         return self._data.get('itemType')
 
-    @property
+    @cached_attribute
     def price(self) -> Union[Price, None]:
         if self._data.get('price'):
             return Price(data=self._data.get('price'))
         return None
 
-    @property
+    @cached_attribute
     def online(self) -> Union[OnlineInfo, None]:
         if self._data.get('onlineInfo'):
             return OnlineInfo(data=self._data.get('onlineInfo'))
         return None
 
-    @property
+    @cached_attribute
     def promotions(self) -> List[Promotion]:
         if not self._data.get('promotions'):
             return []
         return [Promotion(data=promo) for promo in self._data.get('promotions')]
 
-    @property
+    @cached_attribute
     def features(self) -> List[Feature]:
         if not self._data.get('features'):
             return []
@@ -270,7 +298,7 @@ class Product:
     def channels(self) -> str:
         return self._data.get('channelAvailabilityCode')
 
-    @property
+    @cached_attribute
     def reviews(self) -> ReviewSummary:
         return ReviewSummary(data=self._data.get('guestReviews'))
 
@@ -300,7 +328,7 @@ class Product:
             return self._data['images'].get('primaryUri')
         return ""
 
-    @property
+    @cached_attribute
     def videos(self) -> List[Video]:
         videos = []
         for vid in self._data.get('videos'):
@@ -319,12 +347,12 @@ class Product:
     def max_allowed(self) -> int:
         return self._data.get('maxAllowedQuantity')
 
-    @property
+    @cached_attribute
     def weight(self) -> str:
         if self._data.get('package_dimensions'):
             return f"{self._data['package_dimensions'].get('weight')} {self._data['package_dimensions'].get('weight_unit_of_measure')}"
         return ""
 
-    @property
+    @cached_attribute
     def launch_date(self) -> datetime:
         return helpers.string_to_datetime(date_string=self._data.get('launchDate'), template="%Y-%m-%dT%H:%M:%S+0000")
@@ -0,0 +1,262 @@
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, List, Tuple, Union
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows `rate` requests per second on average, with bursts of up to `burst`.
+    """
+
+    def __init__(self, rate: float, burst: float = None, clock: Callable[[], float] = time.monotonic):
+        """
+        :param rate: tokens added per second
+        :param burst: (Optional) bucket capacity, defaults to rate (one second's worth)
+        :param clock: (Optional) monotonic time source
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Take tokens from the bucket, going into debt if necessary
+        :param tokens: (Optional) number of tokens to take
+        :return: seconds the caller must wait before using them
+        :rtype: float
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+
+class RateLimiter:
+    """
+    Client-side request rate limits per host and per endpoint, shareable between any number of clients.
+    """
+
+    def __init__(self, host_rate: float = None, endpoint_rates: Dict[str, float] = None, burst: float = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        """
+        :param host_rate: (Optional) requests per second allowed to each host
+        :param endpoint_rates: (Optional) requests per second allowed to each endpoint,
+        by endpoint or endpoint suffix, e.g. {"pdp_client_v1": 20}
+        :param burst: (Optional) bucket capacity, defaults to one second's worth of requests
+        :param clock: (Optional) monotonic time source
+        :param sleep: (Optional) function used to wait for tokens
+        """
+        self.host_rate = host_rate
+        self.endpoint_rates = dict(endpoint_rates or {})
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+
+    def _bucket(self, key: tuple, rate: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = TokenBucket(rate=rate, burst=self.burst, clock=self._clock)
+                    self._buckets[key] = bucket
+        return bucket
+
+    def _endpoint_rate(self, endpoint: str) -> Union[float, None]:
+        if endpoint in self.endpoint_rates:
+            return self.endpoint_rates[endpoint]
+        for name, rate in self.endpoint_rates.items():
+            if endpoint.endswith(name):
+                return rate
+        return None
+
+    def reserve(self, host: str, endpoint: str) -> float:
+        """
+        Reserve one request to an endpoint
+        :param host: host the request is for
+        :param endpoint: endpoint the request is for
+        :return: seconds to wait before sending it
+        :rtype: float
+        """
+        delay = 0.0
+        if self.host_rate:
+            delay = self._bucket(('host', host), self.host_rate).reserve()
+        endpoint_rate = self._endpoint_rate(endpoint)
+        if endpoint_rate:
+            delay = max(delay, self._bucket(('endpoint', host, endpoint), endpoint_rate).reserve())
+        if delay:
+            with self._lock:
+                self.waited_seconds += delay
+        return delay
+
+    def acquire(self, host: str, endpoint: str):
+        delay = self.reserve(host=host, endpoint=endpoint)
+        if delay > 0:
+            self._sleep(delay)
+
+    async def acquire_async(self, host: str, endpoint: str):
+        delay = self.reserve(host=host, endpoint=endpoint)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits concurrent requests with additive-increase / multiplicative-decrease (AIMD).
+
+    Every healthy response grows the limit by roughly `increase` per limit's worth of responses.
+    A throttled (429) or failed response, or a latency spike, cuts the limit by `decrease_factor`,
+    at most once per `cooldown` seconds so one burst of failures counts as one congestion signal.
+    """
+
+    def __init__(self, initial_limit: int = 8, min_limit: int = 1, max_limit: int = 256, increase: float = 1.0,
+                 decrease_factor: float = 0.5, latency_threshold: float = None, spike_ratio: float = 2.0,
+                 cooldown: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        """
+        :param initial_limit: (Optional) starting concurrency
+        :param min_limit: (Optional) lowest allowed concurrency
+        :param max_limit: (Optional) highest allowed concurrency
+        :param increase: (Optional) concurrency added per limit's worth of healthy responses
+        :param decrease_factor: (Optional) multiplier applied to the limit on congestion
+        :param latency_threshold: (Optional) seconds above which a response counts as a latency spike
+        :param spike_ratio: (Optional) without a threshold, a response slower than this multiple of the
+        smoothed baseline latency counts as a latency spike
+        :param cooldown: (Optional) minimum seconds between decreases
+        :param clock: (Optional) monotonic time source
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_threshold = latency_threshold
+        self.spike_ratio = spike_ratio
+        self.cooldown = cooldown
+        self._clock = clock
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._baseline = None
+        self._last_decrease = None
+        self._condition = threading.Condition()
+        # (event loop, future) of each coroutine waiting in acquire_async
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self.increases = 0
+        self.decreases = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def try_acquire(self) -> bool:
+        with self._condition:
+            if self._in_flight >= self.limit:
+                return False
+            self._in_flight += 1
+            return True
+
+    def acquire(self, timeout: float = None) -> bool:
+        """
+        Wait for a free concurrency slot
+        :param timeout: (Optional) maximum seconds to wait
+        :return: whether a slot was acquired
+        :rtype: bool
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._in_flight < self.limit, timeout=timeout):
+                return False
+            self._in_flight += 1
+            return True
+
+    async def acquire_async(self):
+        """
+        Wait for a free concurrency slot without blocking the event loop; woken by release(), from any thread
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self._in_flight < self.limit:
+                    self._in_flight += 1
+                    return
+                waiter = (loop, loop.create_future())
+                self._async_waiters.append(waiter)
+            try:
+                await waiter[1]
+            finally:
+                with self._condition:
+                    if waiter in self._async_waiters:
+                        self._async_waiters.remove(waiter)
+
+    def _is_spike(self, latency: float) -> bool:
+        if self.latency_threshold is not None:
+            return latency > self.latency_threshold
+        baseline = self._baseline
+        # slow-moving average, so one spike doesn't become the new normal
+        self._baseline = latency if baseline is None else baseline * 0.95 + latency * 0.05
+        return baseline is not None and latency > baseline * self.spike_ratio
+
+    def release(self, latency: float = None, congested: bool = False):
+        """
+        Return a slot and adjust the limit
+        :param latency: (Optional) seconds the request took
+        :param congested: (Optional) whether the request was throttled or failed
+        """
+        with self._condition:
+            self._in_flight -= 1
+            spike = latency is not None and self._is_spike(latency)
+            if congested or spike:
+                now = self._clock()
+                if self._last_decrease is None or now - self._last_decrease >= self.cooldown:
+                    self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+                    self._last_decrease = now
+                    self.decreases += 1
+            else:
+                self._limit = min(float(self.max_limit), self._limit + self.increase / self._limit)
+                self.increases += 1
+            self._condition.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                # the waiter's event loop has been closed
+                pass
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'limit': self.limit,
+            'in_flight': self._in_flight,
+            'increases': self.increases,
+            'decreases': self.decreases,
+        }
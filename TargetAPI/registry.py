@@ -0,0 +1,97 @@
+from typing import Union, List, Dict, Tuple, Iterator
+
+from TargetAPI.location_table import LocationTable
+from TargetAPI.models import Location
+from TargetAPI.search_index import LocationSearchIndex
+from TargetAPI.spatial import SpatialIndex
+
+STORE = "STORE"
+VENDOR = "VENDOR"
+SELLER = "SELLER_LOCATION"
+
+
+def _index(locations: Tuple[Location, ...], attribute: str) -> Dict[str, Tuple[Location, ...]]:
+    index = {}
+    for location in locations:
+        index.setdefault(getattr(location, attribute), []).append(location)
+    return {key: tuple(values) for key, values in index.items()}
+
+
+class LocationRegistry:
+    """
+    Read-only index over a list of locations, built once so lookups by ID, type, region or postal code are O(1).
+    """
+
+    def __init__(self, locations: Union[List[Location], LocationTable]):
+        """
+        :param locations: locations to index; lookups return LocationRow views when given a LocationTable
+        """
+        self.source = locations
+        self._locations = tuple(locations)
+        self._by_id = {str(location.location_id): location for location in self._locations}
+        self._by_type = _index(self._locations, 'location_type')
+        self._by_region = _index(self._locations, 'region')
+        self._by_postal_code = _index(self._locations, 'postal_code')
+        self._store_spatial_index = None
+        self._store_search_index = None
+        self._table = None
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __iter__(self) -> Iterator[Location]:
+        return iter(self._locations)
+
+    def __contains__(self, location_id) -> bool:
+        return str(location_id) in self._by_id
+
+    def get(self, location_id: Union[str, int]) -> Union[Location, None]:
+        if location_id is None:
+            return None
+        return self._by_id.get(str(location_id))
+
+    def by_type(self, location_type: str) -> Tuple[Location, ...]:
+        return self._by_type.get(location_type, ())
+
+    def by_region(self, region: str) -> Tuple[Location, ...]:
+        return self._by_region.get(region, ())
+
+    def by_postal_code(self, postal_code: str) -> Tuple[Location, ...]:
+        return self._by_postal_code.get(postal_code, ())
+
+    @property
+    def locations(self) -> Tuple[Location, ...]:
+        return self._locations
+
+    @property
+    def stores(self) -> Tuple[Location, ...]:
+        return self.by_type(STORE)
+
+    @property
+    def vendors(self) -> Tuple[Location, ...]:
+        return self.by_type(VENDOR)
+
+    @property
+    def sellers(self) -> Tuple[Location, ...]:
+        return self.by_type(SELLER)
+
+    @property
+    def store_spatial_index(self) -> SpatialIndex:
+        if self._store_spatial_index is None:
+            self._store_spatial_index = SpatialIndex(locations=self.stores)
+        return self._store_spatial_index
+
+    @property
+    def store_search_index(self) -> LocationSearchIndex:
+        if self._store_search_index is None:
+            self._store_search_index = LocationSearchIndex(locations=self.stores)
+        return self._store_search_index
+
+    @property
+    def table(self) -> LocationTable:
+        if self._table is None:
+            if isinstance(self.source, LocationTable):
+                self._table = self.source
+            else:
+                self._table = LocationTable.from_locations(locations=self._locations)
+        return self._table
@@ -0,0 +1,174 @@
+import random
+import threading
+import time
+from collections import deque
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Union, Callable, Iterable, Tuple, Type
+
+import requests
+
+DEFAULT_RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+DEFAULT_RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+def parse_retry_after(value: Union[str, None], clock: Callable[[], float] = time.time) -> Union[float, None]:
+    """
+    Parse a Retry-After header
+    :param value: header value, either a number of seconds or an HTTP date
+    :param clock: (Optional) wall clock time source
+    :return: seconds to wait, or None if the header is missing or invalid
+    :rtype: Union[float, None]
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, date.timestamp() - clock())
+
+
+class RetryBudget:
+    """
+    Caps retries at a fraction of recent requests, so retries can't multiply load on a struggling upstream.
+
+    Within a sliding window, retries are allowed while they number fewer than
+    min_retries_per_second * window + ratio * requests made in the window.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries_per_second: float = 1.0, window: float = 10.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param ratio: (Optional) retries allowed per request made
+        :param min_retries_per_second: (Optional) retries always allowed regardless of traffic
+        :param window: (Optional) seconds of history to consider
+        :param clock: (Optional) monotonic time source
+        """
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.window = window
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._requests = deque()
+        self._retries = deque()
+        self.exhausted = 0
+
+    def _prune(self, now: float):
+        cutoff = now - self.window
+        while self._requests and self._requests[0] <= cutoff:
+            self._requests.popleft()
+        while self._retries and self._retries[0] <= cutoff:
+            self._retries.popleft()
+
+    def record_request(self):
+        with self._lock:
+            now = self._clock()
+            self._prune(now)
+            self._requests.append(now)
+
+    def try_retry(self) -> bool:
+        """
+        Spend from the budget for one retry
+        :return: whether the retry is allowed
+        :rtype: bool
+        """
+        with self._lock:
+            now = self._clock()
+            self._prune(now)
+            allowed = self.min_retries_per_second * self.window + self.ratio * len(self._requests)
+            if len(self._retries) >= allowed:
+                self.exhausted += 1
+                return False
+            self._retries.append(now)
+            return True
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            self._prune(self._clock())
+            return {
+                'requests': len(self._requests),
+                'retries': len(self._retries),
+                'exhausted': self.exhausted,
+            }
+
+
+DEFAULT_RETRY_BUDGET = RetryBudget()
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a failed request:
+    exponential backoff with full jitter, honouring Retry-After, limited per call and by a shared RetryBudget.
+    """
+
+    def __init__(self, max_attempts: int = 3, statuses: Iterable[int] = DEFAULT_RETRY_STATUSES,
+                 exceptions: Tuple[Type[BaseException], ...] = DEFAULT_RETRY_EXCEPTIONS, base_delay: float = 0.5,
+                 max_delay: float = 30.0, max_retry_after: float = 60.0, budget: RetryBudget = DEFAULT_RETRY_BUDGET,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        :param max_attempts: (Optional) maximum number of attempts per call, including the first
+        :param statuses: (Optional) HTTP status codes to retry
+        :param exceptions: (Optional) request exceptions to retry
+        :param base_delay: (Optional) backoff ceiling in seconds for the first retry, doubled for each retry after it
+        :param max_delay: (Optional) largest backoff ceiling in seconds
+        :param max_retry_after: (Optional) give up rather than honour a Retry-After longer than this many seconds
+        :param budget: (Optional) retry budget; defaults to one shared by every client in the process.
+        Pass None to disable the budget.
+        :param sleep: (Optional) function used to wait between attempts
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.statuses = frozenset(statuses)
+        self.exceptions = tuple(exceptions)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.budget = budget
+        self.sleep = sleep
+
+    def backoff(self, attempt: int, retry_after: float = None) -> float:
+        """
+        Seconds to wait after a failed attempt
+        :param attempt: number of the attempt that failed, starting at 1
+        :param retry_after: (Optional) server-requested delay in seconds
+        :return: delay in seconds
+        :rtype: float
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def should_retry(self, attempt: int, status_code: int = None, retry_after: float = None) -> bool:
+        """
+        Whether to make another attempt; spends from the retry budget if so
+        :param attempt: number of the attempt that failed, starting at 1
+        :param status_code: (Optional) status code of the failed attempt, None for an exception
+        :param retry_after: (Optional) server-requested delay in seconds
+        :return: whether to retry
+        :rtype: bool
+        """
+        if attempt >= self.max_attempts:
+            return False
+        if status_code is not None and status_code not in self.statuses:
+            return False
+        if retry_after is not None and retry_after > self.max_retry_after:
+            return False
+        if self.budget is not None and not self.budget.try_retry():
+            return False
+        return True
+
+    def record_request(self):
+        if self.budget is not None:
+            self.budget.record_request()
+
+
+NO_RETRY = RetryPolicy(max_attempts=1, budget=None)
@@ -0,0 +1,109 @@
+import re
+from bisect import bisect_left
+from typing import List, Iterable, Set, FrozenSet
+
+from TargetAPI.models import Location
+
+SEARCH_FIELDS = ('location_name', 'city', 'address_line_1', 'region', 'postal_code')
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase alphanumeric tokens
+    :param text: text to split
+    :return: list of tokens
+    :rtype: List[str]
+    """
+    if not text:
+        return []
+    return _TOKEN.findall(text.lower())
+
+
+class LocationSearchIndex:
+    """
+    Case-insensitive inverted index over location names and addresses.
+
+    Every query token is matched as a prefix of an indexed token, and a location must match every query token.
+    Postings for short prefixes are precomputed; longer prefixes are resolved with a binary search over the
+    sorted vocabulary, so each query only touches the tokens that can match.
+    """
+
+    def __init__(self, locations: Iterable[Location], fields: Iterable[str] = SEARCH_FIELDS,
+                 prefix_length: int = 3):
+        """
+        :param locations: locations to index
+        :param fields: (Optional) location attributes to index
+        :param prefix_length: (Optional) length up to which prefix postings are precomputed
+        """
+        self._locations = list(locations)
+        self._prefix_length = prefix_length
+        postings = {}
+        for position, location in enumerate(self._locations):
+            for field in fields:
+                for token in tokenize(getattr(location, field, None)):
+                    postings.setdefault(token, set()).add(position)
+        self._postings = {token: frozenset(positions) for token, positions in postings.items()}
+        self._vocabulary = sorted(self._postings)
+        prefixes = {}
+        for token, positions in self._postings.items():
+            for length in range(1, min(len(token), prefix_length) + 1):
+                prefixes.setdefault(token[:length], set()).update(positions)
+        self._prefixes = {prefix: frozenset(positions) for prefix, positions in prefixes.items()}
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def _vocabulary_range(self, prefix: str) -> List[str]:
+        start = bisect_left(self._vocabulary, prefix)
+        end = bisect_left(self._vocabulary, prefix + "\uffff", lo=start)
+        return self._vocabulary[start:end]
+
+    def _matching(self, prefix: str) -> FrozenSet[int]:
+        if len(prefix) <= self._prefix_length:
+            return self._prefixes.get(prefix, frozenset())
+        tokens = self._vocabulary_range(prefix)
+        if len(tokens) == 1:
+            return self._postings[tokens[0]]
+        positions: Set[int] = set()
+        for token in tokens:
+            positions.update(self._postings[token])
+        return frozenset(positions)
+
+    def search(self, query: str, limit: int = None) -> List[Location]:
+        """
+        Find locations matching every token in a query
+        :param query: space-separated words or word prefixes, e.g. "minn nicollet" or "55403";
+        an empty or blank query matches every location
+        :param limit: (Optional) maximum number of locations to return
+        :return: matching locations, in their original order
+        :rtype: List[Location]
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return list(self._locations[:limit])
+        matches = sorted((self._matching(token) for token in set(tokens)), key=len)
+        positions = matches[0]
+        for other in matches[1:]:
+            if not positions:
+                break
+            positions = positions & other
+        positions = sorted(positions)
+        if limit is not None:
+            positions = positions[:limit]
+        return [self._locations[position] for position in positions]
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Complete a partial word from the indexed vocabulary
+        :param prefix: start of a word
+        :param limit: (Optional) maximum number of words to return
+        :return: indexed words starting with prefix, most common first
+        :rtype: List[str]
+        """
+        tokens = tokenize(prefix)
+        if not tokens:
+            return []
+        words = self._vocabulary_range(tokens[-1])
+        return sorted(words, key=lambda word: (-len(self._postings[word]), word))[:limit]
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Callable, Union, List
+
+import requests
+
+from TargetAPI.location_table import LocationTable
+from TargetAPI.models import Location
+
+
+class LocationSnapshot:
+    """
+    On-disk copy of the ship_locations/v1 response, so new processes can load the location list
+    without downloading and validating it again.
+
+    The snapshot records the response's ETag, Last-Modified and a SHA-256 of the body,
+    which are used to revalidate it and to only rewrite the file when the upstream content changes.
+    """
+
+    def __init__(self, cache_dir: str, max_age: float = 86400, filename: str = "ship_locations.json",
+                 compact: bool = False):
+        """
+        :param cache_dir: directory to store the snapshot in
+        :param max_age: (Optional) seconds after which the snapshot should be revalidated
+        :param filename: (Optional) name of the snapshot file
+        :param compact: (Optional) drop the location data from memory once it has been turned into a LocationTable,
+            rereading the file if the snapshot has to be rewritten
+        """
+        self.path = os.path.join(os.path.expanduser(cache_dir), filename)
+        self.max_age = max_age
+        self.compact = compact
+        self.etag = None
+        self.last_modified = None
+        self.fetched_at = 0.0
+        self.digest = None
+        self._data = None
+
+    def load(self) -> bool:
+        """
+        Read the snapshot from disk
+        :return: whether a snapshot was loaded
+        :rtype: bool
+        """
+        try:
+            with open(self.path, 'r') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return False
+        self.etag = snapshot.get('etag')
+        self.last_modified = snapshot.get('last_modified')
+        # the file's mtime records when the snapshot was last confirmed fresh
+        self.fetched_at = os.path.getmtime(self.path)
+        self.digest = snapshot.get('sha256')
+        self._data = snapshot.get('locations') or []
+        return bool(self._data)
+
+    @property
+    def locations(self) -> List[Location]:
+        # data was validated before it was written, so skip validation on the way back in
+        return [Location.construct(**loc) for loc in self._data or []]
+
+    @property
+    def table(self) -> LocationTable:
+        table = LocationTable.from_dicts(data=self._data or [])
+        if self.compact:
+            self._data = None
+        return table
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    @property
+    def is_stale(self) -> bool:
+        return self.age > self.max_age
+
+    @property
+    def conditional_headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def update(self, res: requests.Response, decode: Callable[[bytes], Any] = None,
+               parse: Callable[[list], Union[List[Location], LocationTable]] = None) \
+            -> Union[List[Location], LocationTable, None]:
+        """
+        Store a ship_locations/v1 response
+        :param res: response to store
+        :param decode: (Optional) JSON decoder for the response body, e.g. the client's, so it is timed and measured
+        :param parse: (Optional) function building the locations, or a LocationTable, from the decoded data
+        :return: the new locations if the content changed, otherwise None
+        :rtype: Union[List[Location], LocationTable, None]
+        """
+        if res.status_code == 304:
+            self.touch()
+            return None
+        digest = hashlib.sha256(res.content).hexdigest()
+        validators = (res.headers.get('ETag'), res.headers.get('Last-Modified'))
+        if digest == self.digest:
+            if validators != (self.etag, self.last_modified):
+                self.etag, self.last_modified = validators
+                self._write()
+            else:
+                self.touch()
+            return None
+        data = decode(res.content) if decode is not None else json.loads(res.content)
+        locations = parse(data) if parse is not None else [Location(**loc) for loc in data]
+        self.etag, self.last_modified = validators
+        self.digest = digest
+        self._data = [loc.dict() for loc in locations]
+        self._write()
+        if self.compact:
+            self._data = None
+        return locations
+
+    def touch(self):
+        """
+        Mark the snapshot as fresh without rewriting it
+        """
+        self.fetched_at = time.time()
+        if os.path.exists(self.path):
+            os.utime(self.path, (self.fetched_at, self.fetched_at))
+
+    def _stored_locations(self) -> list:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f).get('locations') or []
+        except (OSError, ValueError):
+            return []
+
+    def _write(self):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        snapshot = {
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'sha256': self.digest,
+            'locations': self._data if self._data is not None else self._stored_locations(),
+        }
+        # write to a temporary file and swap it in, so readers never see a partial snapshot
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".ship_locations.")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.path)
+            self.fetched_at = os.path.getmtime(self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
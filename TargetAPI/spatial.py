@@ -0,0 +1,148 @@
+import heapq
+import math
+from typing import List, Tuple, Iterable, Dict
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from TargetAPI.models import Location
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE_LATITUDE = 69.0
+
+
+def _coordinates(location: Location) -> Tuple[float, float]:
+    try:
+        latitude, longitude = float(location.latitude), float(location.longitude)
+    except (TypeError, ValueError):
+        return math.nan, math.nan
+    return latitude, longitude
+
+
+def haversine_miles(latitude_1: float, longitude_1: float, latitude_2: float, longitude_2: float) -> float:
+    """
+    Great-circle distance between two points
+    :param latitude_1: latitude of the first point, in degrees
+    :param longitude_1: longitude of the first point, in degrees
+    :param latitude_2: latitude of the second point, in degrees
+    :param longitude_2: longitude of the second point, in degrees
+    :return: distance in miles
+    :rtype: float
+    """
+    phi_1, phi_2 = math.radians(latitude_1), math.radians(latitude_2)
+    d_phi = phi_2 - phi_1
+    d_lambda = math.radians(longitude_2 - longitude_1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi_1) * math.cos(phi_2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(a)))
+
+
+class SpatialIndex:
+    """
+    Nearest-location index over the numeric coordinates of a list of locations.
+
+    Coordinates are parsed once into arrays and bucketed into a grid of cell_degrees-sized cells.
+    Radius queries only look at cells that can contain matches; distances are computed with a vectorized
+    haversine when NumPy is installed, falling back to pure Python otherwise.
+    Locations without valid coordinates are left out.
+    """
+
+    def __init__(self, locations: Iterable[Location], cell_degrees: float = 1.0):
+        """
+        :param locations: locations to index
+        :param cell_degrees: (Optional) size of a grid cell, in degrees
+        """
+        self._cell = cell_degrees
+        self._locations = []
+        latitudes, longitudes = [], []
+        for location in locations:
+            latitude, longitude = _coordinates(location)
+            if math.isnan(latitude) or math.isnan(longitude):
+                continue
+            self._locations.append(location)
+            latitudes.append(latitude)
+            longitudes.append(longitude)
+        self._latitudes = latitudes
+        self._longitudes = longitudes
+        cells = {}
+        for i, (latitude, longitude) in enumerate(zip(latitudes, longitudes)):
+            cells.setdefault(self._cell_of(latitude, longitude), []).append(i)
+        self._cells: Dict[Tuple[int, int], list] = cells
+        if np is not None:
+            self._latitudes_rad = np.radians(np.asarray(latitudes, dtype=np.float64))
+            self._longitudes_rad = np.radians(np.asarray(longitudes, dtype=np.float64))
+            self._cos_latitudes = np.cos(self._latitudes_rad)
+            self._cells = {cell: np.asarray(indexes, dtype=np.intp) for cell, indexes in cells.items()}
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def _cell_of(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return math.floor(latitude / self._cell), math.floor(longitude / self._cell)
+
+    def _candidates(self, latitude: float, longitude: float, radius_miles: float):
+        d_lat = radius_miles / MILES_PER_DEGREE_LATITUDE
+        cos_lat = max(math.cos(math.radians(min(89.0, abs(latitude) + d_lat))), 1e-6)
+        d_lon = min(180.0, d_lat / cos_lat)
+        lat_min, lon_min = self._cell_of(latitude - d_lat, longitude - d_lon)
+        lat_max, lon_max = self._cell_of(latitude + d_lat, longitude + d_lon)
+        if d_lon >= 180.0:
+            lon_cells = None
+        else:
+            lon_cells = set(range(lon_min, lon_max + 1))
+        return [indexes for (cell_lat, cell_lon), indexes in self._cells.items()
+                if lat_min <= cell_lat <= lat_max and (lon_cells is None or cell_lon in lon_cells)]
+
+    def _distances(self, latitude: float, longitude: float, indexes=None):
+        phi = math.radians(latitude)
+        lam = math.radians(longitude)
+        lats, lons, coss = self._latitudes_rad, self._longitudes_rad, self._cos_latitudes
+        if indexes is not None:
+            lats, lons, coss = lats[indexes], lons[indexes], coss[indexes]
+        a = np.sin((lats - phi) / 2) ** 2 + math.cos(phi) * coss * np.sin((lons - lam) / 2) ** 2
+        return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    def nearest(self, latitude: float, longitude: float, k: int = 10, radius_miles: float = None) \
+            -> List[Tuple[Location, float]]:
+        """
+        Find the locations closest to a point
+        :param latitude: latitude of the point, in degrees
+        :param longitude: longitude of the point, in degrees
+        :param k: (Optional) maximum number of locations to return
+        :param radius_miles: (Optional) only return locations within this many miles
+        :return: list of (location, distance in miles) tuples, closest first
+        :rtype: List[Tuple[Location, float]]
+        """
+        if k <= 0 or not self._locations:
+            return []
+        if np is None:
+            return self._nearest_python(latitude, longitude, k, radius_miles)
+        if radius_miles is not None:
+            cells = self._candidates(latitude, longitude, radius_miles)
+            if not cells:
+                return []
+            indexes = np.concatenate(cells)
+            distances = self._distances(latitude, longitude, indexes)
+            mask = distances <= radius_miles
+            indexes, distances = indexes[mask], distances[mask]
+        else:
+            indexes = np.arange(len(self._locations))
+            distances = self._distances(latitude, longitude)
+        if len(distances) > k:
+            top = np.argpartition(distances, k - 1)[:k]
+            indexes, distances = indexes[top], distances[top]
+        order = np.argsort(distances, kind='stable')
+        return [(self._locations[i], float(d)) for i, d in zip(indexes[order], distances[order])]
+
+    def _nearest_python(self, latitude: float, longitude: float, k: int, radius_miles: float = None) \
+            -> List[Tuple[Location, float]]:
+        if radius_miles is not None:
+            indexes = [i for cell in self._candidates(latitude, longitude, radius_miles) for i in cell]
+        else:
+            indexes = range(len(self._locations))
+        distances = ((haversine_miles(latitude, longitude, self._latitudes[i], self._longitudes[i]), i)
+                     for i in indexes)
+        if radius_miles is not None:
+            distances = (item for item in distances if item[0] <= radius_miles)
+        return [(self._locations[i], d) for d, i in heapq.nsmallest(k, distances)]
@@ -1,4 +1,9 @@
+from TargetAPI.helpers import Cached, cached_attribute
+
+
 class Store:
+    __slots__ = ('_data', '_target_instance')
+
     def __init__(self, data: dict, target):
         self._data = data
         self._target_instance = target
@@ -55,11 +60,16 @@ class Store:
         return self._target_instance.redsky.search_products(keyword=keyword, store_id=self.id, store_search=store_search, sort_by=sort_by)
 
 
-class AvailabilityLocation:
+class AvailabilityLocation(Cached):
+    __slots__ = ('_data', '_target_instance')
+
     def __init__(self, data: dict, target):
         self._data = data
         self._target_instance = target
-        self.store = self._target_instance._store_by_id(store_id=self._data.get('location_id'))
+
+    @cached_attribute
+    def store(self):
+        return self._target_instance._store_by_id(store_id=self._data.get('location_id'))
 
     @property
     def onhand(self) -> int:
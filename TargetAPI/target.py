@@ -1,8 +1,29 @@
-from typing import Union, List
-from urllib.parse import urlencode
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Union, List, Iterable, Iterator, Tuple, Callable, Any
+from urllib.parse import urlencode, urlsplit
+
+import multiprocessing
+import threading
+import time
 
 import requests
+import urllib3
 
+from TargetAPI.cache import ResponseCache, make_key
+from TargetAPI.coalesce import SingleFlight
+from TargetAPI.decoders import Decoder, Timings, get_decoder
+from TargetAPI.fingerprint import FingerprintStore, UNCHANGED
+from TargetAPI.exceptions import TargetAPIError, NetworkError, error_for_status
+from TargetAPI.location_table import LocationTable
+from TargetAPI.metrics import Metrics, DECODE, VALIDATION
+from TargetAPI.pool import PooledHTTPAdapter, PoolStats, make_session
+from TargetAPI.rate_limit import RateLimiter, AdaptiveConcurrencyLimiter
+from TargetAPI.registry import LocationRegistry, STORE
+from TargetAPI.retry import RetryPolicy, parse_retry_after
+from TargetAPI.snapshot import LocationSnapshot
+from TargetAPI.watcher import StockWatcher
+from TargetAPI.models.lazy import LazyModel, parse
 from TargetAPI.models import SearchResults, OnlineAvailabilityResults, OnlineProduct, \
     StoreAvailabilityResults, StoreProduct, StoreProductChild, SearchProduct, Location
 
@@ -15,24 +36,264 @@ def _make_url(base: str, endpoint: str):
     return f"{base}/{endpoint}"
 
 
+def _bounded_map(func: Callable, items: Iterable, max_workers: int, ordered: bool = False) -> Iterator[Tuple[Any, Any]]:
+    """
+    Run func over items on a thread pool, keeping at most 2 * max_workers calls queued at once
+    :param func: function to call with each item
+    :param items: items to process
+    :param max_workers: number of worker threads
+    :param ordered: (Optional) yield results in input order rather than completion order
+    :return: iterator of (item, result) tuples
+    """
+    items = iter(items)
+    window = max(1, max_workers) * 2
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        if ordered:
+            queue = deque()
+            try:
+                for item in items:
+                    queue.append((item, executor.submit(func, item)))
+                    if len(queue) >= window:
+                        item, future = queue.popleft()
+                        yield item, future.result()
+                while queue:
+                    item, future = queue.popleft()
+                    yield item, future.result()
+            finally:
+                for _, future in queue:
+                    future.cancel()
+        else:
+            pending = {}
+            try:
+                for item in items:
+                    pending[executor.submit(func, item)] = item
+                    while len(pending) >= window:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield pending.pop(future), future.result()
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield pending.pop(future), future.result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+
+# errors that fail one item of a fan-out or batch rather than the whole thing;
+# ValueError covers JSON decoding and pydantic validation errors
+ITEM_ERRORS = (TargetAPIError, ValueError)
+
+SEARCH_ENDPOINT = 'redsky_aggregations/v1/web/plp_search_v1'
+ONLINE_AVAILABILITY_ENDPOINT = 'redsky_aggregations/v1/web_platform/product_fulfillment_v1'
+STORE_AVAILABILITY_ENDPOINT = 'redsky_aggregations/v1/web/pdp_client_v1'
+LOCATIONS_ENDPOINT = 'ship_locations/v1'
+
+
+def _redsky_params(**kwargs) -> dict:
+    params = {
+        'channel': 'WEB',
+        'page': '/s/none',
+        'visitor_id': 1,
+        'is_bot': False,
+    }
+    params.update(kwargs)
+    return params
+
+
+def _search_params(keyword: str, store_id: str = None, store_search: bool = False, sort_by: str = "relevance",
+                   page: int = 1, offset: int = None) -> dict:
+    params = {
+        'keyword': keyword,
+        'pricing_store_id': store_id if store_id else 1928,
+        'pageNumber': page,
+        'storeSearch': store_search,
+        'sortBy': sort_by,
+        'pricing_context': 'digital' if not store_id else 'in_store',
+    }
+    if offset:
+        params['offset'] = offset
+    return params
+
+
+def _parse_search_page(data: dict, lazy: bool = False) -> Union[SearchResults, LazyModel, None]:
+    if data:
+        return parse(model=SearchResults, data=data, lazy=lazy)
+    return None
+
+
+def _parse_search(data: dict, lazy: bool = False) -> List[SearchProduct]:
+    results = _parse_search_page(data=data, lazy=lazy)
+    if results:
+        return results.data.search.products
+    return []
+
+
+def _next_search_page(results: Union[SearchResults, None], page: int, max_pages: int = None) -> Union[Tuple[int, int], None]:
+    """
+    Work out which page of a search comes after the given one
+    :param results: the parsed search page
+    :param page: the page number of results
+    :param max_pages: (Optional) maximum number of pages to return in total
+    :return: (page number, offset) of the next page, or None if there are no more pages
+    :rtype: Union[Tuple[int, int], None]
+    """
+    if not results or not results.data.search.products:
+        return None
+    if max_pages is not None and page >= max_pages:
+        return None
+    metadata = results.data.search.search_response.typed_metadata
+    if page >= metadata.total_pages:
+        return None
+    return page + 1, metadata.offset + metadata.count
+
+
+def _product_availability_params(product: SearchProduct) -> dict:
+    return {
+        'tcin': product.tcin,
+        'pricing_context': 'digital',
+        'pricing_store_id': 1928,  # default value
+    }
+
+
+def _parse_product_availability(data: dict, lazy: bool = False) -> Union[OnlineProduct, None]:
+    if data:
+        availability_results = parse(model=OnlineAvailabilityResults, data=data, lazy=lazy)
+        return availability_results.data.product
+    return None
+
+
+def _product_availability_at_store_params(product: SearchProduct, store: Location) -> dict:
+    return {
+        'tcin': product.tcin,
+        'pricing_context': 'in_store',
+        'store_id': store.location_id,
+        'pricing_store_id': store.location_id,
+        'has_pricing_store_id': True,
+        'scheduled_delivery_store_id': store.location_id,
+    }
+
+
+def _parse_product_availability_at_store(data: dict, product: SearchProduct, lazy: bool = False) \
+        -> Union[StoreProduct, StoreProductChild, None]:
+    if data:
+        availability_results = parse(model=StoreAvailabilityResults, data=data, lazy=lazy)
+        if availability_results.data.product.tcin == product.tcin:
+            return availability_results.data.product
+        for child in availability_results.data.product.children:
+            if child.tcin == product.tcin:
+                return child
+    return None
+
+
+def _build_in_process(decoder: Decoder, content: bytes, build: Callable, transform: Callable = None,
+                      **kwargs) -> Tuple[Any, float, float]:
+    """
+    Decode and validate one response; runs in a worker process, so everything passed in and returned is pickled
+    :return: (model, or transform(model) if given, decode seconds, validation seconds)
+    :rtype: Tuple[Any, float, float]
+    """
+    start = time.perf_counter()
+    data = decoder(content) if content else {}
+    decoded = time.perf_counter()
+    model = build(data=data, **kwargs)
+    if transform is not None:
+        model = transform(model)
+    return model, decoded - start, time.perf_counter() - decoded
+
+
+def _parse_locations(data: list) -> List[Location]:
+    if data:
+        return [Location(**loc) for loc in data]
+    return []
+
+
 class Target:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, api_base_url: str = "https://api.target.com/",
+                 redsky_base_url: str = "https://redsky.target.com/", cache: ResponseCache = None,
+                 cache_dir: str = None, locations_max_age: float = 86400, lazy: bool = False,
+                 decoder: Union[str, Decoder] = None, coalesce: bool = False, pool_connections: int = 10,
+                 pool_maxsize: int = 10, pool_block: bool = False, warm_up: bool = False,
+                 retry_policy: RetryPolicy = None, rate_limiter: RateLimiter = None,
+                 concurrency_limiter: AdaptiveConcurrencyLimiter = None, metrics: Union[bool, Metrics] = False,
+                 fingerprint: bool = False, timeout: Union[float, Tuple[float, float]] = 30,
+                 compact_locations: bool = False):
         self._api_key = api_key
-        self.api = TargetAPI(api_key=api_key, target_instance=self)
-        self.redsky = RedSky(api_key=api_key, target_instance=self)
+        if metrics is True:
+            metrics = Metrics()
+        self.metrics = metrics or None
+        pool_options = {'pool_connections': pool_connections, 'pool_maxsize': pool_maxsize, 'pool_block': pool_block,
+                        'retry_policy': retry_policy, 'rate_limiter': rate_limiter,
+                        'concurrency_limiter': concurrency_limiter, 'metrics': self.metrics, 'timeout': timeout}
+        self.api = TargetAPI(api_key=api_key, target_instance=self, base_url=api_base_url, cache=cache,
+                             cache_dir=cache_dir, locations_max_age=locations_max_age, decoder=decoder,
+                             coalesce=coalesce, compact_locations=compact_locations, **pool_options)
+        self.redsky = RedSky(api_key=api_key, target_instance=self, base_url=redsky_base_url, cache=cache,
+                             lazy=lazy, decoder=decoder, coalesce=coalesce, fingerprint=fingerprint, **pool_options)
+        if warm_up:
+            self.warm_up()
+
+    def warm_up(self, connections: int = None) -> bool:
+        """
+        Pre-open pooled connections to api.target.com and redsky.target.com
+        :param connections: (Optional) number of connections to open to each host, defaults to the pool size
+        :return: whether every connection was opened
+        :rtype: bool
+        """
+        try:
+            self.api.warm_up(connections=connections)
+            self.redsky.warm_up(connections=connections)
+        except (OSError, requests.exceptions.RequestException, urllib3.exceptions.HTTPError):
+            return False
+        return True
+
+    @property
+    def pool_stats(self) -> dict:
+        return {
+            'api': self.api.pool_stats.stats,
+            'redsky': self.redsky.pool_stats.stats,
+        }
+
+    def metrics_text(self) -> str:
+        """
+        Render request metrics in Prometheus text exposition format
+        :return: exposition text, empty if metrics are disabled
+        :rtype: str
+        """
+        if self.metrics is None:
+            return ""
+        return self.metrics.metrics_text()
 
     def _store_by_id(self, store_id: str) -> Union[Location, None]:
-        for store in self.stores:
-            if store.location_id == store_id:
-                return store
+        store = self.api.registry.get(location_id=store_id)
+        if store is not None and store.location_type == STORE:
+            return store
         return None
 
-    def find_stores(self, keyword: str) -> List[Location]:
-        locations = []
-        for store in self.stores:
-            if keyword in store.location_name:
-                locations.append(store)
-        return locations
+    def find_stores(self, keyword: str, limit: int = None) -> List[Location]:
+        """
+        Find stores by name, city, address, state or ZIP code
+        :param keyword: case-insensitive words or word prefixes, all of which must match;
+        an empty keyword matches every store
+        :param limit: (Optional) maximum number of stores to return
+        :return: list of matching stores
+        :rtype: List[Location]
+        """
+        return self.api.registry.store_search_index.search(query=keyword, limit=limit)
+
+    def nearest_stores(self, latitude: float, longitude: float, k: int = 10, radius_miles: float = None) \
+            -> List[Tuple[Location, float]]:
+        """
+        Find the stores closest to a point
+        :param latitude: latitude of the point, in degrees
+        :param longitude: longitude of the point, in degrees
+        :param k: (Optional) maximum number of stores to return
+        :param radius_miles: (Optional) only return stores within this many miles
+        :return: list of (store, distance in miles) tuples, closest first
+        :rtype: List[Tuple[Location, float]]
+        """
+        return self.api.registry.store_spatial_index.nearest(latitude=latitude, longitude=longitude, k=k,
+                                                             radius_miles=radius_miles)
 
     @property
     def stores(self) -> List[Location]:
@@ -43,128 +304,589 @@ class Target:
         return self.redsky.search_products(keyword=keyword, store_id=store_id, store_search=store_search,
                                            sort_by=sort_by)
 
+    def search_iter(self, keyword: str, store_id: str = None, store_search: bool = False, sort_by: str = "relevance",
+                    max_pages: int = None) -> Iterator[SearchProduct]:
+        return self.redsky.search_iter(keyword=keyword, store_id=store_id, store_search=store_search,
+                                       sort_by=sort_by, max_pages=max_pages)
+
+    def product_availability_across_stores(self, product: SearchProduct, stores: List[Location] = None,
+                                           max_workers: int = 16, ordered: bool = False,
+                                           processes: Union[int, Executor] = None, return_exceptions: bool = False) \
+            -> Iterator[Tuple[Location, Union[StoreProduct, StoreProductChild, None]]]:
+        if stores is None:
+            stores = self.stores
+        return self.redsky.product_availability_across_stores(product=product, stores=stores,
+                                                              max_workers=max_workers, ordered=ordered,
+                                                              processes=processes,
+                                                              return_exceptions=return_exceptions)
+
+    def watch(self, watchlist: Iterable[Tuple[str, Union[str, None]]] = (), interval: float = 60,
+              max_workers: int = 8, emit_initial: bool = False) -> StockWatcher:
+        """
+        Create a StockWatcher polling (TCIN, store ID) pairs with this client
+        :param watchlist: (Optional) (TCIN, store ID) pairs; a store ID of None watches online availability,
+            otherwise only the price at the store is watched
+        :param interval: (Optional) default seconds between polls of each item
+        :param max_workers: (Optional) maximum number of concurrent requests
+        :param emit_initial: (Optional) emit an in/out of stock event for each online item's first observation
+        :return: watcher; call start() or poll() on it
+        :rtype: StockWatcher
+        """
+        return StockWatcher(target=self, watchlist=watchlist, interval=interval, max_workers=max_workers,
+                            emit_initial=emit_initial)
+
 
 class API:
-    def __init__(self, api_key: str, target_instance: Target):
+    def __init__(self, api_key: str, target_instance: Target, base_url: str = "https://api.target.com/",
+                 cache: ResponseCache = None, decoder: Union[str, Decoder] = None,
+                 coalesce: Union[bool, SingleFlight] = False, pool_connections: int = 10, pool_maxsize: int = 10,
+                 pool_block: bool = False, retry_policy: RetryPolicy = None, rate_limiter: RateLimiter = None,
+                 concurrency_limiter: AdaptiveConcurrencyLimiter = None, metrics: Metrics = None,
+                 timeout: Union[float, Tuple[float, float]] = 30):
+        """
+        :param coalesce: (Optional) share one request between concurrent identical calls.
+        Pass a SingleFlight to share it between clients.
+        :param pool_connections: (Optional) number of per-host connection pools to keep
+        :param pool_maxsize: (Optional) maximum number of keep-alive connections per host.
+        Set this to at least the number of threads making requests.
+        :param pool_block: (Optional) wait for a free connection rather than opening one that will be discarded
+        :param retry_policy: (Optional) when to retry failed requests. Defaults to 3 attempts for connection errors,
+        429 and 5xx responses, limited by the process-wide retry budget.
+        :param rate_limiter: (Optional) requests-per-second limits; share one between clients to share the quota
+        :param concurrency_limiter: (Optional) adaptive limit on concurrent requests;
+        share one between clients to adapt to the host's total load
+        :param metrics: (Optional) record per-endpoint request, latency and size metrics here
+        :param timeout: (Optional) seconds to wait for the server to connect or send data, or a
+        (connect, read) tuple; a timed-out attempt raises requests' Timeout, which the retry policy retries
+        """
         self._key = api_key
         self._target_instance = target_instance
-        self._base_url = "https://api.target.com/"
-        self._session = requests.Session()
+        self._base_url = base_url
+        self._session = make_session(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                     pool_block=pool_block)
+        self.cache = cache
+        self.decoder = get_decoder(decoder=decoder)
+        self.timings = Timings()
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.metrics = metrics
+        self.timeout = timeout
+        self._host = urlsplit(base_url).netloc
+        if isinstance(coalesce, SingleFlight):
+            self.single_flight = coalesce
+        else:
+            self.single_flight = SingleFlight() if coalesce else None
+
+    @property
+    def _adapter(self) -> PooledHTTPAdapter:
+        return self._session.get_adapter(url=self._base_url)
+
+    @property
+    def pool_stats(self) -> PoolStats:
+        return self._adapter.pool_stats
+
+    def warm_up(self, connections: int = None) -> int:
+        """
+        Pre-open pooled connections to this client's host
+        :param connections: (Optional) number of connections to open, defaults to the pool size
+        :return: number of connections opened
+        :rtype: int
+        """
+        settings = self._session.merge_environment_settings(url=self._base_url, proxies={}, stream=None,
+                                                            verify=None, cert=None)
+        return self._adapter.warm_up(url=self._base_url, connections=connections, verify=settings['verify'])
+
+    def _decode(self, content: bytes, endpoint: str = None) -> Union[dict, list]:
+        start = time.perf_counter()
+        data = self.decoder(content)
+        seconds = time.perf_counter() - start
+        self.timings.add_decode(seconds=seconds)
+        if self.metrics is not None and endpoint is not None:
+            self.metrics.record(endpoint=endpoint, phase=DECODE, seconds=seconds)
+        return data
+
+    def _validate(self, endpoint: str, func: Callable, **kwargs):
+        # build models from decoded data, timing it when metrics are enabled
+        if self.metrics is None:
+            return func(**kwargs)
+        start = time.perf_counter()
+        try:
+            return func(**kwargs)
+        finally:
+            self.metrics.record(endpoint=endpoint, phase=VALIDATION, seconds=time.perf_counter() - start)
 
     def _get_json(self, endpoint: str, params: dict = {}) -> dict:
+        if self.cache is not None:
+            data = self.cache.get(endpoint=endpoint, params=params, base_url=self._base_url)
+            if data is not None:
+                return data
+        if self.single_flight is not None:
+            # keyed by host too, so clients for different hosts can share a SingleFlight
+            return self.single_flight.do(key=(self._base_url, make_key(endpoint=endpoint, params=params)),
+                                         func=lambda: self._fetch_json(endpoint=endpoint, params=params))
+        return self._fetch_json(endpoint=endpoint, params=params)
+
+    def _fetch_json(self, endpoint: str, params: dict) -> dict:
         res = self._get(endpoint=endpoint, params=params)
-        if res:
-            return res.json()
-        return {}
+        data = self._decode(content=res.content, endpoint=endpoint) if res.content else {}
+        if self.cache is not None and data:
+            self.cache.set(endpoint=endpoint, params=params, value=data, size=len(res.content),
+                           base_url=self._base_url)
+        return data
 
-    def _get(self, endpoint: str, params: dict = {}) -> Union[requests.Response, None]:
+    def _get(self, endpoint: str, params: dict = {}, headers: dict = None) -> requests.Response:
+        """
+        Make a GET request, retrying according to the retry policy
+        :raises TargetAPIError: if the request still fails after any retries
+        """
         params['key'] = self._key
         url = _make_url(base=self._base_url, endpoint=endpoint)
         url += f"?{urlencode(params)}"
-        res = self._session.get(url=url)
-        if res:
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            attempt += 1
+            policy.record_request()
+            try:
+                res = self._send(url=url, endpoint=endpoint, headers=headers)
+            except requests.exceptions.RequestException as e:
+                if not isinstance(e, policy.exceptions) or not policy.should_retry(attempt=attempt):
+                    raise NetworkError(f"Request to {endpoint} failed: {e}") from e
+                policy.sleep(policy.backoff(attempt=attempt))
+                continue
+            if res.status_code < 400:
+                return res
+            retry_after = parse_retry_after(res.headers.get('Retry-After'))
+            if not policy.should_retry(attempt=attempt, status_code=res.status_code, retry_after=retry_after):
+                raise error_for_status(status_code=res.status_code, url=_make_url(self._base_url, endpoint),
+                                       body=res.text[:500], retry_after=retry_after)
+            policy.sleep(policy.backoff(attempt=attempt, retry_after=retry_after))
+
+    def _send(self, url: str, endpoint: str, headers: dict = None) -> requests.Response:
+        # one attempt, within the rate and concurrency limits; the concurrency limiter learns from its outcome
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(host=self._host, endpoint=endpoint)
+        limiter = self.concurrency_limiter
+        if limiter is not None:
+            limiter.acquire()
+        congested = True
+        res = None
+        start = time.perf_counter()
+        try:
+            res = self._session.get(url=url, headers=headers, timeout=self.timeout)
+            congested = res.status_code == 429 or res.status_code >= 500
             return res
-        return None
+        finally:
+            latency = time.perf_counter() - start
+            self.timings.add_network(seconds=latency)
+            if limiter is not None:
+                limiter.release(latency=latency, congested=congested)
+            if self.metrics is not None:
+                if res is not None:
+                    self.metrics.record_request(endpoint=endpoint, status=res.status_code, seconds=latency,
+                                                size=len(res.content))
+                else:
+                    self.metrics.record_request(endpoint=endpoint, status=None, seconds=latency)
 
 
 class RedSky(API):
-    def __init__(self, api_key: str, target_instance: Target):
-        super().__init__(api_key=api_key, target_instance=target_instance)
-        self._base_url = "https://redsky.target.com/"
+    def __init__(self, api_key: str, target_instance: Target, base_url: str = "https://redsky.target.com/",
+                 cache: ResponseCache = None, lazy: bool = False, decoder: Union[str, Decoder] = None,
+                 coalesce: Union[bool, SingleFlight] = False, fingerprint: Union[bool, FingerprintStore] = False,
+                 unchanged_marker: bool = False, **kwargs):
+        """
+        :param lazy: (Optional) return LazyModel views that validate fields on first access,
+        rather than validating whole responses up front
+        :param fingerprint: (Optional) remember a hash of each response body, and when the same request returns
+        the same bytes again, skip decoding and validation and return the model built last time.
+        Pass a FingerprintStore to size it or share it.
+        :param unchanged_marker: (Optional) with fingerprinting, return UNCHANGED rather than the previous model
+        for an unchanged response
+        """
+        super().__init__(api_key=api_key, target_instance=target_instance, base_url=base_url, cache=cache,
+                         decoder=decoder, coalesce=coalesce, **kwargs)
+        self.lazy = lazy
+        if isinstance(fingerprint, FingerprintStore):
+            self.fingerprints = fingerprint
+        else:
+            self.fingerprints = FingerprintStore() if fingerprint else None
+        self.unchanged_marker = unchanged_marker
 
     def _search(self, endpoint: str, **kwargs):
-        params = {
-            'channel': 'WEB',
-            'page': '/s/none',
-            'visitor_id': 1,
-            'is_bot': False,
-        }
-        params.update(kwargs)
+        params = _redsky_params(**kwargs)
         return self._get_json(endpoint=endpoint, params=params)
 
+    def _search_model(self, endpoint: str, params: dict, build: Callable, allow_marker: bool = True, **kwargs):
+        """
+        Fetch an endpoint and build its model with build(data=..., **kwargs),
+        short-circuiting unchanged responses when fingerprinting is on
+        :param allow_marker: (Optional) whether UNCHANGED may be returned, if unchanged_marker is set
+        """
+        params = _redsky_params(**params)
+        if self.fingerprints is None:
+            data = self._get_json(endpoint=endpoint, params=params)
+            return self._validate(endpoint=endpoint, func=build, data=data, **kwargs)
+        if self.cache is not None:
+            data = self.cache.get(endpoint=endpoint, params=params, base_url=self._base_url)
+            if data is not None:
+                return self._validate(endpoint=endpoint, func=build, data=data, **kwargs)
+        fetch = lambda: self._fetch_model(endpoint=endpoint, params=params, build=build, **kwargs)
+        if self.single_flight is not None:
+            # distinct from _get_json's keys, in case the SingleFlight is shared with a client returning JSON
+            model, unchanged = self.single_flight.do(
+                key=('model', self._base_url, make_key(endpoint=endpoint, params=params)), func=fetch)
+        else:
+            model, unchanged = fetch()
+        return UNCHANGED if unchanged and allow_marker and self.unchanged_marker else model
+
+    def _fetch_model(self, endpoint: str, params: dict, build: Callable, **kwargs) -> Tuple[Any, bool]:
+        # returns (model, whether the response was unchanged)
+        key = make_key(endpoint=endpoint, params=params, base_url=self._base_url)
+        res = self._get(endpoint=endpoint, params=params)
+        content = res.content
+        digest, unchanged, model = self.fingerprints.lookup(key=key, content=content)
+        if unchanged:
+            return model, True
+        data = self._decode(content=content, endpoint=endpoint) if content else {}
+        if self.cache is not None and data:
+            self.cache.set(endpoint=endpoint, params=params, value=data, size=len(content), base_url=self._base_url)
+        model = self._validate(endpoint=endpoint, func=build, data=data, **kwargs)
+        self.fingerprints.store(key=key, digest=digest, model=model)
+        return model, False
+
+    def _search_page(self, keyword: str, store_id: str = None, store_search: bool = False,
+                     sort_by: str = "relevance", page: int = 1, offset: int = None) -> Union[SearchResults, None]:
+        params = _search_params(keyword=keyword, store_id=store_id, store_search=store_search, sort_by=sort_by,
+                                page=page, offset=offset)
+        # paging needs the page itself, so never UNCHANGED
+        return self._search_model(endpoint=SEARCH_ENDPOINT, params=params, build=_parse_search_page,
+                                  allow_marker=False, lazy=self.lazy)
+
     def search_products(self, keyword: str, store_id: str = None, store_search: bool = False,
-                        sort_by: str = "relevance") -> List[SearchProduct]:
-        params = {
-            'keyword': keyword,
-            'pricing_store_id': store_id if store_id else 1928,
-            'pageNumber': 1,
-            'storeSearch': store_search,
-            'sortBy': sort_by,
-            'pricing_context': 'digital' if not store_id else 'in_store',
-        }
-        data = self._search(endpoint='redsky_aggregations/v1/web/plp_search_v1', **params)
-        if data:
-            return SearchResults(**data).data.search.products
-        return []
+                        sort_by: str = "relevance", page: int = 1) -> List[SearchProduct]:
+        params = _search_params(keyword=keyword, store_id=store_id, store_search=store_search, sort_by=sort_by,
+                                page=page)
+        return self._search_model(endpoint=SEARCH_ENDPOINT, params=params, build=_parse_search, lazy=self.lazy)
+
+    def search_iter(self, keyword: str, store_id: str = None, store_search: bool = False, sort_by: str = "relevance",
+                    max_pages: int = None) -> Iterator[SearchProduct]:
+        """
+        Lazily iterate over every page of a product search.
+        The next page is fetched in the background while the current one is consumed,
+        so at most two pages are held in memory at once.
+        :param keyword: keyword to search for
+        :param store_id: (Optional) ID of store to search
+        :param store_search: (Optional) whether to limit results to in-store products
+        :param sort_by: (Optional) sort order
+        :param max_pages: (Optional) maximum number of pages to fetch
+        :return: iterator of search products
+        :rtype: Iterator[SearchProduct]
+        """
+        def fetch(page: int, offset: int = None) -> Union[SearchResults, None]:
+            return self._search_page(keyword=keyword, store_id=store_id, store_search=store_search, sort_by=sort_by,
+                                     page=page, offset=offset)
+
+        if max_pages is not None and max_pages < 1:
+            return
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page = 1
+            future = executor.submit(fetch, page)
+            try:
+                while future:
+                    results = future.result()
+                    next_page = _next_search_page(results=results, page=page, max_pages=max_pages)
+                    future = executor.submit(fetch, *next_page) if next_page else None
+                    if results:
+                        yield from results.data.search.products
+                    if next_page:
+                        page = next_page[0]
+            finally:
+                if future:
+                    future.cancel()
 
     def product_availability(self, product: SearchProduct) -> Union[OnlineProduct, None]:
-        params = {
-            'tcin': product.tcin,
-            'pricing_context': 'digital',
-            'pricing_store_id': 1928,  # default value
-        }
-        data = self._search(endpoint='redsky_aggregations/v1/web_platform/product_fulfillment_v1', **params)
-        if data:
-            availability_results = OnlineAvailabilityResults(**data)
-            return availability_results.data.product
-        return None
+        params = _product_availability_params(product=product)
+        return self._search_model(endpoint=ONLINE_AVAILABILITY_ENDPOINT, params=params,
+                                  build=_parse_product_availability, lazy=self.lazy)
 
     def product_availability_at_store(self, product: SearchProduct, store: Location) -> Union[StoreProduct, StoreProductChild, None]:
-        params = {
-            'tcin': product.tcin,
-            'pricing_context': 'in_store',
-            'store_id': store.location_id,
-            'pricing_store_id': store.location_id,
-            'has_pricing_store_id': True,
-            'scheduled_delivery_store_id': store.location_id,
-        }
-        data = self._search(endpoint='redsky_aggregations/v1/web/pdp_client_v1', **params)
-        if data:
-            availability_results = StoreAvailabilityResults(**data)
-            if availability_results.data.product.tcin == product.tcin:
-                return availability_results.data.product
-            for child in availability_results.data.product.children:
-                if child.tcin == product.tcin:
-                    return child
-        return None
+        params = _product_availability_at_store_params(product=product, store=store)
+        return self._search_model(endpoint=STORE_AVAILABILITY_ENDPOINT, params=params,
+                                  build=_parse_product_availability_at_store, product=product, lazy=self.lazy)
+
+    def product_availability_across_stores(self, product: SearchProduct, stores: Iterable[Location],
+                                           max_workers: int = 16, ordered: bool = False,
+                                           processes: Union[int, Executor] = None, return_exceptions: bool = False) \
+            -> Iterator[Tuple[Location, Union[StoreProduct, StoreProductChild, None]]]:
+        """
+        Check availability of one product at many stores concurrently.
+        A store whose request or response fails doesn't stop the others; its availability is None.
+        :param product: product to check
+        :param stores: stores to check the product at
+        :param max_workers: (Optional) maximum number of concurrent requests
+        :param ordered: (Optional) yield results in the same order as stores, rather than as each one finishes
+        :param processes: (Optional) decode and validate responses in this many worker processes,
+        or in the given ProcessPoolExecutor; see product_availability_at_stores_batch
+        :param return_exceptions: (Optional) yield the exception for a failed store instead of None
+        :return: iterator of (store, availability) tuples
+        :rtype: Iterator[Tuple[Location, Union[StoreProduct, StoreProductChild, None]]]
+        """
+        if processes is not None:
+            pairs = self.product_availability_at_stores_batch(pairs=((product, store) for store in stores),
+                                                              max_workers=max_workers, processes=processes,
+                                                              ordered=ordered, return_exceptions=return_exceptions)
+            return ((store, availability) for (_, store), availability in pairs)
+
+        def check(store: Location) -> Union[StoreProduct, StoreProductChild, Exception, None]:
+            try:
+                return self.product_availability_at_store(product=product, store=store)
+            except ITEM_ERRORS as e:
+                return e if return_exceptions else None
+
+        return _bounded_map(func=check, items=stores, max_workers=max_workers, ordered=ordered)
+
+    def product_availability_batch(self, products: Iterable[SearchProduct], max_workers: int = 16,
+                                   processes: Union[int, Executor] = None, transform: Callable = None,
+                                   ordered: bool = False, return_exceptions: bool = False) \
+            -> Iterator[Tuple[SearchProduct, Any]]:
+        """
+        Check online availability of many products, decoding and validating responses in worker processes
+        :param products: products to check
+        :param max_workers: (Optional) maximum number of concurrent requests
+        :param processes: (Optional) number of worker processes, defaults to one per CPU;
+        or a ProcessPoolExecutor to share between batches, ideally with a spawn or forkserver mp_context
+        :param transform: (Optional) picklable function run on each model in the worker, so only its result is sent
+        back, e.g. a function returning (tcin, availability_status)
+        :param ordered: (Optional) yield results in the same order as products, rather than as each one finishes
+        :param return_exceptions: (Optional) yield the exception for a failed product instead of None
+        :return: iterator of (product, availability or transform(availability)) tuples
+        :rtype: Iterator[Tuple[SearchProduct, Any]]
+        """
+        jobs = ((product, ONLINE_AVAILABILITY_ENDPOINT, _product_availability_params(product=product),
+                 _parse_product_availability, {}) for product in products)
+        return self._batch(jobs=jobs, max_workers=max_workers, processes=processes, transform=transform,
+                           ordered=ordered, return_exceptions=return_exceptions)
+
+    def product_availability_at_stores_batch(self, pairs: Iterable[Tuple[SearchProduct, Location]],
+                                             max_workers: int = 16, processes: Union[int, Executor] = None,
+                                             transform: Callable = None, ordered: bool = False,
+                                             return_exceptions: bool = False) \
+            -> Iterator[Tuple[Tuple[SearchProduct, Location], Any]]:
+        """
+        Check availability of products at stores, decoding and validating responses in worker processes
+        :param pairs: (product, store) pairs to check
+        :param max_workers: (Optional) maximum number of concurrent requests
+        :param processes: (Optional) number of worker processes, defaults to one per CPU;
+        or a ProcessPoolExecutor to share between batches, ideally with a spawn or forkserver mp_context
+        :param transform: (Optional) picklable function run on each model in the worker, so only its result is sent
+        back, e.g. a function returning (tcin, formatted_current_price)
+        :param ordered: (Optional) yield results in the same order as pairs, rather than as each one finishes
+        :param return_exceptions: (Optional) yield the exception for a failed pair instead of None
+        :return: iterator of ((product, store), availability or transform(availability)) tuples
+        :rtype: Iterator[Tuple[Tuple[SearchProduct, Location], Any]]
+        """
+        jobs = (((product, store), STORE_AVAILABILITY_ENDPOINT,
+                 _product_availability_at_store_params(product=product, store=store),
+                 _parse_product_availability_at_store, {'product': product}) for product, store in pairs)
+        return self._batch(jobs=jobs, max_workers=max_workers, processes=processes, transform=transform,
+                           ordered=ordered, return_exceptions=return_exceptions)
+
+    def search_batch(self, keywords: Iterable[str], store_id: str = None, store_search: bool = False,
+                     sort_by: str = "relevance", max_workers: int = 16, processes: Union[int, Executor] = None,
+                     transform: Callable = None, ordered: bool = False, return_exceptions: bool = False) \
+            -> Iterator[Tuple[str, Any]]:
+        """
+        Fetch the first page of results for many searches, decoding and validating responses in worker processes
+        :param keywords: keywords to search for
+        :param store_id: (Optional) ID of store to search
+        :param store_search: (Optional) whether to limit results to in-store products
+        :param sort_by: (Optional) sort order
+        :param max_workers: (Optional) maximum number of concurrent requests
+        :param processes: (Optional) number of worker processes, defaults to one per CPU;
+        or a ProcessPoolExecutor to share between batches, ideally with a spawn or forkserver mp_context
+        :param transform: (Optional) picklable function run on each list of products in the worker
+        :param ordered: (Optional) yield results in the same order as keywords, rather than as each one finishes
+        :param return_exceptions: (Optional) yield the exception for a failed search instead of None
+        :return: iterator of (keyword, products or transform(products)) tuples
+        :rtype: Iterator[Tuple[str, Any]]
+        """
+        jobs = ((keyword, SEARCH_ENDPOINT,
+                 _search_params(keyword=keyword, store_id=store_id, store_search=store_search, sort_by=sort_by),
+                 _parse_search, {}) for keyword in keywords)
+        return self._batch(jobs=jobs, max_workers=max_workers, processes=processes, transform=transform,
+                           ordered=ordered, return_exceptions=return_exceptions)
+
+    def _batch(self, jobs: Iterable[Tuple[Any, str, dict, Callable, dict]], max_workers: int,
+               processes: Union[int, Executor, None], transform: Union[Callable, None], ordered: bool,
+               return_exceptions: bool = False) -> Iterator[Tuple[Any, Any]]:
+        """
+        Fetch raw responses on I/O threads and decode and validate them in worker processes,
+        so validation isn't limited to one core by the GIL.
+        Models are always fully validated (never lazy), and the response cache and coalescing are bypassed;
+        with fingerprinting, unchanged responses are answered in this process without using a worker.
+        A failed request, decode or validation only fails its own item, whose result is None (or the exception).
+        :param jobs: (item, endpoint, params, build function, build kwargs) tuples;
+        build functions, their kwargs, transform and the client's decoder must all be picklable
+        :return: iterator of (item, result) tuples
+        """
+        owned = not isinstance(processes, Executor)
+        # workers start lazily, on the first submit from an I/O thread; forking then could copy a lock held by
+        # another thread into the child, so they're spawned
+        executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) \
+            if owned else processes
+        window = max(1, max_workers) * 2
+
+        def fetch(job) -> tuple:
+            # on an I/O thread: returns (endpoint, fingerprint key, digest, future for the built model)
+            _, endpoint, params, build, kwargs = job
+            params = _redsky_params(**params)
+            key = make_key(endpoint=endpoint, params=params, base_url=self._base_url)
+            if transform is not None:
+                # transformed results must never be returned for ordinary calls sharing the store
+                key = (transform, key)
+            try:
+                content = self._get(endpoint=endpoint, params=params).content
+            except ITEM_ERRORS as e:
+                future = Future()
+                future.set_exception(e)
+                return endpoint, key, None, future
+            digest = None
+            if self.fingerprints is not None:
+                digest, unchanged, model = self.fingerprints.lookup(key=key, content=content)
+                if unchanged:
+                    future = Future()
+                    future.set_result((model, None, None))
+                    return endpoint, key, None, future
+            future = executor.submit(_build_in_process, self.decoder, content, build, transform, **kwargs)
+            return endpoint, key, digest, future
+
+        pending = deque()
+        try:
+            for job, fetched in _bounded_map(func=fetch, items=jobs, max_workers=max_workers, ordered=ordered):
+                pending.append((job[0], fetched))
+                while len(pending) >= window:
+                    yield self._next_built(pending=pending, ordered=ordered, return_exceptions=return_exceptions)
+            while pending:
+                yield self._next_built(pending=pending, ordered=ordered, return_exceptions=return_exceptions)
+        finally:
+            for _, (_, _, _, future) in pending:
+                future.cancel()
+            if owned:
+                executor.shutdown(wait=True)
+
+    def _next_built(self, pending: deque, ordered: bool, return_exceptions: bool) -> Tuple[Any, Any]:
+        # takes the next (or, unordered, the first finished) built model off pending, recording the worker's timings
+        # and remembering the model for fingerprinting
+        if not ordered:
+            done, _ = wait([future for _, (_, _, _, future) in pending], return_when=FIRST_COMPLETED)
+            index = next(i for i, (_, (_, _, _, future)) in enumerate(pending) if future in done)
+            pending.rotate(-index)
+        item, (endpoint, key, digest, future) = pending.popleft()
+        try:
+            model, decode_seconds, validation_seconds = future.result()
+        except ITEM_ERRORS as e:
+            return item, e if return_exceptions else None
+        if decode_seconds is not None:
+            self.timings.add_decode(seconds=decode_seconds)
+            if self.metrics is not None:
+                self.metrics.record(endpoint=endpoint, phase=DECODE, seconds=decode_seconds)
+                self.metrics.record(endpoint=endpoint, phase=VALIDATION, seconds=validation_seconds)
+        if digest is not None:
+            self.fingerprints.store(key=key, digest=digest, model=model)
+        return item, model
 
 
 class TargetAPI(API):
-    def __init__(self, api_key: str, target_instance: Target):
-        super().__init__(api_key=api_key, target_instance=target_instance)
-        self._base_url = "https://api.target.com/"
+    def __init__(self, api_key: str, target_instance: Target, base_url: str = "https://api.target.com/",
+                 cache: ResponseCache = None, cache_dir: str = None, locations_max_age: float = 86400,
+                 decoder: Union[str, Decoder] = None, coalesce: Union[bool, SingleFlight] = False,
+                 compact_locations: bool = False, **kwargs):
+        super().__init__(api_key=api_key, target_instance=target_instance, base_url=base_url, cache=cache,
+                         decoder=decoder, coalesce=coalesce, **kwargs)
+        # compact: decode ship_locations/v1 straight into a LocationTable, never building Location models
+        self.compact_locations = compact_locations
+        self._parse_locations = LocationTable.from_dicts if compact_locations else _parse_locations
         self._locations = []
+        self._registry = None
+        self._snapshot = LocationSnapshot(cache_dir=cache_dir, max_age=locations_max_age,
+                                          compact=compact_locations) if cache_dir else None
+        self._revalidation = None
+        self._revalidation_lock = threading.Lock()
 
     @property
-    def locations(self) -> List[Location]:
+    def locations(self) -> Union[List[Location], LocationTable]:
         if not self._locations:
-            self._locations = []
-            data = self._get_json(endpoint='ship_locations/v1')
-            if data:
-                for loc in data:
-                    self._locations.append(Location(**loc))
+            if self._snapshot and self._snapshot.load():
+                self._locations = self._snapshot.table if self.compact_locations else self._snapshot.locations
+                if self._snapshot.is_stale:
+                    self.revalidate_locations(background=True)
+            elif self._snapshot:
+                self.revalidate_locations(background=False)
+            else:
+                data = self._get_json(endpoint=LOCATIONS_ENDPOINT, params={})
+                self._locations = self._validate(endpoint=LOCATIONS_ENDPOINT, func=self._parse_locations, data=data)
         return self._locations
 
+    def revalidate_locations(self, background: bool = True) -> Union[threading.Thread, None]:
+        """
+        Check the location snapshot against ship_locations/v1, replacing it only if the content has changed
+        :param background: (Optional) revalidate on a background thread rather than blocking
+        :return: the background thread, if one was started
+        :rtype: Union[threading.Thread, None]
+        """
+        if not self._snapshot:
+            self._locations = []
+            self.locations
+            return None
+        if not background:
+            self._revalidate_snapshot()
+            return None
+        with self._revalidation_lock:
+            if self._revalidation is None or not self._revalidation.is_alive():
+                self._revalidation = threading.Thread(target=self._revalidate_snapshot, daemon=True)
+                self._revalidation.start()
+            return self._revalidation
+
+    def _revalidate_snapshot(self):
+        try:
+            res = self._get(endpoint=LOCATIONS_ENDPOINT, params={}, headers=self._snapshot.conditional_headers)
+            locations = self._snapshot.update(
+                res=res, decode=lambda content: self._decode(content=content, endpoint=LOCATIONS_ENDPOINT),
+                parse=lambda data: self._validate(endpoint=LOCATIONS_ENDPOINT, func=self._parse_locations,
+                                                  data=data))
+        except ITEM_ERRORS:
+            if not self._locations:
+                # nothing to fall back on, e.g. on a cold start, so fail like an uncached fetch would
+                raise
+            # keep serving the existing snapshot
+            return
+        if locations:
+            self._locations = locations
+
+    @property
+    def registry(self) -> LocationRegistry:
+        # rebuilt whenever the underlying location list is replaced, e.g. by snapshot revalidation
+        locations = self.locations
+        registry = self._registry
+        if registry is None or registry.source is not locations:
+            registry = LocationRegistry(locations=locations)
+            self._registry = registry
+        return registry
+
+    @property
+    def location_table(self) -> LocationTable:
+        return self.registry.table
+
     @property
     def stores(self) -> List[Location]:
-        locations = []
-        for location in self.locations:
-            if location.location_type == "STORE":
-                locations.append(location)
-        return locations
+        # a new list each time, so callers can sort or extend it without touching the registry's cached tuple
+        return list(self.registry.stores)
 
     @property
     def vendors(self) -> List[Location]:
-        locations = []
-        for location in self.locations:
-            if location.location_type == "VENDOR":
-                locations.append(location)
-        return locations
+        return list(self.registry.vendors)
 
     @property
     def sellers(self) -> List[Location]:
-        locations = []
-        for location in self.locations:
-            if location.location_type == "SELLER_LOCATION":
-                locations.append(location)
-        return locations
+        return list(self.registry.sellers)
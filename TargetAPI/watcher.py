@@ -0,0 +1,354 @@
+import heapq
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+from TargetAPI.fingerprint import UNCHANGED
+from TargetAPI.models import Location, SearchProduct, OnlineProduct
+
+IN_STOCK = 'in_stock'
+OUT_OF_STOCK = 'out_of_stock'
+PRICE_CHANGED = 'price_changed'
+QUANTITY_CHANGED = 'quantity_changed'
+
+# (TCIN, store ID or None for online availability)
+WatchKey = Tuple[str, Union[str, None]]
+# last known (in stock, quantity, price); tuples keep per-item state small.
+# Store items only know their price, so their stock and quantity are always None
+WatchState = Tuple[Union[bool, None], Union[float, None], Union[float, None]]
+
+_PRICE = re.compile(r"[\d.]+")
+
+
+class StockEvent:
+    """
+    A change in availability of a watched product
+    """
+    __slots__ = ('kind', 'tcin', 'store_id', 'old', 'new', 'at')
+
+    def __init__(self, kind: str, tcin: str, store_id: Union[str, None], old, new, at: float):
+        self.kind = kind
+        self.tcin = tcin
+        self.store_id = store_id
+        self.old = old
+        self.new = new
+        self.at = at
+
+    def __repr__(self):
+        where = f" at store {self.store_id}" if self.store_id else " online"
+        return f"<StockEvent {self.kind} {self.tcin}{where}: {self.old!r} -> {self.new!r}>"
+
+
+def _price_value(price) -> Union[float, None]:
+    if price is None:
+        return None
+    for field in ('current_retail', 'current_retail_min'):
+        value = getattr(price, field, None)
+        if value is not None:
+            return value
+    match = _PRICE.search(getattr(price, 'formatted_current_price', None) or "")
+    return float(match.group()) if match else None
+
+
+def _online_state(product: Union[OnlineProduct, None]) -> Tuple[Union[bool, None], Union[float, None]]:
+    if product is None:
+        return None, None
+    options = product.fulfillment.shipping_options
+    quantity = options.available_to_promise_quantity
+    return options.availability_status == "IN_STOCK" and quantity > 0, quantity
+
+
+def diff_states(key: WatchKey, old: Union[WatchState, None], new: WatchState, at: float) -> List[StockEvent]:
+    """
+    Events describing how availability changed
+    :param key: (TCIN, store ID) being watched
+    :param old: previous state, None if this is the first observation
+    :param new: current state
+    :param at: time of the observation
+    :return: change events, empty if nothing changed
+    :rtype: List[StockEvent]
+    """
+    if old == new or old is None:
+        return []
+    tcin, store_id = key
+    events = []
+    (was_in_stock, old_quantity, old_price), (in_stock, quantity, price) = old, new
+    if in_stock is not None and was_in_stock is not None and in_stock != was_in_stock:
+        events.append(StockEvent(kind=IN_STOCK if in_stock else OUT_OF_STOCK, tcin=tcin, store_id=store_id,
+                                 old=was_in_stock, new=in_stock, at=at))
+    if quantity is not None and old_quantity is not None and quantity != old_quantity:
+        events.append(StockEvent(kind=QUANTITY_CHANGED, tcin=tcin, store_id=store_id, old=old_quantity,
+                                 new=quantity, at=at))
+    if price is not None and old_price is not None and price != old_price:
+        events.append(StockEvent(kind=PRICE_CHANGED, tcin=tcin, store_id=store_id, old=old_price, new=price, at=at))
+    return events
+
+
+class StockWatcher:
+    """
+    Polls a watchlist of (TCIN, store) pairs on a schedule and emits only changes in availability.
+
+    Online items track stock and quantity from product_fulfillment_v1. Store items only track the store's price from
+    pdp_client_v1, which carries no per-store stock, so they never emit IN_STOCK, OUT_OF_STOCK or QUANTITY_CHANGED.
+    Events go to callbacks and to events() iterators.
+    With a fingerprinting RedSky client, unchanged responses skip decoding, validation and diffing.
+    """
+
+    def __init__(self, target, watchlist: Iterable[WatchKey] = (), interval: float = 60, max_workers: int = 8,
+                 emit_initial: bool = False, clock: Callable[[], float] = time.monotonic):
+        """
+        :param target: Target instance to poll with
+        :param watchlist: (Optional) (TCIN, store ID) pairs to watch; a store ID of None watches online availability,
+            otherwise only the price at the store is watched
+        :param interval: (Optional) default seconds between polls of each item
+        :param max_workers: (Optional) maximum number of concurrent requests
+        :param emit_initial: (Optional) emit IN_STOCK / OUT_OF_STOCK for each online item's first observation
+        :param clock: (Optional) monotonic time source
+        """
+        self._target = target
+        self.interval = interval
+        self.max_workers = max_workers
+        self.emit_initial = emit_initial
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._intervals: Dict[WatchKey, float] = {}
+        self._schedule: List[Tuple[float, int, WatchKey]] = []
+        self._sequence = 0
+        self._scheduled: Dict[WatchKey, int] = {}
+        self._states: Dict[WatchKey, WatchState] = {}
+        self._online: Dict[str, Tuple[Union[bool, None], Union[float, None]]] = {}
+        self._callbacks: List[Callable[[StockEvent], None]] = []
+        self._queues: List[queue.Queue] = []
+        self._executor = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self.polls = 0
+        self.errors = 0
+        self.callback_errors = 0
+        self.changes = 0
+        for tcin, store_id in watchlist:
+            self.add(tcin=tcin, store_id=store_id)
+
+    def add(self, tcin: str, store_id: str = None, interval: float = None):
+        """
+        Watch a product's online availability, or its price at a store
+        :param tcin: product TCIN
+        :param store_id: (Optional) store ID, None for online availability
+        :param interval: (Optional) seconds between polls of this item, defaults to the watcher's interval
+        """
+        key = (str(tcin), str(store_id) if store_id is not None else None)
+        with self._lock:
+            new = key not in self._intervals
+            self._intervals[key] = interval if interval is not None else self.interval
+            if new:
+                self._push(due=self._clock(), key=key)
+        self._wake.set()
+
+    def remove(self, tcin: str, store_id: str = None):
+        key = (str(tcin), str(store_id) if store_id is not None else None)
+        with self._lock:
+            self._intervals.pop(key, None)
+            self._scheduled.pop(key, None)
+            self._states.pop(key, None)
+            if key[1] is None:
+                self._online.pop(key[0], None)
+
+    def _push(self, due: float, key: WatchKey):
+        self._sequence += 1
+        self._scheduled[key] = self._sequence
+        heapq.heappush(self._schedule, (due, self._sequence, key))
+
+    def add_callback(self, callback: Callable[[StockEvent], None]):
+        self._callbacks.append(callback)
+
+    def state(self, tcin: str, store_id: str = None) -> Union[WatchState, None]:
+        """
+        Last known availability of a watched item
+        :return: (in stock, quantity, price) tuple, None if it hasn't been polled yet
+        :rtype: Union[WatchState, None]
+        """
+        return self._states.get((str(tcin), str(store_id) if store_id is not None else None))
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def _due(self, now: float) -> List[WatchKey]:
+        due = []
+        with self._lock:
+            while self._schedule and self._schedule[0][0] <= now:
+                _, sequence, key = heapq.heappop(self._schedule)
+                if self._scheduled.get(key) != sequence:
+                    # removed, or removed and re-added, since it was scheduled
+                    continue
+                due.append(key)
+            # rescheduled after the loop, so items with no interval can't be due twice in one round
+            for key in due:
+                self._push(due=now + self._intervals[key], key=key)
+        return due
+
+    def _fetch_online(self, tcin: str) -> Tuple[Union[bool, None], Union[float, None]]:
+        product = self._target.redsky.product_availability(product=SearchProduct(tcin=tcin))
+        if product is UNCHANGED:
+            return self._online.get(tcin, (None, None))
+        state = _online_state(product)
+        self._online[tcin] = state
+        return state
+
+    def _fetch_price(self, tcin: str, store_id: str) -> Union[float, None]:
+        # pdp_client_v1 only needs the store ID, so there's no need to load every location
+        store = Location.construct(location_id=store_id)
+        product = self._target.redsky.product_availability_at_store(product=SearchProduct(tcin=tcin), store=store)
+        if product is UNCHANGED:
+            state = self._states.get((tcin, store_id))
+            return state[2] if state else None
+        return _price_value(getattr(product, 'price', None))
+
+    def _submit(self, func: Callable, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._executor.submit(self._guarded, func, *args)
+
+    def _guarded(self, func: Callable, *args):
+        try:
+            return True, func(*args)
+        except Exception:
+            # request and validation errors alike only fail this item for this round; it keeps its last state
+            with self._lock:
+                self.errors += 1
+            return False, None
+
+    def poll(self, now: float = None) -> List[StockEvent]:
+        """
+        Poll every item that is due, and emit and return the changes
+        :param now: (Optional) current time, defaults to the watcher's clock
+        :return: change events
+        :rtype: List[StockEvent]
+        """
+        now = self._clock() if now is None else now
+        due = self._due(now=now)
+        if not due:
+            return []
+        online = {key: self._submit(self._fetch_online, key[0]) for key in due if key[1] is None}
+        prices = {key: self._submit(self._fetch_price, *key) for key in due if key[1] is not None}
+        events = []
+        for key in due:
+            if key in online:
+                ok, result = online[key].result()
+                state = result + (None,) if ok else None
+            else:
+                ok, result = prices[key].result()
+                state = (None, None, result)
+            if not ok:
+                continue
+            with self._lock:
+                if key not in self._intervals:
+                    continue
+                old = self._states.get(key)
+                self._states[key] = state
+            if old is None and self.emit_initial and state[0] is not None:
+                events.append(StockEvent(kind=IN_STOCK if state[0] else OUT_OF_STOCK, tcin=key[0], store_id=key[1],
+                                         old=None, new=state[0], at=now))
+            else:
+                events += diff_states(key=key, old=old, new=state, at=now)
+        self.polls += len(due)
+        self.changes += len(events)
+        for event in events:
+            self._emit(event)
+        return events
+
+    def _emit(self, event: StockEvent):
+        for callback in self._callbacks:
+            try:
+                callback(event)
+            except Exception:
+                # a failing callback mustn't stop other callbacks, iterators or the polling thread
+                self.callback_errors += 1
+        for events in self._queues:
+            events.put(event)
+
+    def events(self, timeout: float = None) -> Iterator[StockEvent]:
+        """
+        Iterate over change events as they happen; requires the watcher to be running via start()
+        :param timeout: (Optional) stop iterating after this many seconds without an event
+        :return: iterator of events
+        :rtype: Iterator[StockEvent]
+        """
+        events = queue.Queue()
+        # subscribe now rather than on first next(), so no event in between is missed
+        self._queues.append(events)
+        return self._drain(events=events, timeout=timeout)
+
+    def _drain(self, events: queue.Queue, timeout: float = None) -> Iterator[StockEvent]:
+        try:
+            while True:
+                try:
+                    event = events.get(timeout=timeout)
+                except queue.Empty:
+                    return
+                if event is None:
+                    return
+                yield event
+        finally:
+            self._queues.remove(events)
+
+    def _next_due(self) -> Union[float, None]:
+        with self._lock:
+            return self._schedule[0][0] if self._schedule else None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                # keep polling; every item is already rescheduled
+                with self._lock:
+                    self.errors += 1
+            due = self._next_due()
+            wait = None if due is None else max(0.0, due - self._clock())
+            self._wake.wait(timeout=wait)
+            self._wake.clear()
+
+    def start(self) -> threading.Thread:
+        """
+        Poll in a background thread until stop() is called
+        :return: the polling thread
+        :rtype: threading.Thread
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        for events in list(self._queues):
+            events.put(None)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'watched': len(self._intervals),
+            'polls': self.polls,
+            'changes': self.changes,
+            'errors': self.errors,
+            'callback_errors': self.callback_errors,
+        }
@@ -0,0 +1,35 @@
+"""
+Run the fake RedSky / api.target.com server on its own, for benchmarks/throughput.py --server-url.
+
+    python -m benchmarks.fake_server --port 8765 --latency 0.02 --jitter 0.01
+"""
+import argparse
+import time
+from typing import List
+
+from benchmarks.stub_server import StubServer
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--locations', type=int, default=2000, help="locations served by ship_locations/v1")
+    parser.add_argument('--search-count', type=int, default=24, help="products per plp_search_v1 page")
+    parser.add_argument('--children', type=int, default=0, help="variant children per pdp_client_v1 product")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds to wait before each response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="maximum extra random seconds per response")
+    args = parser.parse_args(argv)
+
+    with StubServer(location_count=args.locations, search_count=args.search_count, children=args.children,
+                    latency=args.latency, jitter=args.jitter, host=args.host, port=args.port) as server:
+        print(f"Serving on {server.url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
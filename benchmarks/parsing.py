@@ -0,0 +1,279 @@
+"""
+Micro-benchmarks for response decoding, model validation and attribute access.
+
+Times each phase separately for synthetic payloads of increasing size (products per search page, variant children
+per store availability response, list lengths for the products.py / stores.py wrappers, and locations per inventory
+matrix), and measures peak and retained allocations with tracemalloc.
+
+first_access reads attributes of an object for the first time (cached wrapper attributes are invalidated before each
+call); access reads them again from the same object, as templates reading an attribute in a loop do.
+
+    python -m benchmarks.parsing --output baseline.json
+    python -m benchmarks.parsing --baseline baseline.json --threshold 0.25
+
+With --baseline, exits with status 1 if any phase got slower, or allocated more, by more than the threshold.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Sequence
+
+from TargetAPI.helpers import Cached
+from TargetAPI.inventory import InventoryMatrix
+from TargetAPI.models import SearchResults, StoreAvailabilityResults
+from TargetAPI.products import Product, Availability
+from benchmarks import payloads
+
+PHASES = ('decode', 'validate', 'first_access', 'access')
+DEFAULT_SIZES = {
+    'search_results': (1, 10, 100, 1000),
+    'store_availability': (1, 10, 50, 200),
+    'product_wrapper': (1, 10, 50, 200),
+    'availability_wrapper': (1, 10, 50, 200),
+    'inventory_matrix': (10, 200, 2000),
+}
+
+
+class _Target:
+    # stands in for Target where wrappers look up stores
+    def _store_by_id(self, store_id: str):
+        return None
+
+
+def _access_search(model) -> int:
+    count = 0
+    for product in model.data.search.products:
+        count += len(product.tcin) + len(product.item.product_description.title)
+        count += len(product.price.formatted_current_price)
+    return count
+
+
+def _access_store_availability(model) -> int:
+    count = 0
+    for child in model.data.product.children:
+        count += len(child.tcin)
+        count += int(child.price.current_retail)
+    return count
+
+
+def _access_product(product: Product) -> int:
+    count = len(product.promotions) + len(product.features) + len(product.videos)
+    count += len(product.reviews.most_helpful)
+    count += len(product.price.price) + len(product.online.availability)
+    count += product.launch_date.year
+    return count
+
+
+def _access_availability(availability: Availability) -> int:
+    count = 0
+    for location in availability.locations:
+        count += int(location.onhand) + len(location.status)
+    return count + availability.release_date.year
+
+
+def _access_inventory(matrix: InventoryMatrix) -> int:
+    # the rollups availability_wrapper would otherwise answer by looping over AvailabilityLocation wrappers
+    count = len(matrix.group_by_region()) + len(matrix.top(k=10))
+    count += len(matrix.exceeding('demand', 'reserve')) + len(matrix.with_status("IN_STOCK").where('onhand', above=2))
+    return count
+
+
+def case(name: str, size: int) -> Dict[str, Callable[[Any], Any]]:
+    """
+    Build the phases of one benchmark case
+    :param name: case name, a key of DEFAULT_SIZES
+    :param size: payload size
+    :return: raw payload bytes under 'raw', and a function per phase taking the previous phase's output
+    :rtype: Dict[str, Callable]
+    """
+    target = _Target()
+    if name == 'search_results':
+        raw = payloads.search_results(size)
+        validate = lambda data: SearchResults(**data)
+        access = _access_search
+    elif name == 'store_availability':
+        raw = payloads.store_availability("83971257", children=size)
+        validate = lambda data: StoreAvailabilityResults(**data)
+        access = _access_store_availability
+    elif name == 'product_wrapper':
+        raw = payloads.product_details("83971257", items=size)
+        validate = lambda data: Product(data=data, target=target)
+        access = _access_product
+    elif name == 'availability_wrapper':
+        raw = payloads.product_availability(locations=size)
+        validate = lambda data: Availability(data=data, target=target, product=None)
+        access = _access_availability
+    elif name == 'inventory_matrix':
+        raw = payloads.product_availability(locations=size)
+        validate = lambda data: Availability(data=data, target=target, product=None).to_frame()
+        access = _access_inventory
+    else:
+        raise ValueError(f"Unknown case: {name}")
+    return {
+        'raw': json.dumps(raw).encode(),
+        'decode': json.loads,
+        'validate': validate,
+        'access': access,
+    }
+
+
+def _first_access(access: Callable[[Any], Any], value: Any) -> Any:
+    if isinstance(value, Cached):
+        value.invalidate()
+    return access(value)
+
+
+def _time(func: Callable[[], Any], repeat: int, min_time: float) -> List[float]:
+    # seconds per call for each of `repeat` rounds, each round long enough to be measurable
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+    rounds = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) / number)
+    return rounds
+
+
+def _allocations(func: Callable[[], Any]) -> Dict[str, int]:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {'peak_bytes': peak - before, 'retained_bytes': current - before}
+
+
+def run_case(name: str, size: int, repeat: int = 5, min_time: float = 0.05) -> List[dict]:
+    """
+    Benchmark every phase of one case
+    :param name: case name
+    :param size: payload size
+    :param repeat: (Optional) timing rounds per phase
+    :param min_time: (Optional) minimum seconds per timing round
+    :return: one result row per phase
+    :rtype: List[dict]
+    """
+    phases = case(name=name, size=size)
+    decoded = phases['decode'](phases['raw'])
+    validated = phases['validate'](decoded)
+    inputs = {'decode': phases['raw'], 'validate': decoded, 'first_access': validated, 'access': validated}
+    access = phases['access']
+    phases['first_access'] = lambda value: _first_access(access=access, value=value)
+    rows = []
+    for phase in PHASES:
+        func, value = phases[phase], inputs[phase]
+        rounds = _time(lambda: func(value), repeat=repeat, min_time=min_time)
+        rows.append({
+            'case': name,
+            'size': size,
+            'phase': phase,
+            'bytes': len(phases['raw']),
+            'best_seconds': min(rounds),
+            'median_seconds': statistics.median(rounds),
+            **_allocations(lambda: func(value)),
+        })
+    return rows
+
+
+def run_suite(sizes: Dict[str, Sequence[int]] = None, repeat: int = 5, min_time: float = 0.05) -> dict:
+    """
+    Run every case at every size
+    :param sizes: (Optional) sizes per case, defaults to DEFAULT_SIZES
+    :param repeat: (Optional) timing rounds per phase
+    :param min_time: (Optional) minimum seconds per timing round
+    :return: results document
+    :rtype: dict
+    """
+    sizes = sizes or DEFAULT_SIZES
+    results = []
+    for name, case_sizes in sizes.items():
+        for size in case_sizes:
+            results += run_case(name=name, size=size, repeat=repeat, min_time=min_time)
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': sys.version.split()[0],
+        'results': results,
+    }
+
+
+def find_regressions(current: dict, baseline: dict, threshold: float = 0.25,
+                     metrics: Sequence[str] = ('best_seconds', 'peak_bytes')) -> List[dict]:
+    """
+    Compare a run against a baseline
+    :param current: results document from this run
+    :param baseline: results document to compare against
+    :param threshold: (Optional) allowed fractional increase, e.g. 0.25 for 25%
+    :param metrics: (Optional) metrics to compare
+    :return: one row per metric that grew by more than the threshold
+    :rtype: List[dict]
+    """
+    earlier = {(row['case'], row['size'], row['phase']): row for row in baseline['results']}
+    regressions = []
+    for row in current['results']:
+        before = earlier.get((row['case'], row['size'], row['phase']))
+        if before is None:
+            continue
+        for metric in metrics:
+            if before[metric] > 0 and row[metric] > before[metric] * (1 + threshold):
+                regressions.append({'case': row['case'], 'size': row['size'], 'phase': row['phase'],
+                                    'metric': metric, 'baseline': before[metric], 'current': row[metric],
+                                    'ratio': row[metric] / before[metric]})
+    return regressions
+
+
+def _format_table(document: dict) -> str:
+    lines = [f"{'case':<22}{'size':>6}{'phase':>14}{'best us':>12}{'median us':>12}{'peak KiB':>10}{'kept KiB':>10}"]
+    for row in document['results']:
+        lines.append(f"{row['case']:<22}{row['size']:>6}{row['phase']:>14}{row['best_seconds'] * 1e6:>12.1f}"
+                     f"{row['median_seconds'] * 1e6:>12.1f}{row['peak_bytes'] / 1024:>10.1f}"
+                     f"{row['retained_bytes'] / 1024:>10.1f}")
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', nargs='+', choices=sorted(DEFAULT_SIZES), default=list(DEFAULT_SIZES))
+    parser.add_argument('--sizes', nargs='+', type=int, help="payload sizes for every case")
+    parser.add_argument('--repeat', type=int, default=5, help="timing rounds per phase")
+    parser.add_argument('--min-time', type=float, default=0.05, help="minimum seconds per timing round")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--baseline', help="results JSON to check for regressions against")
+    parser.add_argument('--threshold', type=float, default=0.25, help="allowed fractional regression")
+    args = parser.parse_args(argv)
+
+    sizes = {name: args.sizes or DEFAULT_SIZES[name] for name in args.cases}
+    document = run_suite(sizes=sizes, repeat=args.repeat, min_time=args.min_time)
+    print(_format_table(document))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(current=document, baseline=baseline, threshold=args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression['case']} size={regression['size']} {regression['phase']} "
+                  f"{regression['metric']}: {regression['ratio']:.2f}x baseline")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+Synthetic RedSky / api.target.com payloads shaped like the real responses, for offline tests and benchmarks.
+"""
+from typing import List
+
+
+def location(location_id: int, location_type: str = "STORE", region: str = "MN", city: str = "Minneapolis",
+             postal_code: str = "55403", latitude: float = 44.97, longitude: float = -93.27) -> dict:
+    return {
+        'location_id': str(location_id),
+        'location_name': f"{city} {location_id}",
+        'location_type': location_type,
+        'address_line_1': f"{location_id} Nicollet Mall",
+        'city': city,
+        'region': region,
+        'postal_code': postal_code,
+        'latitude': str(latitude),
+        'longitude': str(longitude),
+        'is_active': "Y",
+        'obgb_enabled': "N",
+        'phone': "612-555-0100",
+    }
+
+
+def locations(count: int) -> List[dict]:
+    regions = ["MN", "CA", "TX", "NY", "FL"]
+    return [location(location_id=1000 + i,
+                     location_type="STORE" if i % 10 else "VENDOR",
+                     region=regions[i % len(regions)],
+                     postal_code=f"{55000 + i % 500:05d}",
+                     latitude=25 + (i * 7 % 2300) / 100,
+                     longitude=-124 + (i * 13 % 5600) / 100)
+            for i in range(count)]
+
+
+def search_product(tcin: str) -> dict:
+    return {
+        '__typename': "ProductSummary",
+        'tcin': tcin,
+        'item': {
+            'relationship_type': "Stand Alone",
+            'relationship_type_code': "SA",
+            'merchandise_classification': {'class_id': 1, 'department_id': 2},
+            'enrichment': {
+                'buy_url': f"https://www.target.com/p/-/A-{tcin}",
+                'images': {'primary_image_url': "https://target.scene7.com/a.jpg", 'alternate_image_urls': []},
+            },
+            'compliance': {},
+            'dpci': "000-00-0000",
+            'cart_add_on_threshold': 35.0,
+            'product_description': {
+                'title': f"Product {tcin}",
+                'bullet_descriptions': ["<B>Color:</B> Black"],
+                'soft_bullets': {'bullets': ["fast", "small"]},
+            },
+            'product_vendors': [{'vendor_name': "Vendor", 'id': "1"}],
+            'fulfillment': {},
+            'primary_brand': {'canonical_url': "/b/brand", 'facet_id': "x", 'linking_id': "y", 'name': "Brand"},
+        },
+        'promotions': [],
+        'price': {
+            'formatted_current_price': "$9.99",
+            'formatted_current_price_type': "reg",
+            'location_id': 1928,
+        },
+        'ratings_and_reviews': {'statistics': {'rating': {'average': 4.5, 'count': 10}}},
+    }
+
+
+def search_results(count: int, keyword: str = "iphone", page: int = 1, total_pages: int = 1) -> dict:
+    offset = (page - 1) * count
+    return {
+        'data': {
+            'search': {
+                'search_suggestions': [],
+                'search_recommendations': {},
+                'search_response': {
+                    'facet_list': [],
+                    'metadata': {'response_ids': []},
+                    'typed_metadata': {
+                        'count': count,
+                        'current_page': page,
+                        'keyword': keyword,
+                        'offset': offset,
+                        'sort_by': "relevance",
+                        'total_pages': total_pages,
+                        'total_results': count * total_pages,
+                    },
+                    'sort_options': [],
+                },
+                'products': [search_product(tcin=str(10000000 + offset + i)) for i in range(count)],
+            }
+        }
+    }
+
+
+def online_availability(tcin: str, quantity: float = 5.0) -> dict:
+    return {
+        'data': {
+            'product': {
+                '__typename': "Product",
+                'tcin': tcin,
+                'fulfillment': {
+                    'product_id': tcin,
+                    'is_out_of_stock_in_all_store_locations': quantity <= 0,
+                    'shipping_options': {
+                        'availability_status': "IN_STOCK" if quantity > 0 else "OUT_OF_STOCK",
+                        'loyalty_availability_status': "IN_STOCK" if quantity > 0 else "OUT_OF_STOCK",
+                        'available_to_promise_quantity': quantity,
+                        'services': [],
+                    },
+                },
+            }
+        }
+    }
+
+
+def store_availability(tcin: str, store_id: str = "1928", children: int = 0, price: str = "$9.99") -> dict:
+    child_list = [{
+        '__typename': "Product",
+        'tcin': str(int(tcin) + i + 1),
+        'price': {
+            'formatted_current_price': price,
+            'formatted_current_price_type': "reg",
+            'location_id': int(store_id),
+            'current_retail': float(price.strip("$")),
+        },
+        'promotions': [],
+    } for i in range(children)]
+    return {
+        'data': {
+            'product': {
+                '__typename': "Product",
+                'tcin': tcin,
+                'price': {
+                    'formatted_current_price': price,
+                    'formatted_current_price_type': "reg",
+                    'location_id': int(store_id),
+                    'current_retail': float(price.strip("$")),
+                },
+                'promotions': [],
+                'children': child_list,
+            }
+        }
+    }
+
+
+def product_details(tcin: str, items: int = 1) -> dict:
+    """
+    Product data in the shape wrapped by TargetAPI.products.Product, with `items` promotions, features, videos
+    and reviews
+    """
+    return {
+        'tcin': tcin,
+        'dcpi': "000-00-0000",
+        'title': f"Product {tcin}",
+        'description': "A product",
+        'upc': "012345678905",
+        'price': {'formatted_current_price': "$9.99", 'formatted_current_price_type': "reg"},
+        'onlineInfo': {'availabilityCode': "IN_STOCK", 'pickUpInStoreStatus': "AVAILABLE", 'freeShipping': True},
+        'promotions': [{'id': str(i), 'applied_location_id': "1928", 'channel': "ONLINE", 'pdp_message': "Save"}
+                       for i in range(items)],
+        'features': [{'name': f"Feature {i}:", 'value': "yes"} for i in range(items)],
+        'softBullets': {'bullets': ["fast", "small"]},
+        'videos': [{'video_title': f"Video {i}", 'video_files': [{'video_url': f"https://example.com/{i}.mp4"}]}
+                   for i in range(items)],
+        'guestReviews': {
+            'guestReviewCount': items,
+            'overallGuestRating': 4.5,
+            'ratingDistribution': {'5': items},
+            'mostHelpfulReviews': [{'title': f"Review {i}", 'submissionTime': "2020-11-12T08:30:00+0000",
+                                    'reviewText': "Great", 'rating': 5, 'totalFeedbackCount': 3,
+                                    'totalPositiveFeedbackCount': 2, 'reviewType': "REVIEW"}
+                                   for i in range(items)],
+        },
+        'images': {'primaryUri': "https://target.scene7.com/a.jpg"},
+        'launchDate': "2020-11-12T08:30:00+0000",
+    }
+
+
+def product_availability(locations: int = 1) -> dict:
+    """
+    Availability data in the shape wrapped by TargetAPI.products.Availability, with `locations` store locations
+    """
+    return {
+        'availability': "IN_STOCK",
+        'availability_status': "IN_STOCK",
+        'available_to_promise_quantity': float(locations * 5),
+        'release_date': "2020-11-12T00:00:00.000Z",
+        'available_to_purchase_date_time': "2020-11-12T08:00:00.000Z",
+        'locations': [{
+            'location_id': str(1000 + i),
+            'onhand_quantity': float(i % 7),
+            'location_demand_sum': 0.0,
+            'availability_status': "IN_STOCK" if i % 7 else "OUT_OF_STOCK",
+        } for i in range(locations)],
+    }
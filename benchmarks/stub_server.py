@@ -0,0 +1,117 @@
+"""
+A threaded local HTTP server that answers the RedSky and api.target.com endpoints with synthetic payloads.
+"""
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from benchmarks import payloads
+
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 1024
+
+
+class StubServer:
+    def __init__(self, location_count: int = 50, search_count: int = 24, total_pages: int = 1, children: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0, host: str = '127.0.0.1', port: int = 0):
+        """
+        :param location_count: (Optional) Number of locations served by ship_locations/v1
+        :param search_count: (Optional) Number of products per plp_search_v1 page
+        :param total_pages: (Optional) Number of plp_search_v1 pages reported
+        :param children: (Optional) Number of variant children per pdp_client_v1 product
+        :param latency: (Optional) Seconds to wait before answering each request
+        :param jitter: (Optional) Maximum extra random seconds added to latency
+        :param host: (Optional) Address to listen on
+        :param port: (Optional) Port to listen on, 0 for any free port
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.request_count = 0
+        self.status_override = None
+        self.status_queue = []
+        self.headers_override = {}
+        self.body_override = None
+        self.quantities = {}
+        self.prices = {}
+        self._lock = threading.Lock()
+        self._bodies = {
+            'locations': json.dumps(payloads.locations(location_count)).encode(),
+        }
+        self._search_count = search_count
+        self._total_pages = total_pages
+        self._children = children
+        self._server = _Server((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def body_for(self, path: str, query: dict) -> bytes:
+        if path.endswith('ship_locations/v1'):
+            return self._bodies['locations']
+        if path.endswith('plp_search_v1'):
+            return json.dumps(payloads.search_results(self._search_count, keyword=query.get('keyword', ''),
+                                                      page=int(query.get('pageNumber', 1)),
+                                                      total_pages=self._total_pages)).encode()
+        if path.endswith('product_fulfillment_v1'):
+            return json.dumps(payloads.online_availability(query['tcin'],
+                                                           quantity=self.quantities.get(query['tcin'], 5.0))).encode()
+        if path.endswith('pdp_client_v1'):
+            store_id = query.get('store_id', '1928')
+            return json.dumps(payloads.store_availability(query['tcin'], store_id, children=self._children,
+                                                          price=self.prices.get((query['tcin'], store_id),
+                                                                                "$9.99"))).encode()
+        return b''
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # headers and body are written separately; without this each response waits on a delayed ACK
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.request_count += 1
+                    queued_status = stub.status_queue.pop(0) if stub.status_queue else None
+                delay = stub.latency + (random.uniform(0, stub.jitter) if stub.jitter else 0)
+                if delay:
+                    time.sleep(delay)
+                parsed = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                body = stub.body_override if stub.body_override is not None else stub.body_for(parsed.path, query)
+                status = queued_status or stub.status_override or (200 if body else 404)
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for key, value in stub.headers_override.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
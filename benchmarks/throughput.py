@@ -0,0 +1,253 @@
+"""
+End-to-end client throughput against a local fake RedSky / api.target.com server.
+
+Runs product search, single-product availability and multi-store availability sweeps (validating on threads, and
+in worker processes) at several concurrency levels, and reports operations and requests per second, p50/p99 latency and peak traced memory.
+
+    python -m benchmarks.throughput --concurrency 1 8 32 --latency 0.02 --jitter 0.01 --output results.json
+    python -m benchmarks.throughput --compare results.json
+
+Pass --server-url to benchmark against a fake server running in another process
+(python -m benchmarks.fake_server), so its work doesn't share the client's CPU and memory measurements.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Union
+
+from TargetAPI import Target
+from TargetAPI.models import SearchProduct
+from TargetAPI.retry import NO_RETRY
+from benchmarks.stub_server import StubServer
+
+SCENARIOS = ('search', 'availability', 'store_sweep', 'process_sweep')
+SWEEPS = ('store_sweep', 'process_sweep')
+PRODUCT = SearchProduct(tcin="83971257")
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """
+    Nearest-rank percentile
+    :param values: samples
+    :param percent: percentile, 0-100
+    :return: the sample at that percentile, 0 if there are none
+    :rtype: float
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _client(url: str, concurrency: int) -> Target:
+    return Target(api_key="benchmark", api_base_url=url, redsky_base_url=url, pool_maxsize=max(10, concurrency),
+                  retry_policy=NO_RETRY)
+
+
+def _operation(client: Target, scenario: str, concurrency: int, stores: int) -> Callable[[int], int]:
+    # returns a function running one operation and returning the number of requests it made
+    if scenario == 'search':
+        def run(i: int) -> int:
+            client.search(keyword=f"keyword {i}")
+            return 1
+    elif scenario == 'availability':
+        def run(i: int) -> int:
+            client.redsky.product_availability(product=SearchProduct(tcin=str(10000000 + i)))
+            return 1
+    elif scenario == 'store_sweep':
+        sweep_stores = client.stores[:stores]
+
+        def run(i: int) -> int:
+            # one sweep fans out over its stores itself, so sweeps run one at a time
+            return sum(1 for _ in client.product_availability_across_stores(product=PRODUCT, stores=sweep_stores,
+                                                                            max_workers=concurrency))
+    elif scenario == 'process_sweep':
+        sweep_stores = client.stores[:stores]
+
+        def run(i: int) -> int:
+            # includes starting the worker processes, one per CPU
+            return sum(1 for _ in client.product_availability_across_stores(product=PRODUCT, stores=sweep_stores,
+                                                                            max_workers=concurrency,
+                                                                            processes=os.cpu_count()))
+    else:
+        raise ValueError(f"Unknown scenario: {scenario}")
+    return run
+
+
+def _timed(func: Callable[[int], int], i: int) -> tuple:
+    start = time.perf_counter()
+    requests = func(i)
+    return time.perf_counter() - start, requests
+
+
+def run_scenario(url: str, scenario: str, concurrency: int, operations: int, stores: int = 100,
+                 trace_memory: bool = True) -> dict:
+    """
+    Benchmark one scenario at one concurrency level
+    :param url: fake server base URL
+    :param scenario: one of SCENARIOS
+    :param concurrency: number of concurrent requests
+    :param operations: number of operations to time
+    :param stores: (Optional) number of stores per store_sweep operation
+    :param trace_memory: (Optional) repeat the run under tracemalloc to measure peak memory
+    :return: result row
+    :rtype: dict
+    """
+    client = _client(url=url, concurrency=concurrency)
+    run = _operation(client=client, scenario=scenario, concurrency=concurrency, stores=stores)
+    workers = 1 if scenario in SWEEPS else concurrency
+    run(0)  # warm up connections and, for store sweeps, the location list
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        start = time.perf_counter()
+        samples = list(executor.map(lambda i: _timed(run, i), range(operations)))
+        seconds = time.perf_counter() - start
+    latencies = [latency for latency, _ in samples]
+    requests = sum(count for _, count in samples)
+
+    peak_memory = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(run, range(operations)))
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'scenario': scenario,
+        'concurrency': concurrency,
+        'operations': operations,
+        'requests': requests,
+        'seconds': seconds,
+        'operations_per_second': operations / seconds,
+        'requests_per_second': requests / seconds,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def run_suite(scenarios: List[str] = SCENARIOS, concurrency: List[int] = (1, 8, 32), operations: int = 200,
+              sweeps: int = 5, stores: int = 100, latency: float = 0.0, jitter: float = 0.0, children: int = 0,
+              server_url: str = None, trace_memory: bool = True) -> dict:
+    """
+    Run every scenario at every concurrency level
+    :param scenarios: (Optional) scenarios to run
+    :param concurrency: (Optional) concurrency levels
+    :param operations: (Optional) operations per search and availability run
+    :param sweeps: (Optional) operations per store_sweep run
+    :param stores: (Optional) stores per sweep
+    :param latency: (Optional) fake server latency in seconds
+    :param jitter: (Optional) maximum extra random fake server latency in seconds
+    :param children: (Optional) variant children per pdp_client_v1 product
+    :param server_url: (Optional) use a fake server that is already running instead of starting one
+    :param trace_memory: (Optional) measure peak memory
+    :return: results document
+    :rtype: dict
+    """
+    config = {
+        'scenarios': list(scenarios),
+        'concurrency': list(concurrency),
+        'operations': operations,
+        'sweeps': sweeps,
+        'stores': stores,
+        'latency': latency,
+        'jitter': jitter,
+        'children': children,
+        'server_url': server_url,
+    }
+    server = None
+    if server_url is None:
+        server = StubServer(location_count=max(stores, 50), children=children, latency=latency, jitter=jitter)
+        server.start()
+        server_url = server.url
+    try:
+        results = [run_scenario(url=server_url, scenario=scenario, concurrency=level,
+                                operations=sweeps if scenario in SWEEPS else operations, stores=stores,
+                                trace_memory=trace_memory)
+                   for scenario in scenarios for level in concurrency]
+    finally:
+        if server is not None:
+            server.stop()
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'config': config,
+        'results': results,
+    }
+
+
+def compare(current: dict, previous: dict) -> List[dict]:
+    """
+    Match result rows between two runs
+    :param current: results document from this run
+    :param previous: results document from an earlier run
+    :return: rows with the ratio of each metric, current / previous
+    :rtype: List[dict]
+    """
+    earlier = {(row['scenario'], row['concurrency']): row for row in previous['results']}
+    rows = []
+    for row in current['results']:
+        before = earlier.get((row['scenario'], row['concurrency']))
+        if before is None:
+            continue
+        ratios: Dict[str, Union[float, None]] = {}
+        for metric in ('requests_per_second', 'p50_ms', 'p99_ms', 'peak_memory_bytes'):
+            ratios[metric] = row[metric] / before[metric] if row[metric] and before[metric] else None
+        rows.append({'scenario': row['scenario'], 'concurrency': row['concurrency'], **ratios})
+    return rows
+
+
+def _format_table(document: dict) -> str:
+    lines = [f"{'scenario':<14}{'conc':>6}{'ops/s':>10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'peak MiB':>10}"]
+    for row in document['results']:
+        memory = f"{row['peak_memory_bytes'] / 2 ** 20:.1f}" if row['peak_memory_bytes'] is not None else "-"
+        lines.append(f"{row['scenario']:<14}{row['concurrency']:>6}{row['operations_per_second']:>10.1f}"
+                     f"{row['requests_per_second']:>10.1f}{row['p50_ms']:>10.2f}{row['p99_ms']:>10.2f}{memory:>10}")
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 8, 32])
+    parser.add_argument('--operations', type=int, default=200, help="operations per search/availability run")
+    parser.add_argument('--sweeps', type=int, default=5, help="operations per store_sweep / process_sweep run")
+    parser.add_argument('--stores', type=int, default=100, help="stores per sweep")
+    parser.add_argument('--latency', type=float, default=0.0, help="fake server latency, seconds")
+    parser.add_argument('--jitter', type=float, default=0.0, help="maximum extra fake server latency, seconds")
+    parser.add_argument('--children', type=int, default=0, help="variant children per pdp_client_v1 product")
+    parser.add_argument('--server-url', help="use an already running fake server")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--compare', help="compare against results JSON from an earlier run")
+    args = parser.parse_args(argv)
+
+    document = run_suite(scenarios=args.scenarios, concurrency=args.concurrency, operations=args.operations,
+                         sweeps=args.sweeps, stores=args.stores, latency=args.latency, jitter=args.jitter,
+                         children=args.children, server_url=args.server_url, trace_memory=not args.no_memory)
+    print(_format_table(document))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        print(f"\nversus {args.compare} (current / previous):")
+        for row in compare(current=document, previous=previous):
+            print("  " + ", ".join(f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+                                   for key, value in row.items()))
+
+
+if __name__ == '__main__':
+    main()
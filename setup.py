@@ -21,6 +21,14 @@ setuptools.setup(
     download_url=f'https://github.com/nwithan8/{package_info.__title__}/archive/{package_info.__version__}.tar.gz',
     keywords=package_info.__keywords__,
     install_requires=requirements,
+    entry_points={
+        'console_scripts': ['targetapi=TargetAPI.cli:main'],
+    },
+    extras_require={
+        'async': ['aiohttp'],
+        'numpy': ['numpy'],
+        'orjson': ['orjson'],
+    },
     classifiers=[
         'License :: OSI Approved :: GNU General Public License v3 (GPLv3)',
         'Development Status :: 4 - Beta',
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+
+from TargetAPI import AsyncTarget
+from TargetAPI.models import SearchProduct, Location
+from benchmarks import payloads
+
+
+async def _stub_app() -> web.Application:
+    async def ship_locations(request):
+        return web.json_response(payloads.locations(20))
+
+    async def search(request):
+        return web.json_response(payloads.search_results(5, keyword=request.query['keyword']))
+
+    async def online(request):
+        return web.json_response(payloads.online_availability(request.query['tcin']))
+
+    async def in_store(request):
+        return web.json_response(payloads.store_availability(request.query['tcin'], request.query['store_id']))
+
+    app = web.Application()
+    app.router.add_get('/ship_locations/v1', ship_locations)
+    app.router.add_get('/redsky_aggregations/v1/web/plp_search_v1', search)
+    app.router.add_get('/redsky_aggregations/v1/web_platform/product_fulfillment_v1', online)
+    app.router.add_get('/redsky_aggregations/v1/web/pdp_client_v1', in_store)
+    return app
+
+
+async def _with_stub(test):
+    runner = web.AppRunner(await _stub_app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    base_url = f"http://127.0.0.1:{port}/"
+    try:
+        async with AsyncTarget(api_key="test", api_base_url=base_url, redsky_base_url=base_url) as target:
+            await test(target)
+    finally:
+        await runner.cleanup()
+
+
+def test_async_stores():
+    async def test(target: AsyncTarget):
+        stores = await target.stores()
+        assert len(stores) == 18
+        assert (await target._store_by_id(store_id="1001")).location_id == "1001"
+
+    asyncio.run(_with_stub(test))
+
+
+def test_async_search_and_availability():
+    async def test(target: AsyncTarget):
+        results = await target.search(keyword="iphone")
+        assert len(results) == 5
+        online, in_store = await asyncio.gather(
+            target.redsky.product_availability(product=results[0]),
+            target.redsky.product_availability_at_store(product=results[0], store=Location(location_id="1928")))
+        assert online.tcin == results[0].tcin
+        assert in_store.price.formatted_current_price == "$9.99"
+
+    asyncio.run(_with_stub(test))
+
+
+def test_async_shared_connector():
+    async def test(target: AsyncTarget):
+        product = SearchProduct(tcin="83971257")
+        await asyncio.gather(*[target.redsky.product_availability(product=product) for _ in range(50)])
+        assert target.session.connector.limit == 100
+
+    asyncio.run(_with_stub(test))
+
+
+def test_async_search_iter():
+    async def test(target: AsyncTarget):
+        products = [product async for product in target.search_iter(keyword="iphone", max_pages=3)]
+        assert len(products) == 5
+
+    asyncio.run(_with_stub(test))
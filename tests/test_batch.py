@@ -0,0 +1,82 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from TargetAPI import Target
+from TargetAPI.models import SearchProduct, StoreProduct, OnlineProduct
+from benchmarks.stub_server import StubServer
+
+
+def _client(server: StubServer, **kwargs) -> Target:
+    return Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url, **kwargs)
+
+
+def _price(product: StoreProduct) -> str:
+    # runs in the worker process
+    return product.price.formatted_current_price
+
+
+def _fussy(product: OnlineProduct) -> str:
+    # runs in the worker process
+    if product.tcin == "101":
+        raise ValueError("bad product")
+    return product.tcin
+
+
+def test_store_batch_matches_threaded():
+    with StubServer(location_count=20) as server:
+        client = _client(server)
+        stores = client.stores[:6]
+        product = SearchProduct(tcin="100")
+        threaded = list(client.product_availability_across_stores(product=product, stores=stores, ordered=True))
+        with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn")) as processes:
+            batched = list(client.product_availability_across_stores(product=product, stores=stores, ordered=True,
+                                                                     max_workers=2, processes=processes))
+            server.prices[("100", stores[0].location_id)] = "$7.99"
+            prices = {store.location_id: price for (_, store), price in client.redsky.product_availability_at_stores_batch(
+                pairs=((product, store) for store in stores), processes=processes, transform=_price)}
+    assert [store for store, _ in batched] == list(stores)
+    assert [availability for _, availability in batched] == [availability for _, availability in threaded]
+    assert isinstance(batched[0][1], StoreProduct)
+    assert prices[stores[0].location_id] == "$7.99"
+    assert prices[stores[1].location_id] == "$9.99"
+
+
+def test_online_and_search_batches():
+    with StubServer(search_count=3) as server:
+        client = _client(server, metrics=True)
+        products = [SearchProduct(tcin=str(tcin)) for tcin in range(100, 105)]
+        results = {product.tcin: availability for product, availability
+                   in client.redsky.product_availability_batch(products=products, processes=2)}
+        searches = dict(client.redsky.search_batch(keywords=["ps5", "xbox"], processes=1, ordered=True))
+    assert set(results) == {product.tcin for product in products}
+    assert all(isinstance(result, OnlineProduct) for result in results.values())
+    assert [len(products) for products in searches.values()] == [3, 3]
+    assert client.redsky.timings.decodes == 7
+    assert "validation" in client.metrics_text()
+
+
+def test_batch_skips_unchanged_responses():
+    with StubServer() as server:
+        client = _client(server, fingerprint=True)
+        products = [SearchProduct(tcin=str(tcin)) for tcin in range(100, 104)]
+        first = {product.tcin: availability for product, availability
+                 in client.redsky.product_availability_batch(products=products, processes=1)}
+        second = {product.tcin: availability for product, availability
+                  in client.redsky.product_availability_batch(products=products, processes=1)}
+    assert client.redsky.fingerprints.stats['unchanged'] == 4
+    assert all(second[tcin] is first[tcin] for tcin in first)
+    assert client.redsky.timings.decodes == 4
+
+
+def test_batch_failures_only_fail_their_item():
+    with StubServer() as server:
+        client = _client(server)
+        products = [SearchProduct(tcin=str(tcin)) for tcin in range(100, 104)]
+        server.status_queue = [404]
+        results = list(client.redsky.product_availability_batch(products=products, processes=1, max_workers=1,
+                                                                ordered=True, transform=_fussy))
+        assert [result for _, result in results] == [None, None, "102", "103"]
+        results = dict((product.tcin, result) for product, result in client.redsky.product_availability_batch(
+            products=products, processes=1, transform=_fussy, return_exceptions=True))
+    assert isinstance(results["101"], ValueError)
+    assert results["100"] == "100"
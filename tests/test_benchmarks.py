@@ -0,0 +1,48 @@
+import json
+
+from benchmarks import throughput, parsing
+
+
+def test_percentile():
+    values = [float(i) for i in range(1, 101)]
+    assert throughput.percentile(values, 50) == 50.0
+    assert throughput.percentile(values, 99) == 99.0
+    assert throughput.percentile([], 50) == 0.0
+
+
+def test_throughput_suite_smoke(tmp_path):
+    output = tmp_path / "results.json"
+    throughput.main(['--concurrency', '1', '4', '--operations', '5', '--sweeps', '1', '--stores', '10',
+                     '--output', str(output)])
+    document = throughput.run_suite(concurrency=[2], operations=4, sweeps=1, stores=10, trace_memory=False)
+    rows = {row['scenario']: row for row in document['results']}
+    assert set(rows) == set(throughput.SCENARIOS)
+    assert rows['store_sweep']['requests'] == rows['process_sweep']['requests'] == 10
+    assert rows['search']['requests_per_second'] > 0
+    assert rows['availability']['peak_memory_bytes'] is None
+    assert output.exists()
+    ratios = throughput.compare(current=document, previous=document)
+    assert all(row['requests_per_second'] == 1.0 for row in ratios)
+
+
+def test_parsing_suite_smoke():
+    document = parsing.run_suite(sizes={name: (2,) for name in parsing.DEFAULT_SIZES}, repeat=1, min_time=0)
+    rows = {(row['case'], row['phase']): row for row in document['results']}
+    assert len(rows) == len(parsing.DEFAULT_SIZES) * len(parsing.PHASES)
+    assert rows[('search_results', 'validate')]['peak_bytes'] > 0
+    assert all(row['best_seconds'] > 0 for row in document['results'])
+
+
+def test_parsing_regression_threshold(tmp_path):
+    baseline = parsing.run_suite(sizes={'store_availability': (5,)}, repeat=1, min_time=0)
+    slower = {'results': [dict(row, best_seconds=row['best_seconds'] * 2) for row in baseline['results']]}
+    assert parsing.find_regressions(current=baseline, baseline=baseline) == []
+    regressions = parsing.find_regressions(current=slower, baseline=baseline, threshold=0.5)
+    assert {regression['phase'] for regression in regressions} == set(parsing.PHASES)
+    assert all(regression['metric'] == 'best_seconds' for regression in regressions)
+
+    path = tmp_path / "baseline.json"
+    path.write_text(json.dumps({'results': [dict(row, best_seconds=row['best_seconds'] / 100)
+                                            for row in baseline['results']]}))
+    assert parsing.main(['--cases', 'store_availability', '--sizes', '5', '--repeat', '1', '--min-time', '0',
+                         '--baseline', str(path)]) == 1
@@ -0,0 +1,64 @@
+from TargetAPI import Target
+from TargetAPI.cache import ResponseCache
+from TargetAPI.models import SearchProduct, Location
+from benchmarks.stub_server import StubServer
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_key_ignores_api_key_and_param_order():
+    cache = ResponseCache()
+    cache.set(endpoint="a/pdp_client_v1", params={'tcin': 1, 'store_id': 2, 'key': "one"}, value={'x': 1})
+    assert cache.get(endpoint="a/pdp_client_v1", params={'store_id': 2, 'tcin': 1, 'key': "two"}) == {'x': 1}
+    assert cache.stats['hits'] == 1
+
+
+def test_per_endpoint_ttl():
+    clock = _Clock()
+    cache = ResponseCache(ttls={'pdp_client_v1': 10, 'plp_search_v1': 100}, clock=clock)
+    cache.set(endpoint="x/pdp_client_v1", params={}, value=1)
+    cache.set(endpoint="x/plp_search_v1", params={}, value=2)
+    clock.now = 50
+    assert cache.get(endpoint="x/pdp_client_v1") is None
+    assert cache.get(endpoint="x/plp_search_v1") == 2
+    assert cache.stats['expirations'] == 1
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = ResponseCache(max_entries=2, max_bytes=100)
+    cache.set(endpoint="e", params={'i': 1}, value=1, size=10)
+    cache.set(endpoint="e", params={'i': 2}, value=2, size=10)
+    cache.get(endpoint="e", params={'i': 1})
+    cache.set(endpoint="e", params={'i': 3}, value=3, size=10)
+    assert cache.get(endpoint="e", params={'i': 2}) is None
+    cache.set(endpoint="e", params={'i': 4}, value=4, size=95)
+    assert len(cache) == 1
+    assert cache.stats['evictions'] == 3
+
+
+def test_client_uses_cache():
+    with StubServer() as server:
+        target = Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url, cache=ResponseCache())
+        product = SearchProduct(tcin="83971257")
+        for _ in range(5):
+            assert target.redsky.product_availability(product=product).tcin == "83971257"
+        assert server.request_count == 1
+        assert target.redsky.cache.stats['hits'] == 4
+
+
+def test_shared_cache_keeps_hosts_apart():
+    cache = ResponseCache()
+    product, store = SearchProduct(tcin="83971257"), Location(location_id="1928")
+    with StubServer() as first, StubServer() as second:
+        second.prices[("83971257", "1928")] = "$1.99"
+        prices = [Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url, cache=cache)
+                  .redsky.product_availability_at_store(product=product, store=store).price.formatted_current_price
+                  for server in (first, second, first)]
+        assert (first.request_count, second.request_count) == (1, 1)
+    assert prices == ["$9.99", "$1.99", "$9.99"]
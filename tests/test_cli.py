@@ -0,0 +1,96 @@
+import csv
+import io
+import json
+
+from TargetAPI.cli import main, Progress
+from benchmarks.stub_server import StubServer
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _run(server: StubServer, *argv: str):
+    stdout, stderr = io.StringIO(), io.StringIO()
+    status = main(['scan', *argv, '--api-key', 'test', '--api-base-url', server.url, '--redsky-base-url', server.url,
+                   '--no-progress'], stdout=stdout, stderr=stderr)
+    return status, stdout.getvalue(), stderr.getvalue()
+
+
+def test_availability_at_stores_csv():
+    with StubServer() as server:
+        server.prices[("100", "2000")] = "$7.99"
+        status, out, err = _run(server, 'availability', '--tcins', '100', '200', '--stores', '1928', '2000',
+                                '--format', 'csv', '--concurrency', '4', '--rate', '1000')
+    assert status == 0
+    rows = list(csv.DictReader(io.StringIO(out)))
+    assert sorted((row['tcin'], row['store.location_id']) for row in rows) == \
+        [("100", "1928"), ("100", "2000"), ("200", "1928"), ("200", "2000")]
+    assert {row['product.price.formatted_current_price'] for row in rows if row['tcin'] == "100"} == \
+        {"$9.99", "$7.99"}
+    assert "4 jobs, 4 rows" in err
+    assert "failed jobs: none" in err
+
+
+def test_online_availability_and_search(tmp_path):
+    keywords = tmp_path / "keywords.txt"
+    keywords.write_text("# comment\nps5\n\nxbox\n")
+    with StubServer(search_count=3) as server:
+        status, out, _ = _run(server, 'availability', '--tcins', '100')
+        assert status == 0
+        row = json.loads(out)
+        assert row['tcin'] == "100"
+        assert row['product.fulfillment.shipping_options.availability_status'] == "IN_STOCK"
+
+        status, out, _ = _run(server, 'search', '--keywords-file', str(keywords), '--columns', 'keyword',
+                              'product.tcin')
+    assert status == 0
+    rows = [json.loads(line) for line in out.splitlines()]
+    assert len(rows) == 6
+    assert {row['keyword'] for row in rows} == {"ps5", "xbox"}
+
+
+def test_failed_jobs_are_counted():
+    with StubServer() as server:
+        server.status_override = 400
+        status, out, err = _run(server, 'availability', '--tcins', '100', '200')
+    assert status == 1
+    assert out == ""
+    assert "2 jobs, 0 rows" in err
+
+
+def test_undecodable_jobs_are_reported_per_item():
+    with StubServer() as server:
+        server.body_override = b"not json"
+        status, out, err = _run(server, 'availability', '--tcins', '100', '--format', 'csv')
+        assert status == 1
+        assert "failed '100': " in err
+        assert "1 jobs, 0 rows" in err
+
+
+def test_store_list_failure_exits_cleanly():
+    with StubServer() as server:
+        server.status_override = 503
+        status, out, err = _run(server, 'availability', '--tcins', '100', '--all-stores')
+    assert status == 2
+    assert "error: couldn't load the store list: ServerError" in err
+    assert "Traceback" not in err
+
+
+def test_progress_line():
+    clock = _Clock()
+    progress = Progress(total=10, show=False, clock=clock)
+    for seconds in (0.01, 0.02, 0.2):
+        progress.on_metric(endpoint="e", phase="network", seconds=seconds, status=200, size=10)
+    progress.on_metric(endpoint="e", phase="network", seconds=0.05, status=None, size=None)
+    progress.on_metric(endpoint="e", phase="decode", seconds=1.0, status=None, size=None)
+    progress.job_done()
+    progress.job_done(error=ValueError())
+    clock.now = 2.0
+    assert progress.line() == "2/10 jobs  2.0 req/s  p50 50ms  p99 200ms  1 failed"
+    summary = progress.summary()
+    assert (summary['requests'], summary['http_errors'], summary['failed_jobs']) == (4, 1, {'ValueError': 1})
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from TargetAPI import Target
+from TargetAPI.coalesce import SingleFlight, AsyncSingleFlight
+from TargetAPI.models import SearchProduct, Location
+from benchmarks.stub_server import StubServer
+
+
+def test_single_flight_collapses_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def work():
+        calls.append(1)
+        time.sleep(0.05)
+        return "result"
+
+    results = []
+
+    def caller():
+        barrier.wait()
+        results.append(flight.do(key="k", func=work))
+
+    threads = [threading.Thread(target=caller) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["result"] * 8
+    assert len(calls) == 1
+    assert flight.stats == {'calls': 1, 'collapsed': 7, 'in_flight': 0}
+
+
+def test_single_flight_shares_errors():
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        flight.do(key="k", func=fail)
+    assert flight.do(key="k", func=lambda: 1) == 1
+
+
+def test_async_single_flight():
+    async def run():
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*[flight.do(key="k", func=work) for _ in range(10)])
+        assert results == ["result"] * 10
+        assert len(calls) == 1
+        assert flight.collapsed == 9
+        assert flight.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_client_coalesces_identical_requests():
+    with StubServer(latency=0.1) as server:
+        target = Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url, coalesce=True)
+        product, store = SearchProduct(tcin="83971257"), Location(location_id="1928")
+        results = list(target.redsky.product_availability_across_stores(product=product, stores=[store] * 10,
+                                                                         max_workers=10))
+        assert all(result.tcin == "83971257" for _, result in results)
+        assert server.request_count < 10
+        assert target.redsky.single_flight.collapsed == 10 - server.request_count
+
+
+def test_shared_single_flight_keeps_hosts_apart():
+    flight = SingleFlight()
+    product, store = SearchProduct(tcin="83971257"), Location(location_id="1928")
+    with StubServer(latency=0.1) as first, StubServer(latency=0.1) as second:
+        second.prices[("83971257", "1928")] = "$1.99"
+        targets = [Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url, coalesce=flight)
+                   for server in (first, second)]
+        barrier = threading.Barrier(2)
+        prices = {}
+
+        def fetch(i: int):
+            barrier.wait()
+            prices[i] = targets[i].redsky.product_availability_at_store(product=product, store=store).price
+
+        threads = [threading.Thread(target=fetch, args=(i,)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert first.request_count == second.request_count == 1
+    assert flight.collapsed == 0
+    assert (prices[0].formatted_current_price, prices[1].formatted_current_price) == ("$9.99", "$1.99")
@@ -0,0 +1,36 @@
+import pytest
+
+import TargetAPI.decoders as decoders
+from TargetAPI import Target
+from TargetAPI.decoders import get_decoder, stdlib_decoder
+from benchmarks.stub_server import StubServer
+
+
+def test_get_decoder():
+    assert get_decoder('json') is stdlib_decoder
+    assert get_decoder(len) is len
+    assert get_decoder()(b'{"a": [1, 2]}') == {'a': [1, 2]}
+    with pytest.raises(ValueError):
+        get_decoder('yaml')
+
+
+def test_missing_accelerated_decoder_falls_back(monkeypatch):
+    monkeypatch.setattr(decoders, "orjson", None)
+    assert get_decoder('orjson') is stdlib_decoder
+    assert get_decoder() is stdlib_decoder
+
+
+def test_client_decoder_and_timings():
+    calls = []
+
+    def decoder(content: bytes):
+        calls.append(type(content))
+        return stdlib_decoder(content)
+
+    with StubServer() as server:
+        target = Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url, decoder=decoder)
+        assert len(target.search(keyword="iphone")) == 24
+        assert calls == [bytes]
+        assert target.redsky.timings.requests == 1
+        assert target.redsky.timings.decodes == 1
+        assert target.redsky.timings.decode_seconds > 0
@@ -0,0 +1,90 @@
+import csv
+import gzip
+import io
+import json
+import tracemalloc
+
+from TargetAPI import Target
+from TargetAPI.export import export, availability_rows, get_path, CSV, SEARCH_PRODUCT_COLUMNS
+from TargetAPI.models import SearchProduct
+from benchmarks import payloads
+from benchmarks.stub_server import StubServer
+
+
+class _Sink:
+    def write(self, text: str):
+        pass
+
+
+def test_get_path():
+    row = {'a': [{'b': 1}], 'c': None}
+    assert get_path(row, 'a.0.b') == 1
+    assert get_path(row, 'a.5.b') is None
+    assert get_path(row, 'c.d') is None
+
+
+def test_ndjson_from_search_iter(tmp_path):
+    path = tmp_path / "search.ndjson"
+    with StubServer(search_count=5, total_pages=3) as server:
+        client = Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url, lazy=True)
+        assert export(rows=client.search_iter(keyword="tv"), output=str(path)) == 15
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) == 15
+    assert list(lines[0]) == list(SEARCH_PRODUCT_COLUMNS)
+    assert lines[0]['tcin'] == "10000000"
+    assert lines[0]['price.formatted_current_price'] == "$9.99"
+
+
+def test_gzip_csv_availability_with_projection(tmp_path):
+    path = tmp_path / "availability.csv.gz"
+    with StubServer(location_count=20) as server:
+        client = Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url)
+        pairs = client.product_availability_across_stores(product=SearchProduct(tcin="1"), max_workers=4,
+                                                          ordered=True)
+        columns = ['store.location_id', 'product.price.formatted_current_price', 'product.promotions']
+        written = export(rows=availability_rows(pairs), output=str(path), columns=columns)
+        assert written == len(client.stores)
+    with gzip.open(path, 'rt', newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == columns
+    assert rows[1] == [client.stores[0].location_id, '$9.99', '[]']
+
+
+def test_export_to_file_object():
+    output = io.StringIO()
+    products = [SearchProduct(**payloads.search_product(tcin=str(i))) for i in range(3)]
+    assert export(rows=products, output=output, format=CSV, columns=['tcin']) == 3
+    assert output.getvalue().splitlines() == ['tcin', '0', '1', '2']
+    assert export(rows=[], output=output) == 0
+
+
+def test_leading_none_rows_and_empty_output(tmp_path):
+    products = [None, None] + [SearchProduct(**payloads.search_product(tcin=str(i))) for i in range(2)]
+    output = io.StringIO()
+    assert export(rows=products, output=output) == 2
+    assert [json.loads(line)['tcin'] for line in output.getvalue().splitlines()] == ['0', '1']
+
+    path = tmp_path / "empty.csv"
+    assert export(rows=iter([None]), output=str(path), columns=['tcin']) == 0
+    assert path.read_text().splitlines() == ['tcin']
+    path = tmp_path / "empty.ndjson.gz"
+    assert export(rows=[], output=str(path)) == 0
+    with gzip.open(path, 'rt') as f:
+        assert f.read() == ""
+
+
+def test_memory_stays_flat():
+    def products(count: int):
+        for i in range(count):
+            yield SearchProduct(**payloads.search_product(tcin=str(i)))
+
+    def peak(count: int) -> int:
+        tracemalloc.start()
+        try:
+            export(rows=products(count), output=_Sink())
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    small, large = peak(100), peak(2000)
+    assert large < small * 2
@@ -0,0 +1,107 @@
+from TargetAPI import Target
+from TargetAPI.cache import ResponseCache
+from TargetAPI.fingerprint import FingerprintStore, UNCHANGED
+from TargetAPI.models import SearchProduct, Location
+from benchmarks.stub_server import StubServer
+
+PRODUCT = SearchProduct(tcin="83971257")
+STORE = Location.construct(location_id="1928")
+
+
+def _client(server: StubServer, **kwargs) -> Target:
+    return Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url, **kwargs)
+
+
+def test_store_lookup_and_eviction():
+    store = FingerprintStore(max_entries=1)
+    digest, unchanged, _ = store.lookup(key="a", content=b"{}")
+    assert not unchanged
+    store.store(key="a", digest=digest, model="model")
+    assert store.lookup(key="a", content=b"{}") == (digest, True, "model")
+    assert not store.lookup(key="a", content=b"{ }")[1]
+    store.store(key="b", digest=digest, model="other")
+    assert not store.lookup(key="a", content=b"{}")[1]
+    assert store.stats == {'entries': 1, 'unchanged': 1, 'changed': 3}
+
+
+def test_unchanged_response_returns_previous_model():
+    with StubServer() as server:
+        client = _client(server, fingerprint=True)
+        first = client.redsky.product_availability_at_store(product=PRODUCT, store=STORE)
+        decodes = client.redsky.timings.decodes
+        second = client.redsky.product_availability_at_store(product=PRODUCT, store=STORE)
+        assert second is first
+        assert client.redsky.timings.decodes == decodes
+        assert client.redsky.fingerprints.unchanged == 1
+
+        server.prices[(PRODUCT.tcin, "1928")] = "$7.99"
+        third = client.redsky.product_availability_at_store(product=PRODUCT, store=STORE)
+        assert third is not first
+        assert third.price.formatted_current_price == "$7.99"
+        assert server.request_count == 3
+
+
+def test_requests_are_fingerprinted_separately():
+    with StubServer() as server:
+        client = _client(server, fingerprint=True)
+        online = client.redsky.product_availability(product=PRODUCT)
+        other = client.redsky.product_availability(product=SearchProduct(tcin="1"))
+        assert other.tcin == "1"
+        assert client.redsky.product_availability(product=PRODUCT) is online
+        assert len(client.redsky.fingerprints) == 2
+
+
+def test_shared_store_keeps_hosts_apart():
+    store = FingerprintStore()
+    with StubServer() as first, StubServer() as second:
+        clients = [_client(server, fingerprint=store) for server in (first, second)]
+        for client in clients:
+            client.redsky.unchanged_marker = True
+        assert clients[0].redsky.product_availability(product=PRODUCT).tcin == PRODUCT.tcin
+        # byte-for-byte the same response, but this host hasn't answered before
+        assert clients[1].redsky.product_availability(product=PRODUCT) is not UNCHANGED
+        assert clients[1].redsky.product_availability(product=PRODUCT) is UNCHANGED
+    assert len(store) == 2
+    assert store.unchanged == 1
+
+
+def test_unchanged_marker():
+    with StubServer() as server:
+        client = _client(server, fingerprint=True)
+        client.redsky.unchanged_marker = True
+        assert client.search(keyword="tv")
+        assert client.search(keyword="tv") is UNCHANGED
+        assert client.redsky.fingerprints.stats['unchanged'] == 1
+
+
+def test_cache_hits_still_build_models():
+    with StubServer() as server:
+        client = _client(server, fingerprint=True, cache=ResponseCache())
+        first = client.redsky.product_availability(product=PRODUCT)
+        second = client.redsky.product_availability(product=PRODUCT)
+        assert second.tcin == first.tcin
+        assert server.request_count == 1
+
+
+def test_search_iter_ignores_marker():
+    with StubServer(search_count=3, total_pages=2) as server:
+        client = _client(server, fingerprint=True)
+        client.redsky.unchanged_marker = True
+        assert len(list(client.search_iter(keyword="tv"))) == 6
+        assert len(list(client.search_iter(keyword="tv"))) == 6
+        assert client.redsky.fingerprints.unchanged == 2
+
+
+def test_watcher_with_unchanged_marker():
+    with StubServer() as server:
+        client = _client(server, fingerprint=True)
+        client.redsky.unchanged_marker = True
+        watcher = client.watch(watchlist=[(PRODUCT.tcin, "1928"), (PRODUCT.tcin, None)], interval=0)
+        watcher.poll()
+        assert watcher.poll() == []
+        assert watcher.state(PRODUCT.tcin, "1928") == (None, None, 9.99)
+        server.quantities[PRODUCT.tcin] = 0.0
+        events = sorted((event.kind, event.store_id) for event in watcher.poll())
+        watcher.stop()
+    assert events == [('out_of_stock', None), ('quantity_changed', None)]
+    assert client.redsky.fingerprints.unchanged == 3
@@ -0,0 +1,85 @@
+import math
+
+import pytest
+
+import TargetAPI.inventory as inventory
+from TargetAPI.inventory import InventoryMatrix
+from TargetAPI.products import Availability
+from benchmarks import payloads
+
+LOCATIONS = [
+    {'location_id': "1", 'onhand_quantity': 5.0, 'location_demand_sum': 3.0, 'product_location_reserve': 1.0,
+     'availability_status': "IN_STOCK"},
+    {'location_id': "2", 'onhand_quantity': 0.0, 'location_demand_sum': 0.0, 'product_location_reserve': 2.0,
+     'availability_status': "OUT_OF_STOCK"},
+    {'location_id': "3", 'onhand_quantity': 12.0, 'location_demand_sum': 4.0, 'product_location_reserve': 2.0,
+     'availability_status': "IN_STOCK"},
+    {'location_id': "4", 'onhand_quantity': 2.0, 'availability_status': "LIMITED_STOCK"},
+    {'location_id': "5", 'availability_status': "UNKNOWN"},
+]
+REGIONS = {"1": "MN", "2": "MN", "3": "CA", "4": "CA"}
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def matrix(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(inventory, "np", None)
+    elif inventory.np is None:
+        pytest.skip("numpy not installed")
+    return InventoryMatrix(locations=LOCATIONS, regions=REGIONS)
+
+
+def test_filters(matrix):
+    assert len(matrix) == 5
+    assert matrix.where('onhand', above=1).location_ids == ["1", "3", "4"]
+    assert matrix.where('onhand', above=1, below=10).location_ids == ["1", "4"]
+    assert matrix.exceeding('demand', 'reserve').location_ids == ["1", "3"]
+    assert matrix.with_status("IN_STOCK", "LIMITED_STOCK").location_ids == ["1", "3", "4"]
+    assert matrix.with_status("IN_STOCK").where('onhand', below=10).location_ids == ["1"]
+    assert math.isnan(matrix.row("5")['onhand'])
+    assert matrix.row("4")['status'] == "LIMITED_STOCK"
+    assert matrix.row("missing") is None
+
+
+def test_top_and_rollups(matrix):
+    assert matrix.top(k=2) == [("3", 12.0), ("1", 5.0)]
+    assert matrix.top('demand', k=10) == [("3", 4.0), ("1", 3.0), ("2", 0.0)]
+    assert matrix.top(k=0) == []
+    assert matrix.total() == 19.0
+    assert matrix.group_by_region() == {"MN": 5.0, "CA": 14.0}
+    assert matrix.group_by_region(aggregate='mean') == {"MN": 2.5, "CA": 7.0}
+    assert matrix.group_by_region('demand', aggregate='max') == {"MN": 3.0, "CA": 4.0}
+    assert matrix.group_by_region(aggregate='count') == {"MN": 2, "CA": 2}
+    assert matrix.with_status("IN_STOCK").group_by_region() == {"MN": 5.0, "CA": 12.0}
+    with pytest.raises(ValueError):
+        matrix.group_by_region(aggregate='median')
+    with pytest.raises(ValueError):
+        matrix.column('price')
+
+
+def test_unparseable_quantities(matrix):
+    matrix = InventoryMatrix(locations=[{'location_id': "1", 'onhand_quantity': "7"},
+                                        {'location_id': "2", 'onhand_quantity': "n/a"}])
+    assert matrix.top() == [("1", 7.0)]
+    assert matrix.group_by_region() == {None: 7.0}
+
+
+class _Store:
+    def __init__(self, region: str):
+        self.region = region
+
+
+class _Target:
+    def _store_by_id(self, store_id: str):
+        return _Store(region="MN" if int(store_id) % 2 else "WI")
+
+
+def test_availability_to_frame():
+    availability = Availability(data=payloads.product_availability(locations=1000), target=_Target(), product=None)
+    frame = availability.to_frame()
+    assert len(frame) == 1000
+    assert frame.total() == sum(location.onhand for location in availability.locations)
+    by_region = frame.group_by_region()
+    assert by_region["MN"] + by_region["WI"] == frame.total()
+    assert len(frame.with_status("OUT_OF_STOCK")) == sum(1 for location in availability.locations
+                                                         if location.status == "OUT_OF_STOCK")
@@ -0,0 +1,55 @@
+import pytest
+from pydantic import ValidationError
+
+from TargetAPI import Target
+from TargetAPI.models import SearchResults, StoreAvailabilityResults, LazyModel, LazyList, SearchProduct
+from TargetAPI.models.search_results import Price
+from benchmarks import payloads
+from benchmarks.stub_server import StubServer
+
+
+def test_lazy_search_results_match_full_validation():
+    data = payloads.search_results(3)
+    lazy = LazyModel(model=SearchResults, data=data)
+    products = lazy.data.search.products
+    assert isinstance(products, LazyList)
+    assert len(products) == 3
+    full = SearchResults(**data).data.search.products
+    assert [p.tcin for p in products] == [p.tcin for p in full]
+    assert products[0].item.product_description.title == full[0].item.product_description.title
+    assert products[0].price.location_id == 1928
+    assert products[0].ratings_and_reviews.statistics.rating.average == 4.5
+    assert lazy.validate() == SearchResults(**data)
+
+
+def test_lazy_validates_only_touched_fields():
+    data = payloads.search_results(1)
+    data['data']['search']['search_response']['typed_metadata']['count'] = "not a number"
+    lazy = LazyModel(model=SearchResults, data=data)
+    assert lazy.data.search.products[0].tcin == "10000000"
+    with pytest.raises(ValidationError):
+        lazy.data.search.search_response.typed_metadata.count
+    with pytest.raises(ValidationError):
+        lazy.validate()
+
+
+def test_lazy_missing_required_field():
+    lazy = LazyModel(model=Price, data={'formatted_current_price': "$1.00"})
+    assert lazy.formatted_comparison_price is None
+    with pytest.raises(ValidationError):
+        lazy.location_id
+    with pytest.raises(AttributeError):
+        lazy.not_a_field
+
+
+def test_lazy_client():
+    with StubServer(children=2) as server:
+        target = Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url, lazy=True)
+        products = target.search(keyword="iphone")
+        assert isinstance(products[0], LazyModel)
+        product = target.redsky.product_availability_at_store(product=SearchProduct(tcin="83971258"),
+                                                            store=target.stores[0])
+        assert product.tcin == "83971258"
+        assert product.price.formatted_current_price == "$9.99"
+        assert isinstance(LazyModel(StoreAvailabilityResults, payloads.store_availability("1")).validate(),
+                          StoreAvailabilityResults)
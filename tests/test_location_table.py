@@ -0,0 +1,39 @@
+import pytest
+
+from TargetAPI.location_table import LocationTable, LocationRow
+from TargetAPI.models import Location
+from benchmarks import payloads
+
+DATA = payloads.locations(200) + [{'location_id': "x", 'latitude': None}]
+LOCATIONS = [Location(**loc) for loc in DATA]
+
+
+def test_rows_match_locations():
+    table = LocationTable.from_dicts(DATA)
+    assert len(table) == len(LOCATIONS)
+    for row, location in zip(table, LOCATIONS):
+        assert row.dict() == location.dict()
+    assert table[-1].latitude is None
+    assert table[3].latitude_value == pytest.approx(float(LOCATIONS[3].latitude))
+    with pytest.raises(IndexError):
+        table[len(table)]
+
+
+def test_row_views_are_slotted():
+    row = LocationTable.from_locations(LOCATIONS)[0]
+    assert isinstance(row, LocationRow)
+    with pytest.raises(AttributeError):
+        row.extra = 1
+    assert row.to_location() == LOCATIONS[0]
+
+
+def test_columns_and_filters():
+    table = LocationTable.from_locations(LOCATIONS)
+    assert table.column('region')[:5] == ["MN", "CA", "TX", "NY", "FL"]
+    assert len(table.where('location_type', 'VENDOR')) == 20
+    assert table.where('region', 'ZZ') == []
+
+
+def test_memory_report():
+    report = LocationTable.from_dicts(DATA).memory_report(locations=LOCATIONS)
+    assert report['table_bytes'] < report['models_bytes']
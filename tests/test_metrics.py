@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from TargetAPI import Target, AsyncTarget
+from TargetAPI.exceptions import NotFoundError
+from TargetAPI.metrics import Metrics, Histogram, NETWORK, DECODE, VALIDATION
+from TargetAPI.models import SearchProduct
+from TargetAPI.retry import NO_RETRY
+from TargetAPI.target import SEARCH_ENDPOINT, ONLINE_AVAILABILITY_ENDPOINT
+from benchmarks.stub_server import StubServer
+
+PRODUCT = SearchProduct(tcin="83971257")
+
+
+def test_histogram_buckets():
+    histogram = Histogram(buckets=(1, 5))
+    for value in (0.5, 1, 3, 10):
+        histogram.observe(value)
+    assert histogram.cumulative() == [2, 3, 4]
+    assert histogram.sum == 14.5
+    assert histogram.count == 4
+
+
+def test_records_phases_per_endpoint():
+    events = []
+    metrics = Metrics()
+    metrics.add_callback(lambda *event: events.append(event))
+    with StubServer(search_count=5) as server:
+        client = Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url, metrics=metrics)
+        client.search(keyword="tv")
+        client.redsky.product_availability(product=PRODUCT)
+    stats = metrics.stats
+    assert stats[SEARCH_ENDPOINT]['requests'] == 1
+    assert stats[SEARCH_ENDPOINT]['statuses'] == {'200': 1}
+    assert stats[SEARCH_ENDPOINT]['response_bytes'] > 0
+    assert set(stats[ONLINE_AVAILABILITY_ENDPOINT]['seconds']) == {NETWORK, DECODE, VALIDATION}
+    assert [event[1] for event in events if event[0] == SEARCH_ENDPOINT] == [NETWORK, DECODE, VALIDATION]
+    assert events[0][3] == 200
+
+
+def test_records_error_statuses():
+    metrics = Metrics()
+    with StubServer() as server:
+        server.status_override = 404
+        client = Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url, metrics=metrics,
+                        retry_policy=NO_RETRY)
+        with pytest.raises(NotFoundError):
+            client.redsky.product_availability(product=PRODUCT)
+    assert metrics.stats[ONLINE_AVAILABILITY_ENDPOINT]['statuses'] == {'404': 1}
+
+
+def test_metrics_text():
+    metrics = Metrics(latency_buckets=(0.1, 1.0))
+    metrics.record_request(endpoint='a"b', status=200, seconds=0.05, size=100)
+    metrics.record_request(endpoint='a"b', status=None, seconds=2.0)
+    metrics.record(endpoint='a"b', phase=DECODE, seconds=0.5)
+    text = metrics.metrics_text()
+    assert '# TYPE targetapi_requests_total counter' in text
+    assert 'targetapi_requests_total{endpoint="a\\"b",status="200"} 1' in text
+    assert 'targetapi_requests_total{endpoint="a\\"b",status="error"} 1' in text
+    assert 'targetapi_phase_seconds_bucket{endpoint="a\\"b",phase="network",le="0.1"} 1' in text
+    assert 'targetapi_phase_seconds_bucket{endpoint="a\\"b",phase="network",le="+Inf"} 2' in text
+    assert 'targetapi_phase_seconds_count{endpoint="a\\"b",phase="decode"} 1' in text
+    assert 'phase="validation"' not in text
+    assert 'targetapi_response_bytes_sum{endpoint="a\\"b"} 100.0' in text
+
+
+def test_disabled_by_default():
+    with StubServer() as server:
+        client = Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url)
+        client.redsky.product_availability(product=PRODUCT)
+        assert client.metrics is None
+        assert client.metrics_text() == ""
+
+
+def test_async_metrics():
+    async def run(url: str) -> str:
+        async with AsyncTarget(api_key="test", api_base_url=url, redsky_base_url=url, metrics=True) as client:
+            await client.search(keyword="tv")
+            return client.metrics_text()
+
+    with StubServer() as server:
+        text = asyncio.run(run(server.url))
+    assert f'targetapi_requests_total{{endpoint="{SEARCH_ENDPOINT}",status="200"}} 1' in text
+    assert 'phase="validation"' in text
@@ -0,0 +1,36 @@
+from TargetAPI import Target
+from TargetAPI.models import SearchProduct, Location
+from benchmarks.stub_server import StubServer
+
+
+def _client(server: StubServer, **kwargs) -> Target:
+    return Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url, **kwargs)
+
+
+def test_connections_are_reused():
+    with StubServer() as server:
+        target = _client(server)
+        product = SearchProduct(tcin="83971257")
+        for _ in range(5):
+            target.redsky.product_availability(product=product)
+        assert target.redsky.pool_stats.stats == {'opened': 1, 'reused': 4, 'discarded': 0}
+
+
+def test_small_pool_discards_connections():
+    with StubServer(latency=0.05) as server:
+        product, store = SearchProduct(tcin="83971257"), Location(location_id="1928")
+        small = _client(server, pool_maxsize=2)
+        list(small.redsky.product_availability_across_stores(product=product, stores=[store] * 16, max_workers=8))
+        assert small.redsky.pool_stats.discarded > 0
+        large = _client(server, pool_maxsize=8)
+        list(large.redsky.product_availability_across_stores(product=product, stores=[store] * 16, max_workers=8))
+        assert large.redsky.pool_stats.discarded == 0
+        assert large.redsky.pool_stats.opened <= 8
+
+
+def test_warm_up():
+    with StubServer() as server:
+        target = _client(server, pool_maxsize=4, warm_up=True)
+        assert target.pool_stats['redsky']['opened'] == 4
+        target.redsky.product_availability(product=SearchProduct(tcin="83971257"))
+        assert target.pool_stats['redsky'] == {'opened': 4, 'reused': 1, 'discarded': 0}
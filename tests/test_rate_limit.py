@@ -0,0 +1,149 @@
+import asyncio
+
+from TargetAPI import Target, AsyncTarget
+from TargetAPI.models import SearchProduct
+from TargetAPI.rate_limit import TokenBucket, RateLimiter, AdaptiveConcurrencyLimiter
+from TargetAPI.retry import RetryPolicy
+from benchmarks.stub_server import StubServer
+
+PRODUCT = SearchProduct(tcin="83971257")
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_refills_at_rate():
+    clock = _Clock()
+    bucket = TokenBucket(rate=2, burst=2, clock=clock)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0.5
+    assert not bucket.try_acquire()
+    clock.now = 1.5
+    assert bucket.try_acquire()
+
+
+def test_rate_limiter_per_host_and_endpoint():
+    clock = _Clock()
+    limiter = RateLimiter(host_rate=100, endpoint_rates={'pdp_client_v1': 1}, clock=clock)
+    assert limiter.reserve(host="redsky", endpoint="redsky_aggregations/v1/web/pdp_client_v1") == 0
+    assert limiter.reserve(host="redsky", endpoint="redsky_aggregations/v1/web/pdp_client_v1") == 1.0
+    # other endpoints and hosts have their own buckets
+    assert limiter.reserve(host="redsky", endpoint="redsky_aggregations/v1/web/plp_search_v1") == 0
+    assert limiter.reserve(host="api", endpoint="redsky_aggregations/v1/web/pdp_client_v1") == 0
+    assert limiter.waited_seconds == 1.0
+
+
+def test_shared_rate_limiter_throttles_clients():
+    sleeps = []
+    limiter = RateLimiter(host_rate=1, burst=1, sleep=sleeps.append)
+    with StubServer() as server:
+        clients = [Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url, rate_limiter=limiter)
+                   for _ in range(2)]
+        for client in clients:
+            client.redsky.product_availability(product=PRODUCT)
+    assert len(sleeps) == 1
+    assert 0 < sleeps[0] <= 1
+
+
+def test_aimd_increases_additively_and_decreases_multiplicatively():
+    clock = _Clock()
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=8, latency_threshold=1.0, cooldown=1.0,
+                                         clock=clock)
+    for _ in range(4):
+        assert limiter.acquire()
+        limiter.release(latency=0.1)
+    assert limiter.limit == 4  # 4 successes add 1/4 each, just short of 5
+    assert limiter.acquire()
+    limiter.release(latency=0.1)
+    assert limiter.limit == 5
+    assert limiter.acquire()
+    limiter.release(latency=0.1, congested=True)
+    assert limiter.limit == 2
+    # failures within the cooldown count as the same congestion event
+    assert limiter.acquire()
+    limiter.release(latency=2.0)
+    assert limiter.limit == 2
+    clock.now = 2.0
+    assert limiter.acquire()
+    limiter.release(latency=2.0)
+    assert limiter.limit == 1
+    assert limiter.stats['decreases'] == 2
+
+
+def test_aimd_detects_latency_spikes_against_baseline():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, spike_ratio=3.0, cooldown=0)
+    for _ in range(20):
+        limiter.acquire()
+        limiter.release(latency=0.1)
+    before = limiter.limit
+    limiter.acquire()
+    limiter.release(latency=1.0)
+    assert limiter.limit == before // 2
+
+
+def test_aimd_blocks_at_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+    assert limiter.acquire()
+    assert not limiter.try_acquire()
+    assert not limiter.acquire(timeout=0.01)
+    limiter.release(latency=0.1)
+    assert limiter.try_acquire()
+
+
+def test_aimd_async_waiters_woken_by_release():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+
+    async def run():
+        assert limiter.try_acquire()
+        waiter = asyncio.ensure_future(limiter.acquire_async())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        loop = asyncio.get_running_loop()
+        # released from another thread, as a synchronous client sharing the limiter would
+        await loop.run_in_executor(None, limiter.release)
+        await asyncio.wait_for(waiter, timeout=1)
+        assert limiter.in_flight == 1
+
+        cancelled = asyncio.ensure_future(limiter.acquire_async())
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        assert limiter._async_waiters == []
+        limiter.release()
+        await asyncio.wait_for(limiter.acquire_async(), timeout=1)
+
+    asyncio.run(run())
+    assert limiter.in_flight == 1
+
+
+def test_concurrency_limiter_backs_off_on_429():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, latency_threshold=10)
+    with StubServer() as server:
+        server.status_queue = [429]
+        client = Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url,
+                        retry_policy=RetryPolicy(budget=None, sleep=lambda _: None), concurrency_limiter=limiter)
+        assert client.redsky.product_availability(product=PRODUCT).tcin == PRODUCT.tcin
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+def test_async_limiters():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, latency_threshold=10)
+    rate_limiter = RateLimiter(host_rate=1000)
+
+    async def run(url: str):
+        async with AsyncTarget(api_key="test", api_base_url=url, redsky_base_url=url, rate_limiter=rate_limiter,
+                               concurrency_limiter=limiter) as client:
+            return await asyncio.gather(*[client.redsky.product_availability(product=PRODUCT) for _ in range(6)])
+
+    with StubServer() as server:
+        results = asyncio.run(run(server.url))
+    assert all(result.tcin == PRODUCT.tcin for result in results)
+    assert limiter.in_flight == 0
+    assert limiter.limit >= 2
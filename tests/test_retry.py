@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+import pytest
+
+from TargetAPI import Target, AsyncTarget
+from TargetAPI.exceptions import ServerError, RateLimitError, NotFoundError, NetworkError, HTTPError
+from TargetAPI.models import SearchProduct
+from TargetAPI.retry import RetryPolicy, RetryBudget, parse_retry_after
+from benchmarks.stub_server import StubServer
+
+PRODUCT = SearchProduct(tcin="83971257")
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _policy(**kwargs) -> RetryPolicy:
+    sleeps = []
+    kwargs.setdefault('budget', None)
+    policy = RetryPolicy(sleep=sleeps.append, **kwargs)
+    policy.sleeps = sleeps
+    return policy
+
+
+def _client(server: StubServer, policy: RetryPolicy) -> Target:
+    return Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url, retry_policy=policy)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", clock=lambda: 1445412470.0) == 10.0
+    assert parse_retry_after("soon") is None
+
+
+def test_backoff_full_jitter():
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+    for attempt in range(1, 6):
+        assert 0 <= policy.backoff(attempt=attempt) <= min(4.0, 2 ** (attempt - 1))
+    assert policy.backoff(attempt=1, retry_after=10) == 10
+
+
+def test_retries_server_errors_then_succeeds():
+    with StubServer() as server:
+        server.status_queue = [503, 500]
+        policy = _policy(max_attempts=3)
+        assert _client(server, policy).redsky.product_availability(product=PRODUCT).tcin == PRODUCT.tcin
+        assert server.request_count == 3
+        assert len(policy.sleeps) == 2
+
+
+def test_typed_errors_after_attempts_exhausted():
+    with StubServer() as server:
+        server.status_queue = [503] * 3
+        with pytest.raises(ServerError) as error:
+            _client(server, _policy(max_attempts=2)).redsky.product_availability(product=PRODUCT)
+        assert error.value.status_code == 503
+        assert server.request_count == 2
+        server.status_queue = [404]
+        with pytest.raises(NotFoundError):
+            _client(server, _policy(max_attempts=3)).search(keyword="iphone")
+        assert server.request_count == 3
+
+
+def test_slow_responses_time_out_and_are_retried():
+    with StubServer(latency=0.5) as server:
+        policy = _policy(max_attempts=2)
+        client = Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url, retry_policy=policy,
+                        timeout=0.1)
+        start = time.perf_counter()
+        with pytest.raises(NetworkError):
+            client.redsky.product_availability(product=PRODUCT)
+        assert time.perf_counter() - start < 0.45
+        assert len(policy.sleeps) == 1
+
+
+def test_honours_retry_after():
+    with StubServer() as server:
+        server.status_queue = [429]
+        server.headers_override = {'Retry-After': "2"}
+        policy = _policy(max_attempts=2)
+        _client(server, policy).redsky.product_availability(product=PRODUCT)
+        assert policy.sleeps == [2.0]
+        server.status_queue = [429]
+        server.headers_override = {'Retry-After': "120"}
+        with pytest.raises(RateLimitError) as error:
+            _client(server, _policy(max_attempts=2, max_retry_after=60)).redsky.product_availability(product=PRODUCT)
+        assert error.value.retry_after == 120
+
+
+def test_network_errors():
+    target = Target(api_key="test", api_base_url="http://127.0.0.1:9/", redsky_base_url="http://127.0.0.1:9/",
+                    retry_policy=_policy(max_attempts=2))
+    with pytest.raises(NetworkError):
+        target.redsky.product_availability(product=PRODUCT)
+
+
+def test_retry_budget_limits_retries():
+    clock = _Clock()
+    budget = RetryBudget(ratio=0.5, min_retries_per_second=0, window=10, clock=clock)
+    for _ in range(4):
+        budget.record_request()
+    assert [budget.try_retry() for _ in range(3)] == [True, True, False]
+    clock.now = 11
+    assert budget.try_retry() is False
+    assert budget.stats['exhausted'] == 2
+
+
+def test_async_retries():
+    async def run(url: str):
+        policy = RetryPolicy(max_attempts=3, base_delay=0.001, budget=None)
+        async with AsyncTarget(api_key="test", api_base_url=url, redsky_base_url=url, retry_policy=policy) as target:
+            assert (await target.redsky.product_availability(product=PRODUCT)).tcin == PRODUCT.tcin
+            with pytest.raises(HTTPError):
+                await target.redsky.product_availability(product=PRODUCT)
+
+    pytest.importorskip("aiohttp")
+    with StubServer() as server:
+        server.status_queue = [502, 502, 200, 500, 500, 500]
+        asyncio.run(run(server.url))
+        assert server.request_count == 6
@@ -0,0 +1,34 @@
+from TargetAPI.models import Location
+from TargetAPI.search_index import LocationSearchIndex, tokenize
+from benchmarks import payloads
+
+LOCATIONS = [
+    Location(**payloads.location(1, city="Minneapolis", region="MN", postal_code="55403")),
+    Location(**payloads.location(2, city="Minnetonka", region="MN", postal_code="55305")),
+    Location(**payloads.location(3, city="Los Angeles", region="CA", postal_code="90001")),
+]
+
+
+def test_tokenize():
+    assert tokenize("900 Nicollet Mall, Minneapolis") == ["900", "nicollet", "mall", "minneapolis"]
+
+
+def test_search_prefix_and_case():
+    index = LocationSearchIndex(locations=LOCATIONS)
+    assert [loc.location_id for loc in index.search("minn")] == ["1", "2"]
+    assert [loc.location_id for loc in index.search("MINNEAP")] == ["1"]
+    assert [loc.location_id for loc in index.search("los ang ca")] == ["3"]
+    assert [loc.location_id for loc in index.search("55305")] == ["2"]
+    assert index.search("minn ca") == []
+    assert len(index.search("nicollet", limit=2)) == 2
+
+
+def test_empty_query_matches_everything():
+    index = LocationSearchIndex(locations=LOCATIONS)
+    assert index.search("") == LOCATIONS
+    assert index.search("  ", limit=2) == LOCATIONS[:2]
+
+
+def test_suggest():
+    index = LocationSearchIndex(locations=LOCATIONS)
+    assert set(index.suggest("minne")) == {"minneapolis", "minnetonka"}
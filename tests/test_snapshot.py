@@ -0,0 +1,115 @@
+import json
+import os
+
+import pytest
+
+from TargetAPI import Target
+from TargetAPI.exceptions import ServerError
+from TargetAPI.location_table import LocationTable
+from TargetAPI.retry import NO_RETRY
+from TargetAPI.snapshot import LocationSnapshot
+from benchmarks.stub_server import StubServer
+
+
+def _client(server: StubServer, cache_dir: str, max_age: float = 86400) -> Target:
+    return Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url, cache_dir=str(cache_dir),
+                  locations_max_age=max_age)
+
+
+def test_snapshot_written_and_reused(tmp_path):
+    with StubServer(location_count=30) as server:
+        assert len(_client(server, tmp_path).api.locations) == 30
+        assert os.path.exists(os.path.join(tmp_path, "ship_locations.json"))
+        locations = _client(server, tmp_path).api.locations
+        assert len(locations) == 30
+        assert locations[0].location_id == "1000"
+        assert server.request_count == 1
+
+
+def test_stale_snapshot_revalidated_with_etag(tmp_path):
+    with StubServer(location_count=30) as server:
+        server.headers_override = {'ETag': '"v1"'}
+        _client(server, tmp_path).api.locations
+        api = _client(server, tmp_path, max_age=0).api
+        assert len(api.locations) == 30
+        api._revalidation.join()
+        assert server.request_count == 2
+        snapshot = LocationSnapshot(cache_dir=str(tmp_path))
+        assert snapshot.load()
+        assert snapshot.conditional_headers['If-None-Match'] == '"v1"'
+
+
+def test_unchanged_content_not_rewritten(tmp_path):
+    with StubServer(location_count=30) as server:
+        api = _client(server, tmp_path).api
+        api.locations
+        path = os.path.join(tmp_path, "ship_locations.json")
+        with open(path) as f:
+            digest = json.load(f)['sha256']
+        api.revalidate_locations(background=False)
+        with open(path) as f:
+            assert json.load(f)['sha256'] == digest
+        assert len(api.locations) == 30
+
+
+def test_revalidation_uses_client_decoder(tmp_path):
+    decoded = []
+
+    def decoder(content: bytes):
+        decoded.append(len(content))
+        return json.loads(content)
+
+    with StubServer(location_count=30) as server:
+        client = Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url,
+                        cache_dir=str(tmp_path), decoder=decoder, metrics=True)
+        assert len(client.api.locations) == 30
+    assert len(decoded) == 1
+    assert client.api.timings.decodes == 1
+    seconds = client.metrics.stats['ship_locations/v1']['seconds']
+    assert seconds['decode'] > 0 and seconds['validation'] > 0
+
+
+def test_compact_snapshot(tmp_path):
+    with StubServer(location_count=30) as server:
+        server.headers_override = {'ETag': '"v1"'}
+        _client(server, tmp_path).api.locations
+        api = Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url, cache_dir=str(tmp_path),
+                     compact_locations=True).api
+        table = api.locations
+        assert isinstance(table, LocationTable) and len(table) == 30
+        assert table[0].location_id == "1000"
+        assert api._snapshot._data is None
+        server.headers_override = {'ETag': '"v2"'}
+        api.revalidate_locations(background=False)
+        assert server.request_count == 2
+    snapshot = LocationSnapshot(cache_dir=str(tmp_path))
+    assert snapshot.load()
+    assert snapshot.etag == '"v2"'
+    assert len(snapshot.locations) == 30
+
+
+def test_cold_start_failure_raises(tmp_path):
+    with StubServer(location_count=30) as server:
+        server.status_override = 503
+        client = Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url, cache_dir=str(tmp_path),
+                        retry_policy=NO_RETRY)
+        with pytest.raises(ServerError):
+            client.api.locations
+        server.status_override = None
+        server.body_override = b"{"
+        with pytest.raises(ValueError):
+            client.stores
+        server.body_override = None
+        assert len(client.api.locations) == 30
+
+
+def test_invalid_revalidation_keeps_snapshot(tmp_path):
+    with StubServer(location_count=30) as server:
+        _client(server, tmp_path).api.locations
+        server.body_override = b"not json"
+        api = _client(server, tmp_path, max_age=0).api
+        assert len(api.locations) == 30
+        api._revalidation.join()
+        api.revalidate_locations(background=False)
+        assert server.request_count == 3
+        assert len(api.locations) == 30
@@ -0,0 +1,37 @@
+import pytest
+
+import TargetAPI.spatial as spatial
+from TargetAPI.models import Location
+from TargetAPI.spatial import SpatialIndex, haversine_miles
+from benchmarks import payloads
+
+LOCATIONS = [Location(**loc) for loc in payloads.locations(500)] + [Location(location_id="bad", latitude="n/a")]
+
+
+def _brute_force(latitude, longitude, k, radius_miles=None):
+    distances = sorted((haversine_miles(latitude, longitude, float(loc.latitude), float(loc.longitude)),
+                        loc.location_id) for loc in LOCATIONS if loc.location_id != "bad")
+    if radius_miles is not None:
+        distances = [d for d in distances if d[0] <= radius_miles]
+    return [location_id for _, location_id in distances[:k]]
+
+
+def test_haversine():
+    # Minneapolis to Chicago
+    assert haversine_miles(44.9778, -93.2650, 41.8781, -87.6298) == pytest.approx(355, abs=5)
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_nearest_matches_brute_force(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(spatial, "np", None)
+    elif spatial.np is None:
+        pytest.skip("numpy not installed")
+    index = SpatialIndex(locations=LOCATIONS)
+    assert len(index) == 500
+    for latitude, longitude in [(44.97, -93.27), (30.0, -100.0), (47.6, -122.3)]:
+        nearest = index.nearest(latitude, longitude, k=7)
+        assert [loc.location_id for loc, _ in nearest] == _brute_force(latitude, longitude, 7)
+        within = index.nearest(latitude, longitude, k=50, radius_miles=150)
+        assert [loc.location_id for loc, _ in within] == _brute_force(latitude, longitude, 50, 150)
+        assert all(distance <= 150 for _, distance in within)
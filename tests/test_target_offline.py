@@ -0,0 +1,100 @@
+import time
+
+import pytest
+
+from TargetAPI import Target
+from TargetAPI.exceptions import NotFoundError
+from TargetAPI.location_table import LocationTable, LocationRow, deep_sizeof
+from TargetAPI.models import SearchProduct
+from benchmarks.stub_server import StubServer
+
+
+@pytest.fixture
+def stub():
+    with StubServer() as server:
+        yield server
+
+
+def _client(server: StubServer) -> Target:
+    return Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url)
+
+
+def test_availability_across_stores(stub):
+    target = _client(stub)
+    stores = target.stores
+    results = list(target.product_availability_across_stores(product=SearchProduct(tcin="83971257"), stores=stores,
+                                                              max_workers=8))
+    assert len(results) == len(stores)
+    assert {store.location_id for store, _ in results} == {store.location_id for store in stores}
+    assert all(product.tcin == "83971257" for _, product in results)
+
+
+def test_availability_across_stores_ordered_is_concurrent():
+    with StubServer(latency=0.05) as server:
+        target = _client(server)
+        stores = target.stores
+        start = time.perf_counter()
+        results = list(target.redsky.product_availability_across_stores(product=SearchProduct(tcin="83971257"),
+                                                                        stores=stores, max_workers=len(stores),
+                                                                        ordered=True))
+        elapsed = time.perf_counter() - start
+    assert [store for store, _ in results] == stores
+    assert elapsed < 0.05 * len(stores) / 4
+
+
+def test_availability_across_stores_survives_failed_store():
+    with StubServer(location_count=10) as server:
+        target = _client(server)
+        stores = target.stores
+        server.status_queue = [404]
+        results = list(target.product_availability_across_stores(product=SearchProduct(tcin="83971257"),
+                                                                  stores=stores, max_workers=2, ordered=True))
+        assert [store for store, _ in results] == stores
+        assert sum(1 for _, product in results if product is None) == 1
+
+        server.status_queue = [404]
+        results = list(target.product_availability_across_stores(product=SearchProduct(tcin="83971257"),
+                                                                  stores=stores, max_workers=1,
+                                                                  return_exceptions=True))
+    assert isinstance(results[0][1], NotFoundError)
+    assert all(product.tcin == "83971257" for _, product in results[1:])
+
+
+def test_search_iter_pages():
+    with StubServer(search_count=10, total_pages=4) as server:
+        target = _client(server)
+        products = list(target.search_iter(keyword="iphone"))
+        assert len(products) == 40
+        assert len({product.tcin for product in products}) == 40
+        assert len(list(target.search_iter(keyword="iphone", max_pages=2))) == 20
+
+
+def test_location_registry(stub):
+    target = _client(stub)
+    registry = target.api.registry
+    assert len(registry) == 50
+    assert target.api.stores == list(registry.stores)
+    assert target.api.stores is not target.api.stores
+    assert len(target.api.stores) + len(target.api.vendors) == 50
+    assert target._store_by_id(store_id="1001").location_id == "1001"
+    assert target._store_by_id(store_id=1001) is registry.get(location_id="1001")
+    assert target._store_by_id(store_id="1000") is None  # a vendor, not a store
+    assert all(location.region == "MN" for location in registry.by_region("MN"))
+    assert registry.by_postal_code("55001")[0].location_id == "1001"
+
+
+def test_compact_locations():
+    with StubServer(location_count=500) as server:
+        full = _client(server).api
+        compact = Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url,
+                         compact_locations=True)
+        registry = compact.api.registry
+        assert isinstance(compact.api.locations, LocationTable)
+        assert compact.api.location_table is compact.api.locations
+        assert len(registry) == len(full.registry) == 500
+        assert [store.location_id for store in compact.stores] == [store.location_id for store in full.stores]
+        assert isinstance(compact.stores[0], LocationRow)
+        assert compact._store_by_id(store_id=1001).location_name == full.registry.get("1001").location_name
+        assert compact._store_by_id(store_id="1000") is None
+        assert registry.by_postal_code("55001")[0].location_id == "1001"
+    assert deep_sizeof(registry) < deep_sizeof(full.registry) / 2
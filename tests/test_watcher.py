@@ -0,0 +1,156 @@
+from TargetAPI import Target
+from TargetAPI.retry import NO_RETRY
+from TargetAPI.watcher import StockWatcher, diff_states, IN_STOCK, OUT_OF_STOCK, PRICE_CHANGED, QUANTITY_CHANGED
+from benchmarks.stub_server import StubServer
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _client(server: StubServer) -> Target:
+    return Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url)
+
+
+def test_diff_states():
+    key = ("1", "1928")
+    assert diff_states(key=key, old=None, new=(True, 5.0, 9.99), at=0) == []
+    assert diff_states(key=key, old=(True, 5.0, 9.99), new=(True, 5.0, 9.99), at=0) == []
+    events = diff_states(key=key, old=(True, 5.0, 9.99), new=(False, 0.0, 7.99), at=0)
+    assert [event.kind for event in events] == [OUT_OF_STOCK, QUANTITY_CHANGED, PRICE_CHANGED]
+    assert (events[2].old, events[2].new) == (9.99, 7.99)
+
+
+def test_emits_only_changes():
+    clock = _Clock()
+    received = []
+    with StubServer() as server:
+        watcher = StockWatcher(target=_client(server), watchlist=[("100", "1928"), ("100", "2000"), ("200", None)],
+                               interval=10, clock=clock)
+        watcher.add_callback(received.append)
+        assert watcher.poll() == []
+        assert watcher.state("100", "1928") == (None, None, 9.99)
+        assert watcher.state("200") == (True, 5.0, None)
+        # one online request per online item plus one price request per store item
+        assert server.request_count == 3
+
+        server.quantities["100"] = 0.0
+        server.quantities["200"] = 0.0
+        server.prices[("100", "2000")] = "$7.99"
+        clock.now = 5
+        assert watcher.poll() == []  # nothing due yet
+        clock.now = 10
+        events = watcher.poll()
+    kinds = sorted((event.kind, event.tcin, event.store_id) for event in events)
+    # online stock doesn't say anything about a store's stock, so store items only see the price change
+    assert kinds == [(OUT_OF_STOCK, "200", None), (PRICE_CHANGED, "100", "2000"), (QUANTITY_CHANGED, "200", None)]
+    assert received == events
+    assert watcher.stats == {'watched': 3, 'polls': 6, 'changes': 3, 'errors': 0, 'callback_errors': 0}
+    watcher.stop()
+
+
+def test_per_item_interval_and_remove():
+    clock = _Clock()
+    with StubServer() as server:
+        watcher = StockWatcher(target=_client(server), interval=100, clock=clock)
+        watcher.add("100", interval=1)
+        watcher.add("200")
+        watcher.poll()
+        clock.now = 1
+        watcher.poll()
+        assert server.request_count == 3
+        watcher.remove("100")
+        clock.now = 2
+        watcher.poll()
+        assert server.request_count == 3
+        watcher.remove("200")
+        watcher.add("200", interval=1)
+        clock.now = 3
+        watcher.poll()
+        assert server.request_count == 4
+        watcher.stop()
+    assert len(watcher) == 1
+
+
+def test_errors_keep_last_state():
+    clock = _Clock()
+    with StubServer() as server:
+        client = Target(api_key="test", api_base_url=server.url, redsky_base_url=server.url, retry_policy=NO_RETRY)
+        watcher = StockWatcher(target=client, watchlist=[("100", None)], interval=1, clock=clock)
+        watcher.poll()
+        server.status_override = 500
+        clock.now = 1
+        assert watcher.poll() == []
+        watcher.stop()
+    assert watcher.state("100") == (True, 5.0, None)
+    assert watcher.errors == 1
+
+
+def test_failing_callback_and_fetch_are_contained():
+    clock = _Clock()
+    received = []
+
+    def fail(event):
+        raise RuntimeError("callback failed")
+
+    with StubServer() as server:
+        watcher = StockWatcher(target=_client(server), watchlist=[("100", None), ("200", None)], interval=1,
+                               emit_initial=True, clock=clock)
+        watcher.add_callback(fail)
+        watcher.add_callback(received.append)
+        assert len(watcher.poll()) == 2
+        assert len(received) == 2
+        assert watcher.callback_errors == 2
+
+        fetch_online = watcher._fetch_online
+
+        def fetch(tcin):
+            if tcin == "100":
+                raise ValueError("malformed response")
+            return fetch_online(tcin)
+
+        watcher._fetch_online = fetch
+        server.quantities["200"] = 0.0
+        clock.now = 1
+        assert [event.tcin for event in watcher.poll()] == ["200", "200"]
+        watcher.stop()
+    assert watcher.stats['errors'] == 1
+    assert watcher.state("100") == (True, 5.0, None)
+
+
+def test_background_thread_survives_failing_callback():
+    with StubServer() as server:
+        watcher = StockWatcher(target=_client(server), watchlist=[("100", None)], interval=0.05, emit_initial=True)
+        watcher.add_callback(lambda event: 1 / 0)
+        events = watcher.events(timeout=5)
+        with watcher:
+            first = next(events)
+            server.quantities["100"] = 0.0
+            second = next(events)
+            assert watcher._thread.is_alive()
+    assert (first.kind, second.tcin) == (IN_STOCK, "100")
+    assert watcher.callback_errors >= 2
+
+
+def test_background_iterator():
+    with StubServer() as server:
+        watcher = StockWatcher(target=_client(server), watchlist=[("100", None)], interval=0.05, emit_initial=True)
+        events = watcher.events(timeout=5)
+        with watcher:
+            first = next(events)
+            server.quantities["100"] = 0.0
+            second = next(events)
+    assert (first.kind, first.new) == (IN_STOCK, True)
+    assert second.kind in (OUT_OF_STOCK, QUANTITY_CHANGED)
+
+
+def test_target_watch():
+    with StubServer() as server:
+        watcher = _client(server).watch(watchlist=[("100", "1928")], interval=30)
+        assert watcher.poll() == []
+        watcher.stop()
+    assert watcher.state("100", "1928") == (None, None, 9.99)
@@ -0,0 +1,54 @@
+import pytest
+
+from TargetAPI.products import Product, Availability
+from benchmarks import payloads
+
+
+class _Target:
+    def __init__(self):
+        self.lookups = 0
+
+    def _store_by_id(self, store_id: str):
+        self.lookups += 1
+        return store_id
+
+
+def test_attributes_are_computed_once():
+    product = Product(data=payloads.product_details("83971257", items=3), target=_Target())
+    assert product.promotions is product.promotions
+    assert product.reviews.most_helpful is product.reviews.most_helpful
+    assert product.launch_date is product.launch_date
+    assert len(product.features) == 3
+    assert not hasattr(product, '__dict__')
+    with pytest.raises(AttributeError):
+        product.promotions = []
+
+
+def test_invalidation():
+    data = payloads.product_details("83971257", items=3)
+    product = Product(data=data, target=_Target())
+    promotions, price = product.promotions, product.price
+    data['promotions'] = data['promotions'][:1]
+    assert len(product.promotions) == 3
+
+    product.invalidate('promotions')
+    assert len(product.promotions) == 1
+    assert product.price is price
+    del product.price
+    assert product.price is not price
+    price = product.price
+    product.invalidate()
+    assert product.price is not price
+    Product(data=data, target=_Target()).invalidate()  # nothing cached yet
+
+
+def test_locations_look_up_stores_lazily():
+    target = _Target()
+    availability = Availability(data=payloads.product_availability(locations=5), target=target, product=None)
+    locations = availability.locations
+    assert availability.locations is locations
+    assert target.lookups == 0
+    assert locations[2].store == "1002"
+    assert locations[2].store == "1002"
+    assert target.lookups == 1
+    assert availability.release_date.year == 2020